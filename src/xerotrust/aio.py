@@ -0,0 +1,92 @@
+"""
+An :mod:`asyncio` client for the parts of Xero's Accounting API used when exporting.
+
+This needs the optional ``httpx`` dependency, which can be installed with
+``pip install xerotrust[async]``.
+"""
+
+from typing import Any, Collection
+
+import httpx
+from xero.auth import OAuth2Credentials
+from xero.manager import Manager
+
+from .client import parse_response, request_headers
+from .ratelimit import RateLimiter
+
+
+class AsyncManager:
+    """
+    The :mod:`asyncio` equivalent of a pyxero manager, supporting :meth:`all` and
+    :meth:`filter`. pyxero is still used to build the requests and parse the responses.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        credentials: OAuth2Credentials,
+        client: httpx.AsyncClient,
+        limiter: RateLimiter | None = None,
+        raw_fields: Collection[str] | None = None,
+    ) -> None:
+        self.manager = Manager(name, credentials)
+        self.credentials = credentials
+        self.client = client
+        self.limiter = limiter
+        self.raw_fields = raw_fields
+        # As for SessionManager, so the size of pages can adapt to how Xero responds:
+        self.latency = 0.0
+        self.received = 0
+        self.metadata: dict[str, Any] = {}
+        # As for LimitedManager, so the calls each export makes can be kept in its history:
+        self.calls = 0
+
+    async def all(self) -> Any:
+        return await self._call(*self.manager._all())
+
+    async def filter(self, **kwargs: Any) -> Any:
+        return await self._call(*self.manager._filter(**kwargs))
+
+    async def _call(
+        self,
+        uri: str,
+        params: dict[str, Any],
+        method: str,
+        body: Any,
+        headers: dict[str, str] | None,
+        singleobject: bool,
+    ) -> Any:
+        tenant_id = self.credentials.tenant_id
+        headers = request_headers(self.manager, headers)
+        headers['Authorization'] = f'Bearer {self.credentials.token["access_token"]}'
+        request = self.client.build_request(method, uri, params=params, headers=headers)
+        self.calls += 1
+        if self.limiter is None:
+            response = await self.client.send(request)
+        else:
+            response = await self.limiter.acall(tenant_id, self.client.send, request)
+            self.limiter.observe(response)
+        self.latency = response.elapsed.total_seconds()
+        self.received += len(response.content)
+        self.metadata = {}
+        return parse_response(self.manager, response, self.raw_fields, self.metadata)
+
+
+class AsyncXero:
+    """
+    The :mod:`asyncio` equivalent of :class:`xero.Xero`, where all the managers share one
+    :class:`httpx.AsyncClient`.
+    """
+
+    def __init__(
+        self,
+        credentials: OAuth2Credentials,
+        client: httpx.AsyncClient,
+        limiter: RateLimiter | None = None,
+    ) -> None:
+        self.credentials = credentials
+        self.client = client
+        self.limiter = limiter
+
+    def manager(self, endpoint: str, raw_fields: Collection[str] | None = None) -> AsyncManager:
+        return AsyncManager(endpoint, self.credentials, self.client, self.limiter, raw_fields)
@@ -11,6 +11,16 @@ def minimal_repr(seq: Sequence[int]) -> str:
     return ", ".join(f"{a}-{b}" if a != b else str(a) for a, b in ranges)
 
 
+def missing_numbers(numbers: Iterable[int]) -> list[int]:
+    """
+    The numbers missing from the sequence between the lowest and highest of those given.
+    """
+    present = set(numbers)
+    if not present:
+        return []
+    return sorted(set(range(min(present), max(present) + 1)) - present)
+
+
 def check_journals(journals: Iterable[dict[str, Any]]) -> Iterable[dict[str, Any]]:
     seen_ids = set()
     seen_numbers = set()
@@ -37,18 +47,9 @@ def check_journals(journals: Iterable[dict[str, Any]]) -> Iterable[dict[str, Any
     # Filter out None before processing numbers for gaps
     valid_journal_numbers = [num for num in journal_numbers if isinstance(num, int)]
 
-    if valid_journal_numbers:
-        journal_numbers_sorted = sorted(valid_journal_numbers)
-        # Check for gaps only if we have a valid range
-        if journal_numbers_sorted:
-            expected_sequence = list(
-                range(journal_numbers_sorted[0], journal_numbers_sorted[-1] + 1)
-            )
-            if journal_numbers_sorted != expected_sequence:
-                missing_set = set(expected_sequence) - set(journal_numbers_sorted)
-                # minimal_repr expects a Sequence[int]
-                missing_list = sorted(list(missing_set))
-                errors.append(ValueError(f"Missing JournalNumbers: {minimal_repr(missing_list)}"))
+    missing_list = missing_numbers(valid_journal_numbers)
+    if missing_list:
+        errors.append(ValueError(f"Missing JournalNumbers: {minimal_repr(missing_list)}"))
 
     if errors:
         # Ensure consistent order for testing
@@ -128,3 +129,14 @@ CHECKERS = {
     'journals': (check_journals, show_summary),
     'transactions': (check_transactions, show_transactions_summary),
 }
+
+# The fields used by the checks for each endpoint, which is all that needs to be kept from
+# files that can no longer change:
+CHECKED_FIELDS = {
+    'journals': ('JournalID', 'JournalNumber', 'JournalDate', 'CreatedDateUTC'),
+    'transactions': ('BankTransactionID', 'Date'),
+}
+
+
+def checked_fields(items: Iterable[dict[str, Any]], fields: Sequence[str]) -> list[dict[str, Any]]:
+    return [{f: item[f] for f in fields if f in item} for item in items]
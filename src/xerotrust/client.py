@@ -0,0 +1,235 @@
+"""
+A client for the parts of Xero's Accounting API used by xerotrust, where all the managers
+share one :class:`requests.Session` and so one pool of keep-alive connections.
+"""
+
+from dataclasses import dataclass, field
+from threading import local
+from typing import Any, Collection, Iterator, Self, TYPE_CHECKING, cast
+from urllib.parse import parse_qs
+
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from xero.auth import OAuth2Credentials
+from xero.exceptions import (
+    XeroBadRequest,
+    XeroException,
+    XeroExceptionUnknown,
+    XeroForbidden,
+    XeroInternalError,
+    XeroNotAvailable,
+    XeroNotFound,
+    XeroNotImplemented,
+    XeroRateLimitExceeded,
+    XeroUnauthorized,
+)
+from xero.manager import Manager
+
+from .decode import DATE_FIELDS, decode_response, decoder
+from .raw import raw_item, records, split_records
+
+if TYPE_CHECKING:
+    import httpx
+
+ERRORS: dict[int, type[XeroException]] = {
+    400: XeroBadRequest,
+    401: XeroUnauthorized,
+    403: XeroForbidden,
+    404: XeroNotFound,
+    500: XeroInternalError,
+    501: XeroNotImplemented,
+    503: XeroNotAvailable,
+}
+
+# The number of connections kept open when the concurrency in use isn't known:
+DEFAULT_POOL_SIZE = 10
+
+# The amount of a streamed response to read at a time:
+CHUNK_SIZE = 64 * 1024
+
+
+def request_headers(manager: Manager, headers: dict[str, str] | None) -> dict[str, str]:
+    headers = dict(headers or {})
+    headers['Xero-tenant-id'] = manager.credentials.tenant_id
+    headers['Accept'] = 'application/json'
+    headers['User-Agent'] = manager.user_agent
+    return headers
+
+
+def parse_response(
+    manager: Manager,
+    response: 'Response | httpx.Response',
+    raw_fields: Collection[str] | None = None,
+    metadata: dict[str, Any] | None = None,
+) -> Any:
+    """
+    Turn a response into the items it contains or raise the same exception pyxero would.
+    If ``raw_fields`` are given, items are returned as :class:`~xerotrust.raw.RawItem`
+    instances with only those fields decoded. If ``metadata`` is given, the other values in
+    responses for exported endpoints, such as ``pagination``, are added to it.
+    """
+    if response.status_code == 200:
+        if not response.headers['content-type'].startswith('application/json'):
+            return response.content
+        if raw_fields is not None:
+            return split_records(response.text, manager.name, raw_fields, metadata)
+        if manager.name in DATE_FIELDS:
+            return decode_response(response.text, manager.name, metadata)
+        return manager._parse_api_response(response, manager.name)
+    if response.status_code == 429:
+        limit_reason = response.headers.get('X-Rate-Limit-Problem') or 'unknown'
+        raise XeroRateLimitExceeded(
+            response,
+            {
+                'oauth_problem': [f'rate limit exceeded: {limit_reason}'],
+                'oauth_problem_advice': [
+                    f'please wait before retrying the xero api, '
+                    f'the limit exceeded is: {limit_reason}'
+                ],
+            },
+        )
+    if response.status_code == 503 and (payload := parse_qs(response.text)):
+        raise XeroRateLimitExceeded(response, payload)
+    raise ERRORS.get(response.status_code, XeroExceptionUnknown)(response)
+
+
+class SessionManager:
+    """
+    A pyxero manager, supporting :meth:`all`, :meth:`filter` and :meth:`get`, that makes
+    its requests using a shared :class:`requests.Session`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        credentials: OAuth2Credentials,
+        session: Session,
+        raw_fields: Collection[str] | None = None,
+    ) -> None:
+        self.manager = Manager(name, credentials)
+        self.credentials = credentials
+        self.session = session
+        self.raw_fields = raw_fields
+        # How long Xero took to start responding to the last request, in seconds, and the
+        # number of bytes of responses received, so the size of pages can adapt to them:
+        self.latency = 0.0
+        self.received = 0
+        self._local = local()
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        """
+        The values other than items in the last response, such as pagination details.
+        These are kept for each thread, as windows of dates may be fetched concurrently
+        using the same manager and each needs the details of its own pages.
+        """
+        metadata: dict[str, Any] = getattr(self._local, 'metadata', {})
+        return metadata
+
+    def all(self) -> Any:
+        return self._call(self.manager._all())
+
+    def filter(self, **kwargs: Any) -> Any:
+        return self._call(self.manager._filter(**kwargs))
+
+    def get(self, id: str) -> Any:
+        return self._call(self.manager._get(id))
+
+    def count(self, **kwargs: Any) -> int | None:
+        """
+        The number of items matching the filters, from the pagination details Xero includes
+        with pages of paged endpoints, fetching only a single item to find it. ``None`` is
+        returned for endpoints that aren't paged.
+        """
+        response = self._request(self.manager._filter(page=1, pageSize=1, **kwargs))
+        if response.status_code != 200:
+            parse_response(self.manager, response)
+        pagination = response.json().get('pagination')
+        return None if pagination is None else int(pagination['itemCount'])
+
+    def stream(self, **kwargs: Any) -> Iterator[Any]:
+        """
+        The equivalent of :meth:`filter`, or :meth:`all` if no filters are given, where
+        items are yielded as they are parsed from the response rather than once it has been
+        read in full. Errors are raised before any items are yielded.
+        """
+        request = self.manager._filter(**kwargs) if kwargs else self.manager._all()
+        response = self._request(request, stream=True)
+        if response.status_code != 200 or not response.headers['content-type'].startswith(
+            'application/json'
+        ):
+            with response:
+                return iter(parse_response(self.manager, response, self.raw_fields, self.metadata))
+        return self._records(response)
+
+    def _records(self, response: Response) -> Iterator[Any]:
+        with response:
+            response.encoding = response.encoding or 'utf-8'
+            # With an encoding set, these are always text:
+            chunks = cast(Iterator[str], response.iter_content(CHUNK_SIZE, decode_unicode=True))
+            chunks = self._counted(chunks)
+            if self.raw_fields is None:
+                name = self.manager.name
+                for record, _ in records(chunks, name, decoder(name), self.metadata):
+                    yield record
+            else:
+                for record, raw in records(chunks, self.manager.name, metadata=self.metadata):
+                    yield raw_item(record, raw, self.raw_fields)
+
+    def _counted(self, chunks: Iterator[str]) -> Iterator[str]:
+        for chunk in chunks:
+            # Close enough to the number of bytes for JSON, which is almost always ASCII:
+            self.received += len(chunk)
+            yield chunk
+
+    def _request(self, request: tuple[Any, ...], stream: bool = False) -> Response:
+        uri, params, method, body, headers, singleobject = request
+        response = self.session.request(
+            method,
+            uri,
+            params=params,
+            headers=request_headers(self.manager, headers),
+            auth=self.credentials.oauth,
+            stream=stream,
+        )
+        self.latency = response.elapsed.total_seconds()
+        self._local.metadata = {}
+        return response
+
+    def _call(self, request: tuple[Any, ...]) -> Any:
+        response = self._request(request)
+        self.received += len(response.content)
+        return parse_response(self.manager, response, self.raw_fields, self.metadata)
+
+
+@dataclass
+class Transport:
+    """
+    A :class:`requests.Session` shared by all the managers and tenants in a process,
+    with enough pooled connections for the concurrency in use.
+    """
+
+    pool_size: int = DEFAULT_POOL_SIZE
+    session: Session = field(default_factory=Session)
+
+    def __post_init__(self) -> None:
+        adapter = HTTPAdapter(pool_maxsize=self.pool_size)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+
+    def manager(
+        self,
+        endpoint: str,
+        credentials: OAuth2Credentials,
+        raw_fields: Collection[str] | None = None,
+    ) -> SessionManager:
+        return SessionManager(endpoint, credentials, self.session, raw_fields)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -2,3 +2,21 @@ class XeroAPIException(ValueError):
     """
     An error occurred when interacting with the Xero API
     """
+
+
+class Interrupted(Exception):
+    """
+    Raised when an export has been asked to stop, once it has saved a checkpoint.
+    """
+
+
+class DailyLimitExhausted(XeroAPIException):
+    """
+    The daily API call limit for a tenant has been used up
+    """
+
+
+class TenantUnavailable(XeroAPIException):
+    """
+    Calls for a tenant have kept failing, so no more will be made for now
+    """
@@ -1,19 +1,56 @@
 import json
 import logging
+import os
+from asyncio import sleep as async_sleep
+from bisect import bisect_left
 from collections import OrderedDict
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, timedelta
 from enum import StrEnum
+from functools import partial
+from hashlib import file_digest, sha256
+from itertools import batched
 from pathlib import Path
-from time import sleep
-from typing import Callable, Any, IO, Self, TypeAlias, Iterable, ClassVar, cast
+from threading import Event, RLock
+from time import monotonic
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    ClassVar,
+    IO,
+    Iterable,
+    Iterator,
+    Protocol,
+    Self,
+    TypeAlias,
+    cast,
+    runtime_checkable,
+)
 
 from xero.exceptions import XeroRateLimitExceeded
 
+from xerotrust.decode import parse_xero_date
+from xerotrust.exceptions import Interrupted
+from xerotrust.ratelimit import pause
+from xerotrust.retry import TenantRetries, transient
+from xerotrust.scheduler import map_ordered, prefetch
 from xerotrust.transform import DateTimeEncoder
 
 Serializer: TypeAlias = Callable[[dict[str, Any]], str]
 
+# The number of items to fetch at once by their IDs:
+ID_BATCH_SIZE = 100
+
+# How often to fetch endpoints that rarely change:
+DAILY = timedelta(days=1)
+
+# The sizes that pages can adapt between, largest first. Xero won't return more than 1000 items
+# in a page and each size is a multiple of the next so that, once whole pages of one size have
+# been fetched, the next page of any smaller size starts with the next item:
+PAGE_SIZES = (1000, 500, 250, 125, 25)
+
 
 class Split(StrEnum):
     NONE = 'none'
@@ -34,6 +71,7 @@ class FileManager:
     """
     Manages writing lines to files based on their path.
     Keeps a pool of files open for efficient writing.
+    Safe to use from multiple threads.
     """
 
     def __init__(self, max_open_files: int = 10, serializer: Serializer = str) -> None:
@@ -41,26 +79,41 @@ class FileManager:
         self.serializer = serializer
         self._open_files: "OrderedDict[Path, IO[str]]" = OrderedDict()
         self._seen_paths: set[Path] = set()
+        self._lock = RLock()
 
     def write(self, item: dict[str, Any], path: Path, append: bool = False) -> None:
-        if path not in self._open_files:
-            logging.info(f'opening {path}')
-            if len(self._open_files) >= self.max_open_files:
-                oldest_path, oldest_file = self._open_files.popitem(last=False)
-                oldest_file.close()
-            path.parent.mkdir(parents=True, exist_ok=True)  # Ensure the directory exists
-            mode = 'a' if append or path in self._seen_paths else 'w'
-            self._open_files[path] = path.open(mode, encoding='utf-8')
-        else:
-            self._open_files.move_to_end(path)
-        self._seen_paths.add(path)
-        print(self.serializer(item), file=self._open_files[path])
+        line = self.serializer(item)
+        with self._lock:
+            if path not in self._open_files:
+                logging.info(f'opening {path}')
+                if len(self._open_files) >= self.max_open_files:
+                    oldest_path, oldest_file = self._open_files.popitem(last=False)
+                    oldest_file.close()
+                path.parent.mkdir(parents=True, exist_ok=True)  # Ensure the directory exists
+                mode = 'a' if append or path in self._seen_paths else 'w'
+                self._open_files[path] = path.open(mode, encoding='utf-8')
+            else:
+                self._open_files.move_to_end(path)
+            self._seen_paths.add(path)
+            print(line, file=self._open_files[path])
+
+    def seen(self, path: Path) -> bool:
+        """Whether anything has been written to the path."""
+        with self._lock:
+            return path in self._seen_paths
+
+    def flush(self) -> None:
+        """Flush all open files."""
+        with self._lock:
+            for f in self._open_files.values():
+                f.flush()
 
-    def close(self) -> None:
-        """Close all open files."""
-        for f in self._open_files.values():
-            f.close()
-        self._open_files.clear()
+    def close(self, paths: Iterable[Path] | None = None) -> None:
+        """Close the files for the given paths, or all open files if none are given."""
+        with self._lock:
+            for path in list(self._open_files) if paths is None else set(paths):
+                if (f := self._open_files.pop(path, None)) is not None:
+                    f.close()
 
     def __enter__(self) -> Self:
         return self
@@ -75,27 +128,387 @@ class FileManager:
 
 
 class LatestData(dict[str, dict[str, datetime | int] | None]):
+    """
+    The latest values seen for each endpoint of a tenant.
+    Safe to update from multiple threads.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = RLock()
+
+    def __setitem__(self, endpoint: str, data: dict[str, datetime | int] | None) -> None:
+        with self._lock:
+            super().__setitem__(endpoint, data)
+
+    def pop(self, endpoint: str, default: Any = None) -> Any:
+        with self._lock:
+            return super().pop(endpoint, default)
+
     @classmethod
     def load(cls, path: Path) -> Self:
         instance = cls()
         if path.exists():
             for endpoint, data in json.loads(path.read_text()).items():
-                if data:
-                    for key in data:
-                        if 'Date' in key:
-                            data[key] = datetime.fromisoformat(data[key])
-                instance[endpoint] = data
+                instance[endpoint] = _load_latest(data)
         return instance
 
     def save(self, path: Path) -> None:
-        path.write_text(json.dumps(self, cls=DateTimeEncoder, indent=2))
+        with self._lock:
+            content = json.dumps(self, cls=DateTimeEncoder, indent=2)
+        path.write_text(content)
+
+
+def _load_latest(data: dict[str, Any] | None) -> dict[str, datetime | int] | None:
+    if data:
+        for key in data:
+            if 'Date' in key:
+                data[key] = datetime.fromisoformat(data[key])
+    return data
+
+
+class Checkpoints:
+    """
+    How far the export of each endpoint for a tenant has durably got: the latest values to
+    resume from and the size of each of the endpoint's files at that point.
+    Safe to update from multiple threads.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._data: dict[str, Any] = json.loads(path.read_text()) if path.exists() else {}
+        self._finished: set[str] = set()
+        self._lock = RLock()
+
+    def start(
+        self, endpoint: str, paths: list[Path], latest: dict[str, Any] | None, update: bool
+    ) -> dict[str, datetime | int] | None:
+        """
+        Return the latest values from which to export an endpoint. If a checkpoint was saved
+        by an earlier export that didn't finish, its files are first truncated to where
+        they were at that checkpoint so that the export can carry on from there.
+        """
+        with self._lock:
+            checkpoint = self._data.get(endpoint)
+        if not update:
+            self.discard(endpoint)
+            return None
+        if checkpoint is None:
+            return latest
+        sizes = checkpoint['sizes']
+        for path in paths:
+            size = sizes.get(path.name)
+            if size is None:
+                logging.warning(f'removing {path}, created after the last checkpoint')
+                path.unlink()
+            elif path.stat().st_size > size:
+                logging.warning(f'truncating {path} to the last checkpoint')
+                os.truncate(path, size)
+        return _load_latest(checkpoint['latest'])
+
+    def save(
+        self,
+        endpoint: str,
+        latest: dict[str, datetime | int] | None,
+        files: FileManager,
+        paths: Iterable[Path],
+        append: bool,
+    ) -> None:
+        """
+        Record a checkpoint once everything written so far is on disk.
+        """
+        files.flush()
+        # An export that isn't appending replaces each file when it first writes to it, so any
+        # it hasn't written to yet still hold the previous export and will be removed on resume:
+        sizes = {path.name: path.stat().st_size for path in paths if append or files.seen(path)}
+        with self._lock:
+            self._data[endpoint] = {'latest': latest, 'sizes': sizes}
+            self._write()
+
+    def discard(self, endpoint: str) -> None:
+        with self._lock:
+            if self._data.pop(endpoint, None) is not None:
+                self._write()
+
+    def finished(self, endpoint: str) -> None:
+        """
+        Note that the export of an endpoint has finished, so that its checkpoint can be cleared
+        once the latest values it reached have been saved.
+        """
+        with self._lock:
+            self._finished.add(endpoint)
+
+    def clear(self) -> None:
+        """
+        Discard the checkpoints of endpoints whose exports have finished. Those of endpoints
+        that weren't exported, or didn't finish, are kept for the next update to resume from.
+        """
+        with self._lock:
+            for endpoint in self._finished:
+                self._data.pop(endpoint, None)
+            self._finished.clear()
+            if self._data:
+                self._write()
+            else:
+                self.path.unlink(missing_ok=True)
+
+    def _write(self) -> None:
+        temp = self.path.with_name(self.path.name + '.tmp')
+        temp.write_text(json.dumps(self._data, cls=DateTimeEncoder, indent=2))
+        os.replace(temp, self.path)
+
+
+def now() -> datetime:
+    return datetime.now(UTC)
+
+
+class Freshness:
+    """
+    When each endpoint that rarely changes was last fetched for a tenant, so that it's fetched
+    no more often than its exporter's ``max_age`` allows.
+    Safe to update from multiple threads.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        data = json.loads(path.read_text()) if path.exists() else {}
+        self._fetched = {endpoint: datetime.fromisoformat(v) for endpoint, v in data.items()}
+        self._lock = RLock()
+
+    def due(self, endpoint: str, max_age: timedelta | None, paths: list[Path]) -> bool:
+        """
+        Whether the endpoint should be fetched, which it always should be if it has no
+        ``max_age`` or none of its files exist.
+        """
+        with self._lock:
+            fetched = self._fetched.get(endpoint)
+        if max_age is None or fetched is None or not paths:
+            return True
+        return now() - fetched >= max_age
+
+    def fetched(self, endpoint: str) -> None:
+        with self._lock:
+            self._fetched[endpoint] = now()
+
+    def save(self) -> None:
+        with self._lock:
+            if self._fetched:
+                self.path.write_text(
+                    json.dumps(self._fetched, cls=DateTimeEncoder, indent=2, sort_keys=True)
+                )
+
+
+def digest(lines: Iterable[str]) -> str:
+    """
+    The digest of a file that would contain the given lines.
+    """
+    hasher = sha256()
+    for line in lines:
+        hasher.update(line.encode('utf-8'))
+        hasher.update(b'\n')
+    return hasher.hexdigest()
+
+
+def unchanged(lines: dict[Path, list[str]], paths: list[Path]) -> bool:
+    """
+    Whether the given lines for each path are exactly what the existing files contain.
+    """
+    if set(lines) != set(paths):
+        return False
+    for path, path_lines in lines.items():
+        with path.open('rb') as source:
+            if file_digest(source, 'sha256').hexdigest() != digest(path_lines):
+                return False
+    return True
+
+
+@dataclass
+class Index:
+    """
+    Where each exported item is, as the name of the file it is in and its line number there.
+    The size of each file is also kept so that an index that is out of date can be spotted.
+    """
+
+    entries: dict[str, tuple[str, int]] = field(default_factory=dict)
+    lines: dict[str, int] = field(default_factory=dict)
+    sizes: dict[str, int] = field(default_factory=dict)
+    # When each item was last updated, only known when built from the files:
+    updated: dict[str, str | None] = field(default_factory=dict)
+    # Lines found when building that hold earlier versions of items, such as those left by
+    # an update that was interrupted:
+    stale: dict[str, set[int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, paths: Iterable[Path], id_field: str) -> Self:
+        index = cls()
+        for path in paths:
+            count = 0
+            with path.open(encoding='utf-8') as source:
+                for count, line in enumerate(source, start=1):
+                    item = json.loads(line)
+                    item_id = item.get(id_field)
+                    if item_id is None:
+                        continue
+                    item_updated = updated(item)
+                    if (previous := index.entries.get(item_id)) is not None:
+                        # Keep whichever version was updated last, or the later one if unsure:
+                        if _later(index.updated[item_id], item_updated):
+                            index.stale.setdefault(path.name, set()).add(count - 1)
+                            continue
+                        index.stale.setdefault(previous[0], set()).add(previous[1])
+                    index.entries[item_id] = path.name, count - 1
+                    index.updated[item_id] = item_updated
+            index.lines[path.name] = count
+            index.sizes[path.name] = path.stat().st_size
+        return index
+
+    @classmethod
+    def load(cls, path: Path, paths: list[Path], id_field: str) -> Self:
+        """
+        Load the index from the given path, building it from the files it covers if it is
+        missing or those files have changed since it was saved.
+        """
+        if path.exists():
+            data = json.loads(path.read_text())
+            index = cls(
+                {item_id: (name, line) for item_id, (name, line) in data['entries'].items()},
+                {name: file['lines'] for name, file in data['files'].items()},
+                {name: file['size'] for name, file in data['files'].items()},
+            )
+            if index.sizes == {p.name: p.stat().st_size for p in paths}:
+                return index
+            logging.warning(f'{path} is out of date, rebuilding')
+        return cls.build(paths, id_field)
+
+    def save(self, path: Path) -> None:
+        files = {
+            name: {'lines': lines, 'size': (path.parent / name).stat().st_size}
+            for name, lines in sorted(self.lines.items())
+        }
+        path.write_text(json.dumps({'files': files, 'entries': self.entries}))
+
+    def remove(self, name: str, removed: set[int]) -> None:
+        """
+        Update the line numbers for a file from which the given lines have been removed.
+        """
+        ordered = sorted(removed)
+        for item_id, (entry_name, line) in self.entries.items():
+            if entry_name == name:
+                self.entries[item_id] = name, line - bisect_left(ordered, line)
+        self.lines[name] -= len(removed)
+
+
+@dataclass
+class Upsert:
+    """
+    Tracks the items fetched by an update as they are appended to an export, so that any
+    earlier versions of them can then be removed using an :class:`Index`.
+    """
+
+    directory: Path
+    id_field: str
+    index: Index
+    # Where the index is kept between exports, if anywhere:
+    index_path: Path | None = None
+    written: set[Path] = field(default_factory=set)
+    # The lines to remove from each file:
+    removed: dict[str, set[int]] = field(default_factory=dict)
+
+    @classmethod
+    def load(
+        cls, directory: Path, paths: list[Path], id_field: str, index_name: str | None
+    ) -> Self:
+        if index_name is None:
+            index, index_path = Index.build(paths, id_field), None
+        else:
+            index_path = directory / index_name
+            index = Index.load(index_path, paths, id_field)
+        removed = {name: set(lines) for name, lines in index.stale.items()}
+        return cls(directory, id_field, index, index_path, removed=removed)
+
+    def record(self, item: dict[str, Any], path: Path) -> None:
+        item_id = item[self.id_field]
+        line = self.index.lines.get(path.name, 0)
+        self.index.lines[path.name] = line + 1
+        if (previous := self.index.entries.get(item_id)) is not None:
+            name, previous_line = previous
+            self.removed.setdefault(name, set()).add(previous_line)
+        self.index.entries[item_id] = path.name, line
+        self.written.add(path)
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """
+        Remove the items with the given IDs from the export, returning how many there were.
+        """
+        count = 0
+        for count, item_id in enumerate(ids, start=1):
+            name, line = self.index.entries.pop(item_id)
+            self.removed.setdefault(name, set()).add(line)
+        return count
+
+    def apply(self) -> None:
+        """
+        Remove the replaced or deleted items from the files that contain them, leaving all
+        other files untouched, and then save the index if it is kept.
+        """
+        for name, lines in self.removed.items():
+            self._rewrite(self.directory / name, lines)
+            self.index.remove(name, lines)
+        if self.index_path is not None:
+            self.index.save(self.index_path)
+
+    @staticmethod
+    def _rewrite(path: Path, dropped: set[int]) -> None:
+        logging.info(f'removing {len(dropped)} items from {path}')
+        temp = path.with_name(path.name + '.tmp')
+        with path.open(encoding='utf-8') as source, temp.open('w', encoding='utf-8') as target:
+            for index, line in enumerate(source):
+                if index not in dropped:
+                    target.write(line)
+        os.replace(temp, path)
+
+
+def updated(item: dict[str, Any]) -> str | None:
+    """
+    When an item was last updated, in the form it would be exported in.
+    """
+    value = item.get('UpdatedDateUTC')
+    if isinstance(value, str) and value.startswith('/Date('):
+        value = parse_xero_date(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _later(first: str | None, second: str | None) -> bool:
+    if first is None or second is None:
+        return False
+    return datetime.fromisoformat(first) > datetime.fromisoformat(second)
+
+
+def merge(path: Path, items: Iterable[dict[str, Any]], key: str, serializer: Serializer) -> None:
+    """
+    Merge the items into the file at the given path, creating it if needed and keeping the
+    lines in order of ``key``. Existing lines are kept exactly as they were and the file is
+    replaced in one go so that readers never see it partly written.
+    """
+    lines: list[tuple[Any, str]] = []
+    if path.exists():
+        with path.open(encoding='utf-8') as source:
+            lines.extend((json.loads(line)[key], line) for line in source)
+    lines.extend((item[key], serializer(item) + '\n') for item in items)
+    lines.sort(key=lambda pair: pair[0])
+    temp = path.with_name(path.name + '.tmp')
+    with temp.open('w', encoding='utf-8') as target:
+        target.writelines(line for _, line in lines)
+    os.replace(temp, path)
 
 
 Namer: TypeAlias = Callable[[dict[str, Any]], str]
 
 
 def retry_on_rate_limit[T, **P](
-    manager_method: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    stop: Event | None, manager_method: Callable[P, T], *args: P.args, **kwargs: P.kwargs
 ) -> T:
     while True:
         try:
@@ -103,43 +516,593 @@ def retry_on_rate_limit[T, **P](
         except XeroRateLimitExceeded as e:
             seconds = int(e.response.headers['retry-after'])
             logging.warning(f'Rate limit exceeded, waiting {seconds} seconds')
-            sleep(seconds)
+            pause(seconds, stop)
+
+
+async def aretry_on_rate_limit[T, **P](
+    manager_method: Callable[P, Awaitable[T]], *args: P.args, **kwargs: P.kwargs
+) -> T:
+    while True:
+        try:
+            return await manager_method(*args, **kwargs)
+        except XeroRateLimitExceeded as e:
+            seconds = int(e.response.headers['retry-after'])
+            logging.warning(f'Rate limit exceeded, waiting {seconds} seconds')
+            await async_sleep(seconds)
+
+
+@dataclass
+class PageSizer:
+    """
+    The size of pages to fetch, adapting to how long Xero took to start responding with earlier
+    full pages, how large they were and whether Xero failed to return a page at all.
+    """
+
+    size: int = PAGE_SIZES[0]
+    # Full pages slower, in seconds, or larger, in bytes, than these are too big:
+    slow: float = 30
+    large: int = 4 * 1024 * 1024
+    # Full pages quicker than this and smaller than a quarter of large could be bigger:
+    fast: float = 5
+    # Pages never get bigger again than a size Xero failed to return:
+    largest: int = field(init=False, default=PAGE_SIZES[0])
+
+    def __post_init__(self) -> None:
+        # The starting size may have been chosen when the sizes available were different:
+        self.size = next((s for s in PAGE_SIZES if s <= self.size), PAGE_SIZES[-1])
+
+    def at(self, offset: int) -> int:
+        """
+        The size of the page starting with the item at the given offset, which will be smaller
+        than the chosen size until the offset is a multiple of it.
+        """
+        return next(s for s in PAGE_SIZES if s <= self.size and not offset % s)
+
+    def observe(self, seconds: float, size: int) -> None:
+        if seconds > self.slow or size > self.large:
+            self._move(1)
+        elif seconds < self.fast and size < self.large // 4:
+            self._move(-1)
+
+    def failed(self) -> bool:
+        """
+        Make pages smaller after Xero failed to return one, returning ``False`` if they
+        are already as small as they can be.
+        """
+        if not self._move(1):
+            return False
+        self.largest = self.size
+        return True
+
+    def _move(self, step: int) -> bool:
+        index = PAGE_SIZES.index(self.size) + step
+        if not 0 <= index < len(PAGE_SIZES) or PAGE_SIZES[index] > self.largest:
+            return False
+        logging.info(f'Page size changed from {self.size} to {PAGE_SIZES[index]}')
+        self.size = PAGE_SIZES[index]
+        return True
+
+
+@runtime_checkable
+class Refreshable(Protocol):
+    """Protocol for exporters whose files can be refreshed for a window of dates."""
+
+    def items_within(self, manager: Any, start: date, end: date) -> Iterable[dict[str, Any]]:
+        """
+        The items dated from ``start`` up to but not including ``end``.
+        """
 
 
 @dataclass
 class Export:
     latest_fields: ClassVar[tuple[str, ...]] = 'CreatedDateUTC', 'UpdatedDateUTC'
-    supports_update: ClassVar[bool] = False
+    # For exporters that split their files by date, the field that date comes from:
+    split_field: ClassVar[str | None] = None
 
     file_name: str | None = None
     latest: dict[str, int | datetime] | None = None
+    # The field that identifies each item, for endpoints where only the items changed since
+    # the last export need to be fetched, replacing any earlier versions already exported:
+    id_field: str | None = None
+    # The name of the file in which to keep an index of where each item has been exported,
+    # for endpoints with many files where finding earlier versions would be slow:
+    index_name: str | None = None
+    # Whether the endpoint supports summaryOnly and IDs, so that summaries of every item can
+    # be compared with the existing export and only the items that differ fetched in full:
+    summaries: bool = False
+    # The UpdatedDateUTC of each item in the existing export, by ID, when doing that:
+    existing: dict[str, str | None] | None = None
+    # The number of concurrent requests to use, for exporters that support it:
+    workers: int = 1
+    # Whether the endpoint supports the page and pageSize parameters:
+    paged: bool = False
+    page_size: int = 1000
+    # Whether the size of pages should adapt to how Xero responds, starting from page_size:
+    adaptive: bool = False
+    sizer: PageSizer | None = field(init=False, default=None)
+    # The number of pages to fetch ahead while earlier ones are being written:
+    prefetch_depth: int = 0
+    # For endpoints that rarely change, how long to go before fetching them again:
+    max_age: timedelta | None = None
+    # The number of items to export, once known from the pagination details of the first page:
+    total: int | None = None
+    # For retrying calls that fail for reasons likely to pass, shared by a tenant's exports:
+    retries: TenantRetries | None = None
+    # Set when the export is asked to stop, so that any waiting can stop too:
+    stop: Event | None = None
+
+    def __post_init__(self) -> None:
+        if self.adaptive:
+            self.sizer = PageSizer(self.page_size)
+
+    @property
+    def supports_update(self) -> bool:
+        return self.id_field is not None
+
+    @property
+    def resumable(self) -> bool:
+        """
+        Whether items are exported in the order of their latest values, so that an export
+        can be resumed from the latest values seen at any point.
+        """
+        return False
 
     def name(self, item: dict[str, Any], split: Split) -> str:
         assert self.file_name is not None
         return self.file_name
 
+    def paths(self, path: Path) -> list[Path]:
+        """
+        The files in the given directory that contain items exported by this exporter.
+        """
+        assert self.file_name is not None
+        return [p for p in [path / self.file_name] if p.exists()]
+
+    def upsert(self, path: Path) -> Upsert | None:
+        """
+        Start an update of the export in the given directory where items that have changed
+        replace their earlier versions, if this exporter supports it.
+        """
+        if self.id_field is None:
+            return None
+        return Upsert.load(path, self.paths(path), self.id_field, self.index_name)
+
+    def discard_index(self, path: Path) -> None:
+        """
+        Remove the index kept for the export in the given directory, if there is one, as the
+        export is about to be rewritten and the line numbers in it would no longer be right.
+        Checking the sizes of the files isn't enough, as a rewritten file can be the same size.
+        """
+        if self.index_name is not None:
+            (path / self.index_name).unlink(missing_ok=True)
+
+    def estimate(self, manager: Any, latest: dict[str, int | datetime] | None) -> int:
+        """
+        Estimate the number of calls that exporting would make, making as few calls as
+        possible to do so.
+        """
+        if not self.paged:
+            return 1
+        since = self._since(latest)
+        # Where Xero says how many items there are, only a single item need be fetched:
+        count: int | None = manager.count(**since) if hasattr(manager, 'count') else None
+        if count is not None:
+            return max(-(-count // self.page_size), 1)
+        return self._page_count(manager, **since)
+
+    def _page_count(self, manager: Any, **kwargs: Any) -> int:
+        """
+        The number of pages :meth:`_paginate` would fetch, found by doubling the page number
+        until a page that isn't full is found and then bisecting.
+        """
+        counts: dict[int, int] = {}
+
+        def full(page: int) -> bool:
+            entries = self._call(manager.filter, page=page, pageSize=self.page_size, **kwargs)
+            counts[page] = len(entries)
+            return len(entries) >= self.page_size
+
+        low, high = 0, 1
+        while full(high):
+            low, high = high, high * 2
+        while high - low > 1:
+            middle = (low + high) // 2
+            if full(middle):
+                low = middle
+            else:
+                high = middle
+        # Without pagination details, an empty page is needed to show there are no more:
+        return high + 1 if counts[high] else high
+
+    def window_names(self, start: date, end: date, split: Split) -> set[str]:
+        """
+        The names of the files holding the items dated from ``start`` up to but not including
+        ``end``, which must not also hold items from outside that window.
+        """
+        assert self.split_field is not None
+        names = set()
+        day = start
+        while day < end:
+            names.add(self.name({self.split_field: day}, split))
+            day += timedelta(days=1)
+        for outside in start - timedelta(days=1), end:
+            if self.name({self.split_field: outside}, split) in names:
+                raise ValueError(
+                    f'Files split by {split} cannot be refreshed for only part of their period'
+                )
+        return names
+
+    def raw_fields(self) -> frozenset[str]:
+        """
+        The fields of each item that must be decoded to export it, when items are otherwise
+        written exactly as Xero sent them.
+        """
+        fields = frozenset(self.latest_fields)
+        return fields if self.id_field is None else fields | {self.id_field}
+
+    def ids(self, manager: Any) -> Iterable[str]:
+        """
+        The IDs of all the items that currently exist in Xero, using summaries if possible.
+        """
+        assert self.id_field is not None
+        if self.summaries:
+            pages = self._paginate(manager, summaryOnly=True)
+            items: Iterable[dict[str, Any]] = (item for page in pages for item in page)
+        else:
+            items = self._raw_items(manager, latest=None)
+        return (item[self.id_field] for item in items)
+
+    def _since(self, latest: dict[str, int | datetime] | None) -> dict[str, Any]:
+        """
+        The filter that fetches only the items changed since the last export, if possible.
+        """
+        if latest is None or self.id_field is None or 'UpdatedDateUTC' not in latest:
+            return {}
+        return {'since': cast(datetime, latest['UpdatedDateUTC'])}
+
+    def _page_size(self, offset: int) -> int:
+        return self.page_size if self.sizer is None else self.sizer.at(offset)
+
+    def _attempt[T, **P](self, method: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """
+        Call a manager method, waiting if Xero says a rate limit has been exceeded and
+        recording how long the call took where calls are being retried.
+        """
+        if self.retries is None:
+            return retry_on_rate_limit(self.stop, method, *args, **kwargs)
+        self.retries.check()
+        started = monotonic()
+        result = retry_on_rate_limit(self.stop, method, *args, **kwargs)
+        self.retries.succeeded(monotonic() - started)
+        return result
+
+    async def _aattempt[T, **P](
+        self, method: Callable[P, Awaitable[T]], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        """
+        The equivalent of :meth:`_attempt` for an :class:`~xerotrust.aio.AsyncManager`.
+        """
+        if self.retries is None:
+            return await aretry_on_rate_limit(method, *args, **kwargs)
+        self.retries.check()
+        started = monotonic()
+        result = await aretry_on_rate_limit(method, *args, **kwargs)
+        self.retries.succeeded(monotonic() - started)
+        return result
+
+    def _delay(self, error: Exception, attempt: int) -> float | None:
+        """
+        How long to wait before retrying a call after an error, or ``None`` if it shouldn't be.
+        """
+        if self.retries is None or not transient(error):
+            return None
+        return self.retries.failed(error, attempt)
+
+    def _retry(self, error: Exception, attempt: int) -> bool:
+        delay = self._delay(error, attempt)
+        if delay is None:
+            return False
+        pause(delay, self.stop)
+        return True
+
+    async def _aretry(self, error: Exception, attempt: int) -> bool:
+        delay = self._delay(error, attempt)
+        if delay is None:
+            return False
+        await async_sleep(delay)
+        return True
+
+    def _call[T, **P](self, method: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """
+        Call a manager method, trying again after errors that are likely to pass.
+        """
+        attempt = 0
+        while True:
+            try:
+                return self._attempt(method, *args, **kwargs)
+            except Exception as e:
+                if not self._retry(e, attempt):
+                    raise
+                attempt += 1
+
+    async def _acall[T, **P](
+        self, method: Callable[P, Awaitable[T]], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        attempt = 0
+        while True:
+            try:
+                return await self._aattempt(method, *args, **kwargs)
+            except Exception as e:
+                if not await self._aretry(e, attempt):
+                    raise
+                attempt += 1
+
+    def _smaller(self, error: Exception) -> bool:
+        """
+        Whether to fetch a page again using smaller pages after an error.
+        """
+        if self.sizer is None or not transient(error) or not self.sizer.failed():
+            return False
+        logging.warning(
+            f'{type(error).__name__} fetching a page, trying again with pages of {self.sizer.size}'
+        )
+        return True
+
+    def _measure(self, manager: Any, received: int) -> None:
+        """
+        Adapt the page size to the full page just fetched, where the manager records how long
+        Xero took to respond and the number of bytes received.
+        """
+        latency = getattr(manager, 'latency', None)
+        if self.sizer is not None and latency is not None:
+            self.sizer.observe(latency, manager.received - received)
+
+    def _find_total(self, manager: Any) -> None:
+        """
+        Find the number of items to export from the pagination details of the page just
+        fetched, for managers that keep them.
+        """
+        if self.total is not None:
+            return
+        pagination = getattr(manager, 'metadata', {}).get('pagination')
+        if pagination is not None:
+            self.total = int(pagination['itemCount'])
+
+    def _last_page(self, manager: Any, page: int, count: int) -> bool:
+        """
+        Whether the page just fetched was the last one. Xero may return fewer items than were
+        asked for, so a short page isn't enough to tell; the pagination details are used where
+        the manager keeps them, otherwise paging carries on until a page is empty.
+        """
+        if not count:
+            return True
+        pagination = getattr(manager, 'metadata', {}).get('pagination') or {}
+        return 'pageCount' in pagination and page >= int(pagination['pageCount'])
+
+    def _paginate(self, manager: Any, **kwargs: Any) -> Iterable[list[dict[str, Any]]]:
+        offset = attempt = 0
+        while True:
+            size = self._page_size(offset)
+            received = getattr(manager, 'received', 0)
+            try:
+                entries = self._attempt(
+                    manager.filter, page=offset // size + 1, pageSize=size, **kwargs
+                )
+            except Exception as e:
+                # Smaller pages may avoid the error, otherwise wait and try again:
+                if self._smaller(e):
+                    continue
+                if not self._retry(e, attempt):
+                    raise
+                attempt += 1
+                continue
+            attempt = 0
+            if len(entries) == size:
+                self._measure(manager, received)
+            if entries:
+                yield entries
+            if self._last_page(manager, offset // size + 1, len(entries)):
+                break
+            offset += size
+
+    def _pages(
+        self, manager: Any, latest: dict[str, int | datetime] | None
+    ) -> Iterable[list[dict[str, Any]]]:
+        """
+        The items to export, a page at a time, so that only one page need be held in memory.
+        Endpoints that don't support paging will return everything as one page.
+        """
+        since = self._since(latest)
+        if self.existing is not None:
+            yield from self._changed_pages(manager)
+        elif self.paged:
+            for entries in self._paginate(manager, **since):
+                self._find_total(manager)
+                yield entries
+        elif since:
+            yield self._call(manager.filter, **since)
+        else:
+            yield self._call(manager.all)
+
+    def _changed_pages(self, manager: Any) -> Iterable[list[dict[str, Any]]]:
+        """
+        Fetch summaries of every item and then, in batches, fetch in full only those items
+        that are missing from or differ to the existing export.
+        """
+        assert self.existing is not None and self.id_field is not None
+        changed = [
+            item[self.id_field]
+            for page in self._paginate(manager, summaryOnly=True)
+            for item in page
+            if self.existing.get(item[self.id_field]) != updated(item)
+        ]
+        logging.info(f'{len(changed)} items differ to those exported')
+        for ids in batched(changed, ID_BATCH_SIZE):
+            yield self._call(manager.filter, IDs=list(ids), page=1, pageSize=len(ids))
+
+    async def _apaginate(self, manager: Any, **kwargs: Any) -> AsyncIterator[list[dict[str, Any]]]:
+        offset = attempt = 0
+        while True:
+            size = self._page_size(offset)
+            received = getattr(manager, 'received', 0)
+            try:
+                entries = await self._aattempt(
+                    manager.filter, page=offset // size + 1, pageSize=size, **kwargs
+                )
+            except Exception as e:
+                if self._smaller(e):
+                    continue
+                if not await self._aretry(e, attempt):
+                    raise
+                attempt += 1
+                continue
+            attempt = 0
+            if len(entries) == size:
+                self._measure(manager, received)
+            if entries:
+                yield entries
+            if self._last_page(manager, offset // size + 1, len(entries)):
+                break
+            offset += size
+
+    async def _apages(
+        self, manager: Any, latest: dict[str, int | datetime] | None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        The equivalent of :meth:`_pages` for an :class:`~xerotrust.aio.AsyncManager`.
+        """
+        since = self._since(latest)
+        if self.paged:
+            async for entries in self._apaginate(manager, **since):
+                self._find_total(manager)
+                yield entries
+        elif since:
+            yield await self._acall(manager.filter, **since)
+        else:
+            yield await self._acall(manager.all)
+
+    def _filters(self, latest: dict[str, int | datetime] | None) -> dict[str, Any] | None:
+        """
+        The filters to use when the items to export can be streamed from one request after
+        another, or ``None`` if whole pages are needed.
+        """
+        return None if self.existing is not None else self._since(latest)
+
+    def _stream(self, manager: Any, **kwargs: Any) -> Iterable[dict[str, Any]]:
+        """
+        The items to export, as they are parsed from each response.
+        """
+        if not self.paged:
+            yield from self._restarted(lambda: self._attempt(manager.stream, **kwargs))
+            return
+        # The offset of the first item in the page and of the next item to yield:
+        offset = position = attempt = 0
+        while True:
+            size = self._page_size(offset)
+            received = getattr(manager, 'received', 0)
+            count = 0
+            try:
+                entries = self._attempt(
+                    manager.stream, page=offset // size + 1, pageSize=size, **kwargs
+                )
+                for count, entry in enumerate(entries, start=1):
+                    self._find_total(manager)
+                    # A page fetched again after an error may start with items already yielded:
+                    if offset + count > position:
+                        position += 1
+                        yield entry
+            except Exception as e:
+                if self._smaller(e):
+                    continue
+                if not self._retry(e, attempt):
+                    raise
+                attempt += 1
+                continue
+            attempt = 0
+            if count == size:
+                self._measure(manager, received)
+            if self._last_page(manager, offset // size + 1, count):
+                break
+            offset += size
+
+    def _restarted(
+        self, stream: Callable[[], Iterable[dict[str, Any]]]
+    ) -> Iterable[dict[str, Any]]:
+        """
+        The items from a stream, starting it again after errors that are likely to pass and
+        skipping any items already yielded.
+        """
+        position = attempt = 0
+        while True:
+            try:
+                for count, entry in enumerate(stream(), start=1):
+                    if count > position:
+                        position += 1
+                        yield entry
+                return
+            except Exception as e:
+                if not self._retry(e, attempt):
+                    raise
+                attempt += 1
+
     def _raw_items(
         self, manager: Any, latest: dict[str, int | datetime] | None
     ) -> Iterable[dict[str, Any]]:
-        return retry_on_rate_limit(manager.all)
+        filters = self._filters(latest) if hasattr(manager, 'stream') else None
+        if filters is None:
+            for page in prefetch(self._pages(manager, latest), self.prefetch_depth):
+                yield from page
+        else:
+            # Fetch ahead by as many items as there would be in the pages prefetched:
+            depth = self.prefetch_depth * self.page_size
+            yield from prefetch(self._stream(manager, **filters), depth)
+
+    def _wanted(self, item: dict[str, Any], latest: dict[str, int | datetime] | None) -> bool:
+        if self.existing is not None:
+            return True
+        # If-Modified-Since is inclusive, so skip anything we already have:
+        since = self._since(latest).get('since')
+        return since is None or item['UpdatedDateUTC'] > since
+
+    def _observe(self, item: dict[str, Any]) -> None:
+        if self.latest is None:
+            self.latest = {}
+            for f in self.latest_fields:
+                latest_value = item.get(f)
+                if latest_value is not None:
+                    self.latest[f] = latest_value
+        else:
+            for latest_field in self.latest_fields:
+                latest_value = item.get(latest_field)
+                if latest_value is not None:
+                    current = self.latest.get(latest_field)
+                    self.latest[latest_field] = (
+                        latest_value if current is None else max(latest_value, current)
+                    )
 
     def items(
         self, manager: Any, latest: dict[str, int | datetime] | None
     ) -> Iterable[dict[str, Any]]:
-        self.latest = latest
+        self.latest = None if latest is None else dict(latest)
+        self.total = None
         for item in self._raw_items(manager, latest):
-            if self.latest is None:
-                self.latest = {}
-                for f in self.latest_fields:
-                    latest_value = item.get(f)
-                    if latest_value is not None:
-                        self.latest[f] = latest_value
-            else:
-                for latest_field in self.latest_fields:
-                    latest_value = item.get(latest_field)
-                    if latest_value is not None:
-                        self.latest[latest_field] = max(latest_value, self.latest[latest_field])
-            yield item
+            if self._wanted(item, latest):
+                self._observe(item)
+                yield item
+
+    async def aitems(
+        self, manager: Any, latest: dict[str, int | datetime] | None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        The equivalent of :meth:`items` for an :class:`~xerotrust.aio.AsyncManager`.
+        """
+        self.latest = None if latest is None else dict(latest)
+        self.total = None
+        async for page in self._apages(manager, latest):
+            for item in page:
+                if self._wanted(item, latest):
+                    self._observe(item)
+                    yield item
 
 
 @dataclass
@@ -147,93 +1110,254 @@ class StaticExport(Export):
     """Export class for endpoints that don't support incremental updates."""
 
     latest_fields: ClassVar[tuple[str, ...]] = ()
-    supports_update: ClassVar[bool] = False
+
+
+@dataclass
+class Windows:
+    """
+    Date windows from a start date up to today, the last of which is open ended.
+    The size of the windows adapts to the number of items found in earlier windows.
+    """
+
+    start: date
+    size: timedelta
+    max_items: int
+    end: date = field(default_factory=date.today)
+
+    def __iter__(self) -> Iterator[tuple[date, date | None]]:
+        start = self.start
+        while (end := start + self.size) <= self.end:
+            yield start, end
+            start = end
+        yield start, None
+
+    def observe(self, items: int) -> None:
+        if items > self.max_items:
+            self.size = timedelta(days=max(self.size.days // 2, 1))
+        elif items < self.max_items // 4:
+            self.size *= 2
+
+
+@dataclass
+class WindowedExport(Export):
+    """
+    Export class for large endpoints that, when more than one worker is used, are fetched as
+    many smaller windows of dates concurrently.
+    """
+
+    date_field: str = 'Date'
+    window: timedelta = timedelta(days=365)
+    max_window_items: int = 1000
+
+    paged: bool = True
+
+    def raw_fields(self) -> frozenset[str]:
+        return super().raw_fields() | {self.date_field}
+
+    def _pages(
+        self, manager: Any, latest: dict[str, int | datetime] | None
+    ) -> Iterable[list[dict[str, Any]]]:
+        if self.workers == 1 or self.existing is not None:
+            return super()._pages(manager, latest)
+        return self._windowed_pages(manager, self._since(latest))
+
+    def _windowed_pages(
+        self, manager: Any, since: dict[str, Any]
+    ) -> Iterable[list[dict[str, Any]]]:
+        first = self._call(
+            manager.filter, order=f'{self.date_field} ASC', page=1, pageSize=1, **since
+        )
+        if not first:
+            return
+        windows = Windows(first[0][self.date_field].date(), self.window, self.max_window_items)
+        window = partial(self._window, manager, since)
+        for pages in map_ordered(window, windows, self.workers):
+            windows.observe(sum(len(page) for page in pages))
+            yield from pages
+
+    def _filters(self, latest: dict[str, int | datetime] | None) -> dict[str, Any] | None:
+        return None if self.workers > 1 else super()._filters(latest)
+
+    def _window(
+        self, manager: Any, since: dict[str, Any], window: tuple[date, date | None]
+    ) -> list[list[dict[str, Any]]]:
+        start, end = window
+        kwargs = {f'{self.date_field}__gte': start, **since}
+        if end is not None:
+            kwargs[f'{self.date_field}__lt'] = end
+        return list(self._paginate(manager, **kwargs))
 
 
 @dataclass
 class JournalsExport(Export):
     latest_fields: ClassVar[tuple[str, ...]] = ('JournalDate', 'JournalNumber')
-    supports_update: ClassVar[bool] = True
+    split_field: ClassVar[str | None] = 'JournalDate'
+
+    # Xero always returns journals in pages of this size:
+    page_size: int = 100
+
+    @property
+    def supports_update(self) -> bool:
+        # Journals never change, so new ones are only ever appended:
+        return True
+
+    @property
+    def resumable(self) -> bool:
+        return True
+
+    def paths(self, path: Path) -> list[Path]:
+        return sorted(path.glob('journals*.jsonl'))
 
     def name(self, item: dict[str, Any], split: Split) -> str:
         pattern = f'journals{SplitSuffix[split]}.jsonl'
         return item['JournalDate'].strftime(pattern)  # type: ignore[no-any-return]
 
-    def _raw_items(
+    def items_within(self, manager: Any, start: date, end: date) -> Iterable[dict[str, Any]]:
+        # Journals can't be filtered by date, so all of them have to be fetched:
+        for entries in self._pages(manager, None):
+            for entry in entries:
+                if start <= entry['JournalDate'].date() < end:
+                    yield entry
+
+    def _pages(
         self, manager: Any, latest: dict[str, int | datetime] | None
-    ) -> Iterable[dict[str, Any]]:
-        offset = 0 if latest is None else latest.get('JournalNumber', 0)
-        while entries := retry_on_rate_limit(manager.filter, offset=offset):
-            yield from entries
+    ) -> Iterable[list[dict[str, Any]]]:
+        offset = 0 if latest is None else cast(int, latest.get('JournalNumber', 0))
+        if self.workers > 1:
+            highest = self._max_journal_number(manager, offset)
+            # Journal numbers are dense, so this is how many there are to export:
+            self.total = highest - offset
+            for entries in map_ordered(
+                partial(self._page, manager),
+                range(offset, highest, self.page_size),
+                self.workers,
+            ):
+                if entries:
+                    yield entries
+                    offset = entries[-1]['JournalNumber']
+        # Any journals not already exported above, possibly all of them:
+        while entries := self._call(manager.filter, offset=offset):
+            yield entries
             offset = entries[-1]['JournalNumber']
 
+    async def _apages(
+        self, manager: Any, latest: dict[str, int | datetime] | None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        offset = 0 if latest is None else cast(int, latest.get('JournalNumber', 0))
+        while entries := await self._acall(manager.filter, offset=offset):
+            yield entries
+            offset = entries[-1]['JournalNumber']
+
+    def _filters(self, latest: dict[str, int | datetime] | None) -> dict[str, Any] | None:
+        # Journals come in small pages where the offset of each depends on the last:
+        return None
+
+    def estimate(self, manager: Any, latest: dict[str, int | datetime] | None) -> int:
+        offset = 0 if latest is None else cast(int, latest.get('JournalNumber', 0))
+        journals = self._max_journal_number(manager, offset) - offset
+        # A page for each page_size journals and then an empty one to show there are no more:
+        return -(-journals // self.page_size) + 1
+
+    def numbered(self, manager: Any, numbers: Iterable[int]) -> Iterator[dict[str, Any]]:
+        """
+        The journals with the given numbers, fetched using as few pages as possible.
+        """
+        wanted = set(numbers)
+        offsets: list[int] = []
+        for number in sorted(wanted):
+            if not offsets or number > offsets[-1] + self.page_size:
+                offsets.append(number - 1)
+        for entries in map_ordered(partial(self._page, manager), offsets, self.workers):
+            for entry in entries:
+                if entry['JournalNumber'] in wanted:
+                    yield entry
+
+    def _page(self, manager: Any, offset: int) -> list[dict[str, Any]]:
+        """
+        The journals in a single page starting from the offset. Journals numbers are dense,
+        so this only returns those that won't also be returned by the page that follows it.
+        """
+        end = offset + self.page_size
+        entries = self._call(manager.filter, offset=offset)
+        return [e for e in entries if e['JournalNumber'] <= end]
+
+    def _max_journal_number(self, manager: Any, offset: int) -> int:
+        """
+        Find the highest JournalNumber using a small number of probes, doubling the offset
+        until there are no journals beyond it and then bisecting.
+        """
+        low, step = offset, self.page_size
+        while True:
+            entries = self._call(manager.filter, offset=low + step)
+            if not entries:
+                high = low + step
+                break
+            if len(entries) < self.page_size:
+                return cast(int, entries[-1]['JournalNumber'])
+            low += step
+            step *= 2
+        while high - low > self.page_size:
+            middle = (low + high) // 2
+            entries = self._call(manager.filter, offset=middle)
+            if not entries:
+                high = middle
+            elif len(entries) < self.page_size:
+                return cast(int, entries[-1]['JournalNumber'])
+            else:
+                low = middle
+        entries = self._call(manager.filter, offset=low)
+        return cast(int, entries[-1]['JournalNumber']) if entries else low
+
 
 @dataclass
 class BankTransactionsExport(Export):
     latest_fields: ClassVar[tuple[str, ...]] = ('UpdatedDateUTC',)
-    supports_update: ClassVar[bool] = True
+    split_field: ClassVar[str | None] = 'Date'
 
-    page_size: int = 1000
+    id_field: str | None = 'BankTransactionID'
+    index_name: str | None = 'transactions.index.json'
+    paged: bool = True
+    adaptive: bool = True
 
     def name(self, item: dict[str, Any], split: Split) -> str:
         pattern = f'transactions{SplitSuffix[split]}.jsonl'
         return item['Date'].strftime(pattern)  # type: ignore[no-any-return]
 
-    def _raw_items(
-        self, manager: Any, latest: dict[str, int | datetime] | None
-    ) -> Iterable[dict[str, Any]]:
-        page = 1
-        while True:
-            kwargs: dict[str, Any] = {'page': page, 'pageSize': self.page_size}
-            if latest is not None:
-                kwargs['since'] = cast(datetime, latest['UpdatedDateUTC'])
-            entries = retry_on_rate_limit(manager.filter, **kwargs)
-            if not entries:
-                break
-            yield from entries
-            page += 1
+    def items_within(self, manager: Any, start: date, end: date) -> Iterable[dict[str, Any]]:
+        for page in self._paginate(manager, Date__gte=start, Date__lt=end):
+            self._find_total(manager)
+            yield from page
 
-    def items(
-        self, manager: Any, latest: dict[str, int | datetime] | None
-    ) -> Iterable[dict[str, Any]]:
-        self.latest = latest
-        original_latest = cast(datetime, latest['UpdatedDateUTC']) if latest is not None else None
-        for item in self._raw_items(manager, latest):
-            if original_latest is not None and item['UpdatedDateUTC'] <= original_latest:
-                continue
-
-            if self.latest is None:
-                self.latest = {'UpdatedDateUTC': item['UpdatedDateUTC']}
-            else:
-                updated = item['UpdatedDateUTC']
-                self.latest['UpdatedDateUTC'] = max(updated, self.latest['UpdatedDateUTC'])
+    def paths(self, path: Path) -> list[Path]:
+        return sorted(path.glob('transactions*.jsonl'))
 
-            yield item
+    def raw_fields(self) -> frozenset[str]:
+        return super().raw_fields() | {'Date'}
 
 
 EXPORTS = {
-    'Accounts': Export("accounts.jsonl"),
-    'Contacts': Export("contacts.jsonl"),
+    'Accounts': Export("accounts.jsonl", id_field='AccountID'),
+    'Contacts': Export("contacts.jsonl", id_field='ContactID', paged=True, summaries=True),
     'Journals': JournalsExport(),
     'BankTransactions': BankTransactionsExport(),
-    'BankTransfers': Export("banktransfers.jsonl"),
-    'Invoices': Export("invoices.jsonl"),
-    'CreditNotes': Export("creditnotes.jsonl"),
-    'Currencies': StaticExport("currencies.jsonl"),
-    'Employees': Export("employees.jsonl"),
-    'Items': Export("items.jsonl"),
-    'ManualJournals': Export("manualjournals.jsonl"),
-    'Organisations': Export("organisations.jsonl"),
-    'Overpayments': Export("overpayments.jsonl"),
-    'Payments': Export("payments.jsonl"),
-    'Prepayments': Export("prepayments.jsonl"),
-    'PurchaseOrders': Export("purchaseorders.jsonl"),
+    'BankTransfers': Export("banktransfers.jsonl", id_field='BankTransferID'),
+    'Invoices': WindowedExport("invoices.jsonl", id_field='InvoiceID', summaries=True),
+    'CreditNotes': WindowedExport("creditnotes.jsonl", id_field='CreditNoteID'),
+    'Currencies': StaticExport("currencies.jsonl", max_age=DAILY),
+    'Employees': Export("employees.jsonl", id_field='EmployeeID'),
+    'Items': Export("items.jsonl", id_field='ItemID'),
+    'ManualJournals': Export("manualjournals.jsonl", id_field='ManualJournalID', paged=True),
+    'Organisations': Export("organisations.jsonl", max_age=DAILY),
+    'Overpayments': WindowedExport("overpayments.jsonl", id_field='OverpaymentID'),
+    'Payments': WindowedExport("payments.jsonl", id_field='PaymentID'),
+    'Prepayments': WindowedExport("prepayments.jsonl", id_field='PrepaymentID'),
+    'PurchaseOrders': Export("purchaseorders.jsonl", id_field='PurchaseOrderID', paged=True),
     'RepeatingInvoices': StaticExport("repeatinginvoices.jsonl"),
-    'TaxRates': StaticExport("taxrates.jsonl"),
-    'TrackingCategories': StaticExport("trackingcategories.jsonl"),
-    'Users': Export("users.jsonl"),
-    'BrandingThemes': Export("brandingthemes.jsonl"),
-    'ContactGroups': StaticExport("contactgroups.jsonl"),
-    'Quotes': Export("quotes.jsonl"),
-    'BatchPayments': Export("batchpayments.jsonl"),
+    'TaxRates': StaticExport("taxrates.jsonl", max_age=DAILY),
+    'TrackingCategories': StaticExport("trackingcategories.jsonl", max_age=DAILY),
+    'Users': Export("users.jsonl", id_field='UserID'),
+    'BrandingThemes': Export("brandingthemes.jsonl", max_age=DAILY),
+    'ContactGroups': StaticExport("contactgroups.jsonl", max_age=DAILY),
+    'Quotes': Export("quotes.jsonl", id_field='QuoteID', paged=True),
+    'BatchPayments': Export("batchpayments.jsonl", id_field='BatchPaymentID'),
 }
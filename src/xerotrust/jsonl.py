@@ -1,10 +1,10 @@
 import json
 from decimal import Decimal
 from pathlib import Path
-from typing import Iterable, Any
+from typing import Iterable, Any, Iterator
 
 
-def jsonl_stream(paths_or_globs: Iterable[Path | str]) -> Iterable[dict[str, Any]]:
+def expand(paths_or_globs: Iterable[Path | str]) -> Iterator[Path]:
     paths: Iterable[Path]
     for path_or_glob in paths_or_globs:
         if isinstance(path_or_glob, Path):
@@ -15,7 +15,11 @@ def jsonl_stream(paths_or_globs: Iterable[Path | str]) -> Iterable[dict[str, Any
                 paths = glob_path.parent.glob(glob_path.name)
             else:
                 paths = Path().glob(path_or_glob)
-        for path in sorted(paths):
-            with path.open() as source:
-                for line in source:
-                    yield json.loads(line, parse_float=Decimal)
+        yield from sorted(paths)
+
+
+def jsonl_stream(paths_or_globs: Iterable[Path | str]) -> Iterable[dict[str, Any]]:
+    for path in expand(paths_or_globs):
+        with path.open() as source:
+            for line in source:
+                yield json.loads(line, parse_float=Decimal)
@@ -1,26 +1,68 @@
+import asyncio
 import csv
 import json
 import logging
+import os
+import signal
 import time
 from collections import deque, defaultdict
-from datetime import date
+from copy import copy
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+from functools import partial
+from itertools import chain
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Any, Iterable
+from shutil import rmtree
+from threading import Event
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, TYPE_CHECKING
 
 import click
+from click.core import ParameterSource
 import enlighten
 from rich import box
 from rich.console import Console
 from rich.table import Table
 from xero import Xero
+from xero.auth import OAuth2Credentials
 
-from xerotrust.jsonl import jsonl_stream
+from xerotrust.jsonl import expand, jsonl_stream
 from .authentication import authenticate, credentials_from_file
-from .check import CHECKERS
-from .export import EXPORTS, FileManager, Split, LatestData
-from .reconcile import RECONCILERS, AccountTotals
+from .check import CHECKED_FIELDS, CHECKERS, checked_fields, missing_numbers
+from .client import DEFAULT_POOL_SIZE, Transport
+from .exceptions import DailyLimitExhausted, Interrupted, TenantUnavailable
+from .export import (
+    EXPORTS,
+    Checkpoints,
+    Export,
+    FileManager,
+    Freshness,
+    JournalsExport,
+    LatestData,
+    Refreshable,
+    Split,
+    merge,
+    unchanged,
+)
+from .ratelimit import RateLimiter, SharedBudget
+from .raw import passthrough
+from .reconcile import (
+    RECONCILERS,
+    AccountChange,
+    AccountTotals,
+    date_totals,
+    dump_totals,
+    load_totals,
+)
+from .plan import FULL, UPDATE, Estimate, History, fit
+from .retry import Retries, TenantRetries
+from .scheduler import Task, run_tasks
+from .seal import Seals
 from .transform import TRANSFORMERS, show
 
+if TYPE_CHECKING:
+    import httpx
+
 
 @click.group()
 @click.option(
@@ -138,6 +180,11 @@ def tenants(auth_path: Path, transform: tuple[str], field: tuple[str], newline:
 @click.option('--offset', type=int)
 @click.option('--page', type=int)
 @click.option('--page-size', type=int)
+@click.option(
+    '--count',
+    is_flag=True,
+    help='Show how many items there are, using the pagination details of a single item',
+)
 @click.pass_obj
 def explore(
     auth_path: Path,
@@ -148,35 +195,65 @@ def explore(
     field: tuple[str],
     newline: bool,
     id_: str | None,
+    count: bool,
     **filters: int | None,
 ) -> None:
     """Explore a specific Xero API endpoint."""
+    if count and (id_ or filters['page'] is not None or filters['page_size'] is not None):
+        raise click.ClickException('--count cannot be used with --id, --page or --page-size')
     credentials = credentials_from_file(auth_path)
     if tenant is None:
         credentials.set_default_tenant()
     else:
         credentials.tenant_id = tenant
-    xero = Xero(credentials)
-
-    manager = getattr(xero, endpoint.lower())
     items: Iterable[dict[str, Any]]
 
-    if id_:
-        items = manager.get(id_)
-    else:
-        filter_options = {
-            OPTION_TRANSFORMS.get(name, name): value
-            for (name, value) in filters.items()
-            if value is not None
-        }
-        if filter_options:
-            items = manager.filter(**filter_options)
+    with Transport() as transport:
+        manager = transport.manager(endpoint, credentials)
+        if count:
+            options = {name: value for name, value in filters.items() if value is not None}
+            total = manager.count(**options)
+            if total is None:
+                raise click.ClickException(f'{endpoint} does not say how many items it has')
+            click.echo(total)
+            return
+        if id_:
+            items = manager.get(id_)
         else:
-            items = manager.all()
+            filter_options = {
+                OPTION_TRANSFORMS.get(name, name): value
+                for (name, value) in filters.items()
+                if value is not None
+            }
+            if filter_options:
+                items = manager.filter(**filter_options)
+            else:
+                items = manager.all()
 
     show(items, transform, field, newline)
 
 
+def parse_window(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> tuple[date, date] | None:
+    """
+    Parse a month, or an inclusive range of months, into the first day of the first month
+    and the first day after the last month.
+    """
+    if value is None:
+        return None
+    first, _, last = value.partition('..')
+    try:
+        start = datetime.strptime(first, '%Y-%m').date()
+        end = datetime.strptime(last or first, '%Y-%m').date()
+    except ValueError:
+        raise click.BadParameter(f'Expected YYYY-MM or YYYY-MM..YYYY-MM, got: {value}', ctx, param)
+    end = (end + timedelta(days=31)).replace(day=1)
+    if end <= start:
+        raise click.BadParameter(f'{value} ends before it starts', ctx, param)
+    return start, end
+
+
 @cli.command()
 @click.argument(
     'endpoints',
@@ -209,6 +286,86 @@ def explore(
     default=False,
     help='Update the existing export where possible, rather than re-exporting and overwriting',
 )
+@click.option(
+    '--summary',
+    is_flag=True,
+    default=False,
+    help=(
+        'With --update, compare summaries of all contacts and invoices with the existing export '
+        'and only fetch in full those that differ'
+    ),
+)
+@click.option(
+    '--prune',
+    is_flag=True,
+    default=False,
+    help='With --update, remove records that no longer exist in Xero from the export',
+)
+@click.option(
+    '--plan',
+    is_flag=True,
+    help=(
+        "Estimate the calls each endpoint will need and export only those that fit within "
+        "each tenant's remaining daily budget, cheapest first"
+    ),
+)
+@click.option(
+    '--dry-run',
+    is_flag=True,
+    help='With --plan, show the plan without exporting anything',
+)
+@click.option(
+    '--force',
+    is_flag=True,
+    help='Fetch endpoints that rarely change even if they have been fetched recently',
+)
+@click.option(
+    '--window',
+    callback=parse_window,
+    metavar='YYYY-MM[..YYYY-MM]',
+    help=(
+        'Re-export only the journals and bank transactions dated in these months, replacing '
+        'just the files for them'
+    ),
+)
+@click.option(
+    '-j',
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=1,
+    help='The number of endpoints to export concurrently, shared fairly between tenants',
+)
+@click.option(
+    '-w',
+    '--workers',
+    type=click.IntRange(min=1),
+    default=1,
+    help='The number of concurrent requests to use within endpoints that support it',
+)
+@click.option(
+    '--prefetch',
+    type=click.IntRange(min=0),
+    default=1,
+    help='The number of pages to fetch ahead while earlier pages are being written',
+)
+@click.option(
+    '--raw',
+    is_flag=True,
+    help="Write records exactly as Xero sends them, rather than decoding and re-encoding them",
+)
+@click.option(
+    '--async',
+    'use_async',
+    is_flag=True,
+    help='Export all endpoints for all tenants at once using asyncio, needs xerotrust[async]',
+)
+@click.option(
+    '--shared-limits',
+    'shared_limits_path',
+    type=click.Path(path_type=Path, dir_okay=False),
+    envvar='XEROTRUST_SHARED_LIMITS',
+    help='A file used to share the rate limit budget with other xerotrust processes on this host',
+)
 @click.pass_obj
 def export(
     auth_path: Path,
@@ -217,10 +374,65 @@ def export(
     path: Path,
     split: Split,
     update: bool,
+    summary: bool,
+    prune: bool,
+    plan: bool,
+    dry_run: bool,
+    force: bool,
+    window: tuple[date, date] | None,
+    jobs: int,
+    workers: int,
+    prefetch: int,
+    raw: bool,
+    use_async: bool,
+    shared_limits_path: Path | None,
 ) -> None:
     """Export data from Xero API endpoints."""
-    credentials = credentials_from_file(auth_path)
-    xero = Xero(credentials)
+    if use_async and find_spec('httpx') is None:
+        raise click.ClickException('--async needs httpx, install xerotrust[async]')
+    if summary and not update:
+        raise click.ClickException('--summary can only be used with --update')
+    if prune and not update:
+        raise click.ClickException('--prune can only be used with --update')
+    if raw and update:
+        # Records as Xero sends them would be mixed with decoded ones already exported:
+        raise click.ClickException('--raw cannot be used with --update')
+    if use_async and (summary or prune):
+        raise click.ClickException('--summary and --prune cannot be used with --async')
+    # Everything is exported at once with --async, so these would have no effect:
+    context = click.get_current_context()
+    if use_async and any(
+        context.get_parameter_source(name) is ParameterSource.COMMANDLINE
+        for name in ('jobs', 'workers', 'prefetch')
+    ):
+        raise click.ClickException('--jobs, --workers and --prefetch cannot be used with --async')
+    if plan and (use_async or window is not None):
+        raise click.ClickException('--plan cannot be used with --async or --window')
+    if dry_run and not plan:
+        raise click.ClickException('--dry-run can only be used with --plan')
+    window_names: dict[str, set[str]] = {}
+    if window is not None:
+        if use_async or update:
+            raise click.ClickException('--window cannot be used with --update or --async')
+        if not endpoints:
+            endpoints = tuple(
+                e for e, exporter in EXPORTS.items() if isinstance(exporter, Refreshable)
+            )
+        for endpoint in endpoints:
+            if not isinstance(EXPORTS[endpoint], Refreshable):
+                raise click.ClickException(f'{endpoint} cannot be refreshed using --window')
+            try:
+                window_names[endpoint] = EXPORTS[endpoint].window_names(*window, split)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+    stop = Event()
+    limits_path = auth_path.with_suffix('.limits.json')
+    shared = None if shared_limits_path is None else SharedBudget(shared_limits_path)
+    limiter = RateLimiter.load(limits_path, shared=shared, stop=stop)
+    credentials = limiter.observed(credentials_from_file(auth_path))
+    history = History(auth_path.with_suffix('.history.json'))
+    retries = Retries()
+    retries_path = auth_path.with_suffix('.retries.json')
 
     all_tenant_data = {t["tenantId"]: t for t in credentials.get_tenants()}
     if not tenant_ids:
@@ -229,39 +441,536 @@ def export(
     if not endpoints:
         endpoints = EXPORTS.keys()
 
-    with FileManager(serializer=TRANSFORMERS['json']) as files:
-        for tenant_id in tenant_ids:
-            tenant_data = all_tenant_data[tenant_id]
-            tenant_name = tenant_data["tenantName"]
-            tenant_path = path / tenant_name
-            files.write(tenant_data, tenant_path / "tenant.json")
-            credentials.tenant_id = tenant_id
-
-            latest_path = tenant_path / "latest.json"
-            latest = LatestData.load(latest_path) if update else LatestData()
-
-            counter_manager = enlighten.get_manager()
-            for endpoint in endpoints:
-                try:
-                    manager = getattr(xero, endpoint.lower())
-                    exporter = EXPORTS[endpoint]
-                    counter = counter_manager.counter(
-                        desc=f'{tenant_name}: {endpoint}',
-                        unit='items exported',
+    counter_manager = enlighten.get_manager()
+    latest_data: dict[str, tuple[LatestData, Path, Checkpoints, Freshness]] = {}
+
+    def tenant_done(tenant_id: str) -> None:
+        latest, latest_path, checkpoints, freshness = latest_data[tenant_id]
+        # Refreshing a window leaves where the next update will start from unchanged:
+        if window is None:
+            latest.save(latest_path)
+            checkpoints.clear()
+            freshness.save()
+
+    def tenant_deferred(tenant_id: str, deferred: list[str]) -> None:
+        # The daily budget ran out, so what didn't finish goes first in a later run:
+        earlier = history.deferred(tenant_id)
+        history.defer(tenant_id, earlier + [e for e in deferred if e not in earlier])
+
+    def interrupt(signum: int, frame: Any) -> None:
+        if stop.is_set():
+            raise KeyboardInterrupt
+        logging.warning('Stopping once a checkpoint is saved, press Ctrl-C again to abort')
+        stop.set()
+
+    # Enough connections for every request that might be in flight at once:
+    transport = Transport(pool_size=max(jobs * workers, DEFAULT_POOL_SIZE))
+
+    previous_handler = signal.signal(signal.SIGINT, interrupt)
+    try:
+        with transport, FileManager(serializer=passthrough(TRANSFORMERS['json'])) as files:
+            tasks = []
+            async_tasks: dict[str, dict[str, Callable[..., Awaitable[None]]]] = {}
+            for tenant_id in tenant_ids:
+                tenant_data = all_tenant_data[tenant_id]
+                tenant_path = path / tenant_data["tenantName"]
+                files.write(tenant_data, tenant_path / "tenant.json")
+
+                # Each tenant needs its own credentials so tenants can be exported concurrently:
+                tenant_credentials = copy(credentials)
+                tenant_credentials.tenant_id = tenant_id
+
+                latest_path = tenant_path / "latest.json"
+                latest = LatestData.load(latest_path) if update else LatestData()
+                checkpoints = Checkpoints(tenant_path / "checkpoints.json")
+                freshness = Freshness(tenant_path / "fetched.json")
+                latest_data[tenant_id] = latest, latest_path, checkpoints, freshness
+
+                tenant_endpoints: Iterable[str] = endpoints
+                if plan:
+                    tenant_endpoints = plan_tenant(
+                        tenant_data["tenantName"],
+                        tenant_id,
+                        tenant_path,
+                        endpoints,
+                        transport,
+                        tenant_credentials,
+                        limiter,
+                        history,
+                        latest,
+                        freshness,
+                        update,
+                        force,
+                        dry_run,
                     )
-                    for row in counter(exporter.items(manager, latest=latest.pop(endpoint, None))):
-                        files.write(
-                            row,
-                            tenant_path / exporter.name(row, split),
-                            append=update and exporter.supports_update,
+
+                for endpoint in tenant_endpoints:
+                    description = f'{tenant_data["tenantName"]}: {endpoint}'
+                    raw_fields = EXPORTS[endpoint].raw_fields() if raw else None
+                    if use_async:
+                        async_tasks.setdefault(tenant_id, {})[endpoint] = partial(
+                            export_endpoint_async,
+                            endpoint,
+                            tenant_credentials,
+                            tenant_path,
+                            description,
+                            latest,
+                            checkpoints,
+                            freshness,
+                            files,
+                            counter_manager,
+                            split,
+                            update,
+                            force,
+                            raw_fields,
+                            stop,
+                            history,
+                            tenant_id,
+                            retries.tenant(tenant_id),
                         )
-                    if exporter.latest:
-                        latest[endpoint] = exporter.latest
-                    counter.refresh()
-                except Exception as e:
-                    e.add_note(f'while exporting {endpoint!r}')
-                    raise
-            latest.save(latest_path)
+                        continue
+                    manager = transport.manager(endpoint, tenant_credentials, raw_fields)
+                    if window is not None:
+                        tasks.append(
+                            Task(
+                                tenant_id,
+                                partial(
+                                    export_window,
+                                    endpoint,
+                                    limiter.wrap(manager, tenant_id),
+                                    tenant_path,
+                                    description,
+                                    files,
+                                    counter_manager,
+                                    split,
+                                    window,
+                                    window_names[endpoint],
+                                    workers,
+                                    stop,
+                                    retries.tenant(tenant_id),
+                                ),
+                                endpoint,
+                            )
+                        )
+                        continue
+                    tasks.append(
+                        Task(
+                            tenant_id,
+                            partial(
+                                export_endpoint,
+                                endpoint,
+                                limiter.wrap(manager, tenant_id),
+                                tenant_path,
+                                description,
+                                latest,
+                                checkpoints,
+                                freshness,
+                                files,
+                                counter_manager,
+                                split,
+                                update,
+                                force,
+                                summary,
+                                prune,
+                                workers,
+                                prefetch,
+                                stop,
+                                history,
+                                tenant_id,
+                                retries.tenant(tenant_id),
+                            ),
+                            endpoint,
+                        )
+                    )
+
+            if use_async and not dry_run:
+                asyncio.run(export_async(async_tasks, limiter, tenant_done, tenant_deferred))
+            elif not dry_run:
+                run_tasks(
+                    tasks, jobs, on_tenant_done=tenant_done, on_tenant_deferred=tenant_deferred
+                )
+    except Interrupted:
+        if window is not None:
+            raise click.ClickException('Export interrupted, files not yet refreshed are unchanged')
+        raise click.ClickException(
+            'Export interrupted, use --update to carry on from where it stopped'
+        )
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        # What was learned about the remaining budgets is kept even if the export failed, as
+        # are the calls made and any endpoints deferred, even for tenants with nothing to do:
+        limiter.save(limits_path)
+        history.save()
+        retries.save(retries_path)
+
+
+async def export_async(
+    tasks: dict[str, dict[str, Callable[..., Awaitable[None]]]],
+    limiter: RateLimiter,
+    on_tenant_done: Callable[[str], None],
+    on_tenant_deferred: Callable[[str, list[str]], None],
+) -> None:
+    """
+    Export all the endpoints for all the tenants at once on a single event loop, sharing one
+    pool of connections. The rate limiter still bounds the requests in flight for each tenant.
+    A tenant that becomes unavailable, or whose daily budget runs out, doesn't stop the others,
+    but is reported once they finish. Endpoints left unfinished by the budget running out are
+    passed to ``on_tenant_deferred``.
+    """
+    import httpx
+
+    unavailable: list[TenantUnavailable] = []
+    exhausted: list[DailyLimitExhausted] = []
+
+    async def export_tenant(tenant_id: str) -> None:
+        deferred: list[str] = []
+
+        async def export(endpoint: str, task: Callable[..., Awaitable[None]]) -> None:
+            try:
+                await task(client=client, limiter=limiter)
+            except DailyLimitExhausted as e:
+                deferred.append(endpoint)
+                exhausted.append(e)
+
+        try:
+            await asyncio.gather(*(export(e, task) for e, task in tasks[tenant_id].items()))
+        except TenantUnavailable as e:
+            unavailable.append(e)
+        else:
+            if deferred:
+                on_tenant_deferred(tenant_id, deferred)
+            else:
+                on_tenant_done(tenant_id)
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        await asyncio.gather(*(export_tenant(tenant_id) for tenant_id in tasks))
+    if unavailable:
+        raise unavailable[0]
+    if exhausted:
+        raise exhausted[0]
+
+
+def export_endpoint(
+    endpoint: str,
+    manager: Any,
+    tenant_path: Path,
+    description: str,
+    latest: LatestData,
+    checkpoints: Checkpoints,
+    freshness: Freshness,
+    files: FileManager,
+    counter_manager: enlighten.Manager,
+    split: Split,
+    update: bool,
+    force: bool,
+    summary: bool,
+    prune: bool,
+    workers: int,
+    prefetch: int,
+    stop: Event,
+    history: History,
+    tenant_id: str,
+    retries: TenantRetries,
+) -> None:
+    try:
+        # Exporters keep state while exporting, so each task needs its own:
+        exporter = replace(
+            EXPORTS[endpoint],
+            workers=workers,
+            prefetch_depth=prefetch,
+            page_size=page_size(endpoint, history, tenant_id),
+            retries=retries,
+            stop=stop,
+        )
+        append = update and exporter.supports_update
+        paths = partial(exporter.paths, tenant_path)
+        previous = latest.pop(endpoint, None)
+        if not (force or freshness.due(endpoint, exporter.max_age, paths())):
+            return skip_fresh(endpoint, latest, previous)
+        start = checkpoints.start(endpoint, paths(), previous, update)
+        if not append:
+            exporter.discard_index(tenant_path)
+        upsert = exporter.upsert(tenant_path) if append else None
+        if summary and exporter.summaries and upsert is not None:
+            exporter.existing = upsert.index.updated
+        counter = counter_manager.counter(desc=description, unit='items exported')
+        items: Iterable[dict[str, Any]] = counter(exporter.items(manager, latest=start))
+        if exporter.max_age is not None:
+            items = unless_unchanged(list(items), exporter, tenant_path, split, files, paths())
+        for count, row in enumerate(items, start=1):
+            # Gives an ETA once Xero has said how many items there are:
+            counter.total = exporter.total
+            row_path = tenant_path / exporter.name(row, split)
+            files.write(row, row_path, append=append)
+            if upsert is not None:
+                upsert.record(row, row_path)
+            if stop.is_set() or not count % exporter.page_size:
+                resume_from = exporter.latest if exporter.resumable else start
+                checkpoints.save(endpoint, resume_from, files, paths(), append)
+            if stop.is_set():
+                raise Interrupted()
+        if upsert is not None:
+            if prune:
+                # Every ID in Xero is held in memory, so this grows with the number of items:
+                current = set(exporter.ids(manager))
+                deleted = upsert.remove([i for i in upsert.index.entries if i not in current])
+                logging.info(f'{deleted} {endpoint} no longer exist in Xero')
+            files.close(upsert.written)
+            # The files are about to be rewritten, so sizes recorded earlier no longer apply:
+            checkpoints.discard(endpoint)
+            upsert.apply()
+        checkpoints.save(endpoint, exporter.latest, files, paths(), append)
+        checkpoints.finished(endpoint)
+        if exporter.latest:
+            latest[endpoint] = exporter.latest
+        if exporter.max_age is not None:
+            freshness.fetched(endpoint)
+        history.record(tenant_id, endpoint, UPDATE if append else FULL, manager.calls)
+        if exporter.sizer is not None:
+            history.record_page_size(tenant_id, endpoint, exporter.sizer.size)
+        counter.refresh()
+    except Exception as e:
+        e.add_note(f'while exporting {endpoint!r}')
+        raise
+
+
+def plan_tenant(
+    tenant_name: str,
+    tenant_id: str,
+    tenant_path: Path,
+    endpoints: Iterable[str],
+    transport: Transport,
+    credentials: OAuth2Credentials,
+    limiter: RateLimiter,
+    history: History,
+    latest: LatestData,
+    freshness: Freshness,
+    update: bool,
+    force: bool,
+    dry_run: bool,
+) -> list[str]:
+    """
+    Estimate the calls needed to export each endpoint for a tenant, from earlier exports where
+    possible and otherwise by probing Xero, show the plan and return the endpoints that fit
+    within the tenant's remaining daily budget in the order they should be exported.
+    """
+    estimates = []
+    for endpoint in endpoints:
+        exporter = EXPORTS[endpoint]
+        if not (force or freshness.due(endpoint, exporter.max_age, exporter.paths(tenant_path))):
+            estimates.append(Estimate(endpoint, 0, 'fresh'))
+            continue
+        mode = UPDATE if update and exporter.supports_update else FULL
+        calls = history.calls(tenant_id, endpoint, mode)
+        if calls is not None:
+            estimates.append(Estimate(endpoint, calls, 'history'))
+            continue
+        manager = limiter.wrap(transport.manager(endpoint, credentials), tenant_id)
+        start = latest.get(endpoint) if mode == UPDATE else None
+        calls = exporter.estimate(manager, start)
+        # Endpoints that aren't paged take a single call, so don't need probing:
+        estimates.append(Estimate(endpoint, calls, 'probe' if manager.calls else 'single page'))
+
+    remaining = limiter.remaining(tenant_id)
+    run, deferred = fit(estimates, remaining, history.deferred(tenant_id))
+
+    table = Table(
+        title=f'{tenant_name}: {sum(e.calls for e in run):,} of the {remaining:,} calls left today',
+        box=box.ROUNDED,
+    )
+    table.add_column('endpoint')
+    table.add_column('calls', justify='right')
+    table.add_column('estimated from')
+    table.add_column('action')
+    for group, action in (run, 'export'), (deferred, 'defer'):
+        for estimate in group:
+            table.add_row(estimate.endpoint, f'{estimate.calls:,}', estimate.source, action)
+    Console().print(table)
+
+    if not dry_run:
+        for estimate in deferred:
+            logging.warning(f'{tenant_name}: deferring {estimate.endpoint} to a later run')
+        history.defer(tenant_id, [e.endpoint for e in deferred])
+    return [e.endpoint for e in run]
+
+
+def page_size(endpoint: str, history: History, tenant_id: str) -> int:
+    """
+    The size of page to start with, which for endpoints whose pages adapt in size is the size
+    the last export ended up using.
+    """
+    exporter = EXPORTS[endpoint]
+    size = history.page_size(tenant_id, endpoint) if exporter.adaptive else None
+    return exporter.page_size if size is None else size
+
+
+def skip_fresh(endpoint: str, latest: LatestData, previous: dict[str, Any] | None) -> None:
+    logging.info(f'{endpoint} was fetched recently enough, skipping')
+    if previous:
+        latest[endpoint] = previous
+
+
+def unless_unchanged(
+    rows: list[dict[str, Any]],
+    exporter: Export,
+    tenant_path: Path,
+    split: Split,
+    files: FileManager,
+    paths: list[Path],
+) -> list[dict[str, Any]]:
+    """
+    The rows to write for an endpoint that rarely changes, which are none at all if they are
+    exactly what was exported before, so that its files are left untouched.
+    """
+    lines: dict[Path, list[str]] = {}
+    for row in rows:
+        lines.setdefault(tenant_path / exporter.name(row, split), []).append(files.serializer(row))
+    if rows and unchanged(lines, paths):
+        logging.info(f'{", ".join(str(p) for p in paths)} unchanged, leaving as is')
+        return []
+    return rows
+
+
+def export_window(
+    endpoint: str,
+    manager: Any,
+    tenant_path: Path,
+    description: str,
+    files: FileManager,
+    counter_manager: enlighten.Manager,
+    split: Split,
+    window: tuple[date, date],
+    names: set[str],
+    workers: int,
+    stop: Event,
+    retries: TenantRetries,
+) -> None:
+    """
+    Re-export the items dated within the window into a staging directory and then move each
+    file into place, so that readers only ever see complete files and no others are touched.
+    """
+    try:
+        exporter = replace(EXPORTS[endpoint], workers=workers, retries=retries, stop=stop)
+        assert isinstance(exporter, Refreshable) and exporter.split_field is not None
+        # Files for periods that can no longer change in Xero are left as they are:
+        seals = Seals()
+        sealed = {name for name in names if seals.sealed(tenant_path / name)}
+        names = names - sealed
+        start, end = window
+        while start < end and exporter.name({exporter.split_field: start}, split) in sealed:
+            start += timedelta(days=1)
+        if start == end:
+            logging.info(f'{endpoint} files in the window are all sealed, nothing to refresh')
+            return
+        staging = tenant_path / f'.{endpoint.lower()}.staging'
+        # Anything left by an earlier refresh that was interrupted:
+        rmtree(staging, ignore_errors=True)
+        staged = set()
+        counter = counter_manager.counter(desc=description, unit='items exported')
+        for row in counter(exporter.items_within(manager, start, end)):
+            counter.total = exporter.total
+            path = staging / exporter.name(row, split)
+            files.write(row, path)
+            staged.add(path)
+            if stop.is_set():
+                raise Interrupted()
+        files.close(staged)
+        for path in exporter.paths(tenant_path):
+            if path.name in names and staging / path.name not in staged:
+                logging.info(f'removing {path}, nothing is now dated within it')
+                path.unlink()
+        for path in sorted(staged):
+            os.replace(path, tenant_path / path.name)
+        if staging.exists():
+            staging.rmdir()
+        # Items may have moved between files, so the index also needs bringing up to date:
+        upsert = exporter.upsert(tenant_path)
+        if upsert is not None:
+            upsert.apply()
+        counter.refresh()
+    except Exception as e:
+        e.add_note(f'while exporting {endpoint!r}')
+        raise
+
+
+async def export_endpoint_async(
+    endpoint: str,
+    credentials: OAuth2Credentials,
+    tenant_path: Path,
+    description: str,
+    latest: LatestData,
+    checkpoints: Checkpoints,
+    freshness: Freshness,
+    files: FileManager,
+    counter_manager: enlighten.Manager,
+    split: Split,
+    update: bool,
+    force: bool,
+    raw_fields: frozenset[str] | None,
+    stop: Event,
+    history: History,
+    tenant_id: str,
+    retries: TenantRetries,
+    client: 'httpx.AsyncClient',
+    limiter: RateLimiter,
+) -> None:
+    from .aio import AsyncXero
+
+    try:
+        manager = AsyncXero(credentials, client, limiter).manager(endpoint, raw_fields)
+        exporter = replace(
+            EXPORTS[endpoint], page_size=page_size(endpoint, history, tenant_id), retries=retries
+        )
+        append = update and exporter.supports_update
+        paths = partial(exporter.paths, tenant_path)
+        previous = latest.pop(endpoint, None)
+        if not (force or freshness.due(endpoint, exporter.max_age, paths())):
+            return skip_fresh(endpoint, latest, previous)
+        start = checkpoints.start(endpoint, paths(), previous, update)
+        if not append:
+            exporter.discard_index(tenant_path)
+        upsert = exporter.upsert(tenant_path) if append else None
+        counter = counter_manager.counter(desc=description, unit='items exported')
+        count = 0
+        items = exporter.aitems(manager, latest=start)
+        if exporter.max_age is not None:
+            rows = [row async for row in items]
+            items = aiterate(unless_unchanged(rows, exporter, tenant_path, split, files, paths()))
+        async for row in items:
+            counter.total = exporter.total
+            row_path = tenant_path / exporter.name(row, split)
+            files.write(row, row_path, append=append)
+            if upsert is not None:
+                upsert.record(row, row_path)
+            counter.update()
+            count += 1
+            if stop.is_set() or not count % exporter.page_size:
+                resume_from = exporter.latest if exporter.resumable else start
+                checkpoints.save(endpoint, resume_from, files, paths(), append)
+            if stop.is_set():
+                raise Interrupted()
+        if upsert is not None:
+            files.close(upsert.written)
+            checkpoints.discard(endpoint)
+            upsert.apply()
+        checkpoints.save(endpoint, exporter.latest, files, paths(), append)
+        checkpoints.finished(endpoint)
+        if exporter.latest:
+            latest[endpoint] = exporter.latest
+        if exporter.max_age is not None:
+            freshness.fetched(endpoint)
+        history.record(tenant_id, endpoint, UPDATE if append else FULL, manager.calls)
+        if exporter.sizer is not None:
+            history.record_page_size(tenant_id, endpoint, exporter.sizer.size)
+        counter.refresh()
+    except Exception as e:
+        e.add_note(f'while exporting {endpoint!r}')
+        raise
+
+
+async def aiterate[T](items: Iterable[T]) -> AsyncIterator[T]:
+    for item in items:
+        yield item
 
 
 @cli.command()
@@ -272,20 +981,114 @@ def export(
     nargs=-1,
     required=True,
 )
-def check(endpoint: str, paths: tuple[Path, ...]) -> None:
+@click.option(
+    '--repair',
+    is_flag=True,
+    help='Fetch any missing journals from Xero and add them to the files they belong in',
+)
+@click.option(
+    '--split',
+    type=click.Choice(Split, case_sensitive=False),
+    default=Split.MONTHS,
+    help='How the files being repaired are split',
+)
+@click.option(
+    '-w',
+    '--workers',
+    type=click.IntRange(min=1),
+    default=1,
+    help='The number of concurrent requests to use when repairing',
+)
+@click.pass_obj
+def check(
+    auth_path: Path,
+    endpoint: str,
+    paths: tuple[Path, ...],
+    repair: bool,
+    split: Split,
+    workers: int,
+) -> None:
     """Check exported data for issues."""
 
     endpoint_lower = endpoint.lower()
     if endpoint_lower not in CHECKERS:
         raise click.ClickException(f'Unsupported endpoint: {endpoint}')
 
-    stream = jsonl_stream(paths)
+    if repair:
+        if endpoint_lower != 'journals':
+            raise click.ClickException('Only journals can be repaired')
+        paths += tuple(repair_journals(auth_path, paths, split, workers))
+
+    seals = Seals()
+    fields = CHECKED_FIELDS[endpoint_lower]
+
+    def items(path: Path) -> Iterable[dict[str, Any]]:
+        if seals.sealed(path):
+            return seals.cached(  # type: ignore[no-any-return]
+                path, f'check {endpoint_lower}', lambda p: checked_fields(jsonl_stream([p]), fields)
+            )
+        return jsonl_stream([path])
+
+    stream: Iterable[dict[str, Any]] = chain.from_iterable(map(items, paths))
     steps = CHECKERS[endpoint_lower]
     for step in steps:
         stream = step(stream)
 
     # Consume the final stream to run the checks:
-    deque(stream, maxlen=0)
+    try:
+        deque(stream, maxlen=0)
+    finally:
+        seals.save()
+
+
+def repair_journals(
+    auth_path: Path, paths: tuple[Path, ...], split: Split, workers: int
+) -> list[Path]:
+    """
+    Fetch the journals missing from those in the given files, which must all be in the same
+    tenant directory, and merge them into the files they belong in. Returns any files that
+    had to be created.
+    """
+    directories = {path.parent for path in paths}
+    if len(directories) != 1:
+        raise click.ClickException('Only the journals for one tenant can be repaired at once')
+    (directory,) = directories
+    tenant_path = directory / 'tenant.json'
+    if not tenant_path.exists():
+        raise click.ClickException(f'{tenant_path} is needed to repair journals')
+    tenant_id = json.loads(tenant_path.read_text())['tenantId']
+
+    numbers = missing_numbers(
+        number
+        for journal in jsonl_stream(paths)
+        if isinstance(number := journal.get('JournalNumber'), int)
+    )
+    if not numbers:
+        return []
+
+    limits_path = auth_path.with_suffix('.limits.json')
+    limiter = RateLimiter.load(limits_path)
+    credentials = limiter.observed(credentials_from_file(auth_path))
+    credentials.tenant_id = tenant_id
+    exporter = JournalsExport(workers=workers)
+    recovered: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    try:
+        with Transport(pool_size=max(workers, DEFAULT_POOL_SIZE)) as transport:
+            manager = limiter.wrap(transport.manager('Journals', credentials), tenant_id)
+            for journal in exporter.numbered(manager, numbers):
+                recovered[exporter.name(journal, split)].append(journal)
+    finally:
+        limiter.save(limits_path)
+
+    created = []
+    for name, journals in sorted(recovered.items()):
+        path = directory / name
+        if not path.exists():
+            created.append(path)
+        merge(path, journals, 'JournalNumber', TRANSFORMERS['json'])
+    count = sum(len(journals) for journals in recovered.values())
+    print(f'Recovered {count} of {len(numbers)} missing journals')
+    return created
 
 
 class KeyValueType(click.ParamType):
@@ -328,17 +1131,31 @@ def reconcile(
     source_date_totals: list[defaultdict[date, AccountTotals]] = []
     source_account_totals: list[AccountTotals] = []
     endpoints = []
+    seals = Seals()
     for endpoint, glob in sources:
         reconciler = RECONCILERS[endpoint.lower()]
-        date_totals = defaultdict[date, AccountTotals](AccountTotals)
+        totals = defaultdict[date, AccountTotals](AccountTotals)
         account_totals = AccountTotals()
-        for item in jsonl_stream([glob]):
-            for change in reconciler.parse(item):
-                date_totals[reconciler.date(item)].add(change)
-                account_totals.add(change)
-        source_date_totals.append(date_totals)
+        for path in expand([glob]):
+            if seals.sealed(path):
+                path_totals = load_totals(
+                    seals.cached(
+                        path,
+                        f'reconcile {endpoint.lower()}',
+                        lambda p: dump_totals(date_totals(reconciler, jsonl_stream([p]))),
+                    )
+                )
+            else:
+                path_totals = date_totals(reconciler, jsonl_stream([path]))
+            for day, day_totals in path_totals.items():
+                for total in day_totals.values():
+                    change = AccountChange(total.name, total.type, total.code, total.total)
+                    totals[day].add(change)
+                    account_totals.add(change)
+        source_date_totals.append(totals)
         source_account_totals.append(account_totals)
         endpoints.append(endpoint)
+    seals.save()
 
     a_data, b_data = source_date_totals
 
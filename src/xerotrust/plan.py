@@ -0,0 +1,84 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterable
+
+FULL = 'full'
+UPDATE = 'update'
+
+
+class History:
+    """
+    The number of calls made by the last export of each endpoint for each tenant, kept
+    separately for full exports and updates, along with any endpoints that were deferred
+    because they didn't fit in a tenant's daily budget and the page sizes that endpoints
+    whose pages adapt in size ended up using.
+    Safe to update from multiple threads.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._data: dict[str, dict[str, Any]] = (
+            json.loads(path.read_text()) if path.exists() else {}
+        )
+        self._lock = Lock()
+
+    def calls(self, tenant_id: str, endpoint: str, mode: str) -> int | None:
+        with self._lock:
+            calls = self._data.get(tenant_id, {}).get('calls', {})
+            return calls.get(endpoint, {}).get(mode)  # type: ignore[no-any-return]
+
+    def record(self, tenant_id: str, endpoint: str, mode: str, calls: int) -> None:
+        with self._lock:
+            tenant = self._data.setdefault(tenant_id, {})
+            tenant.setdefault('calls', {}).setdefault(endpoint, {})[mode] = calls
+
+    def deferred(self, tenant_id: str) -> list[str]:
+        with self._lock:
+            return list(self._data.get(tenant_id, {}).get('deferred', []))
+
+    def defer(self, tenant_id: str, endpoints: list[str]) -> None:
+        with self._lock:
+            self._data.setdefault(tenant_id, {})['deferred'] = endpoints
+
+    def page_size(self, tenant_id: str, endpoint: str) -> int | None:
+        with self._lock:
+            sizes = self._data.get(tenant_id, {}).get('page_size', {})
+            return sizes.get(endpoint)  # type: ignore[no-any-return]
+
+    def record_page_size(self, tenant_id: str, endpoint: str, size: int) -> None:
+        with self._lock:
+            self._data.setdefault(tenant_id, {}).setdefault('page_size', {})[endpoint] = size
+
+    def save(self) -> None:
+        with self._lock:
+            if self._data:
+                self.path.write_text(json.dumps(self._data, indent=2, sort_keys=True))
+
+
+@dataclass
+class Estimate:
+    endpoint: str
+    calls: int
+    # Where the estimate came from, such as the history of earlier exports or probing Xero:
+    source: str
+
+
+def fit(
+    estimates: Iterable[Estimate], remaining: int, deferred: Iterable[str] = ()
+) -> tuple[list[Estimate], list[Estimate]]:
+    """
+    Order the estimates so that endpoints deferred by an earlier run come first, followed by
+    the cheapest, and split them into those that fit within the remaining budget and those
+    that must wait for a later run.
+    """
+    earlier = set(deferred)
+    run, later = [], []
+    for estimate in sorted(estimates, key=lambda e: (e.endpoint not in earlier, e.calls)):
+        if estimate.calls <= remaining:
+            run.append(estimate)
+            remaining -= estimate.calls
+        else:
+            later.append(estimate)
+    return run, later
@@ -0,0 +1,403 @@
+import asyncio
+import json
+import logging
+import sys
+from contextlib import contextmanager
+from copy import copy
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from functools import partial
+from pathlib import Path
+from threading import BoundedSemaphore, Event, Lock
+from time import monotonic, sleep, time
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Self, IO, TYPE_CHECKING
+
+from requests import PreparedRequest, Response
+from requests.auth import AuthBase
+from xero.auth import OAuth2Credentials
+
+from .exceptions import DailyLimitExhausted, Interrupted
+
+if TYPE_CHECKING:
+    import httpx
+
+if sys.platform == 'win32':  # pragma: no cover
+    import msvcrt
+
+    def _lock(file: IO[str]) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock(file: IO[str]) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _lock(file: IO[str]) -> None:
+        fcntl.flock(file, fcntl.LOCK_EX)
+
+    def _unlock(file: IO[str]) -> None:
+        fcntl.flock(file, fcntl.LOCK_UN)
+
+
+# Xero's documented limits, see https://developer.xero.com/documentation/guides/oauth2/limits/
+MAX_IN_FLIGHT = 5
+MINUTE_LIMIT = 60
+DAY_LIMIT = 5000
+APP_MINUTE_LIMIT = 10_000
+
+MINUTE = 60
+DAY = 24 * 60 * 60
+
+
+@dataclass
+class TokenBucket:
+    """
+    A budget of calls that refills at a steady rate, up to its capacity,
+    over the given period in seconds.
+    """
+
+    capacity: int
+    period: float
+    tokens: float = -1
+    updated: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.tokens < 0:
+            self.tokens = self.capacity
+
+    def _refill(self, now: float) -> None:
+        if self.updated is not None:
+            elapsed = max(now - self.updated, 0)
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / self.period)
+        self.updated = now
+
+    def wait(self, now: float) -> float:
+        """The number of seconds until a call can be made."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) * self.period / self.capacity
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def cap(self, remaining: int, now: float) -> None:
+        """Make sure we never think there's more left than Xero says there is."""
+        self._refill(now)
+        self.tokens = min(self.tokens, remaining)
+
+
+@dataclass
+class TenantBudget:
+    in_flight: BoundedSemaphore
+    minute: TokenBucket
+    day: TokenBucket
+    # When Xero last told us how much of the daily limit was left:
+    day_observed: datetime | None = None
+
+
+def pause(seconds: float, stop: Event | None = None) -> None:
+    """
+    Wait for the given number of seconds, raising :class:`~xerotrust.exceptions.Interrupted`
+    straight away if ``stop`` is set in the meantime.
+    """
+    if stop is None:
+        sleep(seconds)
+    elif stop.wait(seconds):
+        raise Interrupted()
+
+
+class RateLimiter:
+    """
+    Spends Xero's API call budget ahead of time, rather than waiting for
+    the API to respond with a 429.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        minute_limit: int = MINUTE_LIMIT,
+        day_limit: int = DAY_LIMIT,
+        app_minute_limit: int = APP_MINUTE_LIMIT,
+        clock: Callable[[], float] | None = None,
+        shared: 'SharedBudget | None' = None,
+        stop: Event | None = None,
+    ) -> None:
+        self.max_in_flight = max_in_flight
+        self.minute_limit = minute_limit
+        self.day_limit = day_limit
+        # Budgets shared between processes need a clock that all the processes agree on:
+        self.clock = clock or (time if shared else monotonic)
+        self.shared = shared
+        # Set when an export is asked to stop, so that waiting for the budget can stop too:
+        self.stop = stop
+        self.app_minute = TokenBucket(app_minute_limit, MINUTE)
+        self._tenants: dict[str, TenantBudget] = {}
+        self._async_in_flight: dict[str, asyncio.Semaphore] = {}
+        self._lock = Lock()
+
+    def budget(self, tenant_id: str) -> TenantBudget:
+        with self._lock:
+            budget = self._tenants.get(tenant_id)
+            if budget is None:
+                budget = self._tenants[tenant_id] = TenantBudget(
+                    in_flight=BoundedSemaphore(self.max_in_flight),
+                    minute=TokenBucket(self.minute_limit, MINUTE),
+                    day=TokenBucket(self.day_limit, DAY),
+                )
+            return budget
+
+    @contextmanager
+    def _buckets(self, tenant_id: str, budget: TenantBudget) -> Iterator[float]:
+        """
+        Make changes to the buckets for a tenant, synchronised with any other processes
+        sharing the budget, yielding the current time.
+        """
+        with self._lock:
+            if self.shared is None:
+                yield self.clock()
+            else:
+                buckets = {
+                    f'{tenant_id}:minute': budget.minute,
+                    f'{tenant_id}:day': budget.day,
+                    'app:minute': self.app_minute,
+                }
+                with self.shared.synchronised(buckets):
+                    yield self.clock()
+
+    def _take(self, tenant_id: str, budget: TenantBudget) -> float:
+        """
+        Spend one call from the tenant's budget, returning zero, or return the number of
+        seconds to wait before trying again.
+        """
+        with self._buckets(tenant_id, budget) as now:
+            if budget.day.wait(now):
+                raise DailyLimitExhausted(
+                    f'Daily API limit for tenant {tenant_id} has been used up'
+                )
+            delay = max(budget.minute.wait(now), self.app_minute.wait(now))
+            if not delay:
+                for bucket in budget.minute, budget.day, self.app_minute:
+                    bucket.take(now)
+        if delay:
+            logging.info(f'Rate limiting {tenant_id}, waiting {delay:.1f} seconds')
+        return delay
+
+    def remaining(self, tenant_id: str) -> int:
+        """
+        The number of calls left in the tenant's daily budget.
+        """
+        budget = self.budget(tenant_id)
+        with self._buckets(tenant_id, budget) as now:
+            budget.day._refill(now)
+            return int(budget.day.tokens)
+
+    def acquire(self, tenant_id: str) -> None:
+        budget = self.budget(tenant_id)
+        budget.in_flight.acquire()
+        try:
+            while delay := self._take(tenant_id, budget):
+                pause(delay, self.stop)
+        except BaseException:
+            budget.in_flight.release()
+            raise
+
+    def release(self, tenant_id: str) -> None:
+        self.budget(tenant_id).in_flight.release()
+
+    def call[T, **P](
+        self, tenant_id: str, method: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> T:
+        self.acquire(tenant_id)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.release(tenant_id)
+
+    async def acall[T, **P](
+        self,
+        tenant_id: str,
+        method: Callable[P, Awaitable[T]],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> T:
+        """
+        The :mod:`asyncio` equivalent of :meth:`call`, waiting without blocking the event loop.
+        """
+        budget = self.budget(tenant_id)
+        semaphore = self._async_in_flight.setdefault(
+            tenant_id, asyncio.Semaphore(self.max_in_flight)
+        )
+        async with semaphore:
+            while delay := self._take(tenant_id, budget):
+                await asyncio.sleep(delay)
+            return await method(*args, **kwargs)
+
+    def observe(self, response: 'Response | httpx.Response', **kwargs: Any) -> None:
+        """
+        A :mod:`requests` response hook that learns the remaining limits from Xero's
+        response headers. :mod:`httpx` responses can also be passed.
+        """
+        tenant_id = response.request.headers.get('Xero-tenant-id')
+        if tenant_id is None:
+            return
+        if isinstance(tenant_id, bytes):
+            tenant_id = tenant_id.decode()
+        budget = self.budget(tenant_id)
+        headers = response.headers
+        with self._buckets(tenant_id, budget) as now:
+            for header, bucket in (
+                ('X-MinLimit-Remaining', budget.minute),
+                ('X-DayLimit-Remaining', budget.day),
+                ('X-AppMinLimit-Remaining', self.app_minute),
+            ):
+                remaining = headers.get(header)
+                if remaining is not None:
+                    bucket.cap(int(remaining), now)
+                    if bucket is budget.day:
+                        budget.day_observed = datetime.now(UTC)
+
+    def observed(self, credentials: OAuth2Credentials) -> OAuth2Credentials:
+        """
+        Return a copy of the credentials where every response is observed by this limiter.
+        """
+        credentials = copy(credentials)
+        credentials._oauth = ObservedAuth(credentials.oauth, self)
+        return credentials
+
+    def wrap(self, manager: Any, tenant_id: str) -> 'LimitedManager':
+        return LimitedManager(manager, self, tenant_id)
+
+    @classmethod
+    def load(cls, path: Path, **kwargs: Any) -> Self:
+        instance = cls(**kwargs)
+        if path.exists():
+            now = datetime.now(UTC)
+            for tenant_id, data in json.loads(path.read_text()).items():
+                observed = datetime.fromisoformat(data['observed'])
+                budget = instance.budget(tenant_id)
+                budget.day_observed = observed
+                budget.day.tokens = data['remaining']
+                # The daily limit is a rolling window, so allow for the time that has passed:
+                budget.day.updated = instance.clock() - (now - observed).total_seconds()
+        return instance
+
+    def save(self, path: Path) -> None:
+        data = {}
+        with self._lock:
+            now = self.clock()
+            for tenant_id, budget in sorted(self._tenants.items()):
+                if budget.day_observed is not None:
+                    budget.day._refill(now)
+                    data[tenant_id] = {
+                        'remaining': int(budget.day.tokens),
+                        'observed': datetime.now(UTC).isoformat(),
+                    }
+        if data:
+            path.write_text(json.dumps(data, indent=2))
+
+
+@dataclass
+class SharedBudget:
+    """
+    Token bucket state shared between processes on one host, such as several exports
+    run from cron using the same Xero app, through a locked file.
+    """
+
+    path: Path
+
+    @contextmanager
+    def synchronised(self, buckets: dict[str, TokenBucket]) -> Iterator[None]:
+        """
+        Update the buckets from the shared state, hold the lock while the caller changes them
+        and then write them back.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('a+', encoding='utf-8') as file:
+            _lock(file)
+            try:
+                file.seek(0)
+                content = file.read()
+                state = json.loads(content) if content else {}
+                for name, bucket in buckets.items():
+                    if name in state:
+                        bucket.tokens, bucket.updated = state[name]
+                yield
+                for name, bucket in buckets.items():
+                    state[name] = [bucket.tokens, bucket.updated]
+                file.seek(0)
+                file.truncate()
+                file.write(json.dumps(state))
+                file.flush()
+            finally:
+                _unlock(file)
+
+
+@dataclass
+class ObservedAuth(AuthBase):
+    """
+    Wraps the auth used by pyxero so that a :class:`RateLimiter` sees every response.
+    """
+
+    auth: AuthBase
+    limiter: RateLimiter
+
+    def __call__(self, request: PreparedRequest) -> PreparedRequest:
+        request = self.auth(request)
+        request.register_hook('response', self.limiter.observe)
+        return request
+
+
+@dataclass
+class LimitedManager:
+    """
+    A proxy for a pyxero manager where every call is made through a :class:`RateLimiter`.
+    """
+
+    manager: Any
+    limiter: RateLimiter
+    tenant_id: str
+    # The number of calls made through this manager:
+    calls: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.manager, name)
+        if name == 'stream':
+            return partial(self._stream, attr)
+        if callable(attr):
+            return partial(self._call, attr)
+        return attr
+
+    def _call(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        result = self.limiter.call(self.tenant_id, method, *args, **kwargs)
+        with self._lock:
+            self.calls += 1
+        return result
+
+    def _stream(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Iterator[Any]:
+        """
+        Start streaming items, keeping the call in flight until the response has been read,
+        which relies on the items being iterated over straight away.
+        """
+        self.limiter.acquire(self.tenant_id)
+        try:
+            items = method(*args, **kwargs)
+        except BaseException:
+            self.limiter.release(self.tenant_id)
+            raise
+        with self._lock:
+            self.calls += 1
+        return self._released(items)
+
+    def _released(self, items: Iterable[Any]) -> Iterator[Any]:
+        try:
+            yield from items
+        finally:
+            self.limiter.release(self.tenant_id)
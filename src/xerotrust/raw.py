@@ -0,0 +1,170 @@
+"""
+Support for exporting records exactly as Xero sent them, rather than parsing them into Python
+objects only to serialize them again.
+"""
+
+import json
+import re
+from typing import Any, Collection, Iterable, Iterator
+
+from .decode import parse_xero_date
+from .export import Serializer
+
+DECODER = json.JSONDecoder()
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Strings in JSON can't contain newlines, so any found are only formatting:
+LAYOUT = re.compile(r'[\r\n]+[ \t]*')
+
+
+class RawItem(dict[str, Any]):
+    """
+    The fields of a record needed to route it and track the latest values seen,
+    along with the record as Xero sent it.
+    """
+
+    raw: str
+
+
+class Scanner:
+    """
+    Scans JSON text that may arrive in chunks, such as from a streamed response, keeping
+    only the text that has not yet been scanned.
+    """
+
+    def __init__(self, chunks: Iterable[str], decoder: json.JSONDecoder = DECODER) -> None:
+        self.chunks = iter(chunks)
+        self.decoder = decoder
+        self.text = ''
+        self.index = 0
+        # The position in the whole text of the start of self.text:
+        self.offset = 0
+
+    def _more(self) -> bool:
+        for chunk in self.chunks:
+            if chunk:
+                self.offset += self.index
+                self.text = self.text[self.index :] + chunk
+                self.index = 0
+                return True
+        return False
+
+    def peek(self) -> str:
+        """
+        Skip any whitespace and return the next character, or an empty string at the end.
+        """
+        while True:
+            self.index = WHITESPACE.match(self.text, self.index).end()  # type: ignore[union-attr]
+            if self.index < len(self.text) or not self._more():
+                return self.text[self.index : self.index + 1]
+
+    def expect(self, expected: str) -> None:
+        if self.peek() != expected:
+            position = self.offset + self.index
+            found = self.text[self.index : self.index + 20]
+            raise ValueError(f'Expected {expected!r} at {position}: {found!r}')
+        self.index += 1
+
+    def value(self) -> tuple[Any, str]:
+        """
+        Decode the next value, returning it along with the exact text it was decoded from.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.text, self.index)
+            except json.JSONDecodeError:
+                if self._more():
+                    continue
+                raise
+            # A number at the end of the text may continue in the next chunk:
+            if end < len(self.text) or not self._more():
+                break
+        text = self.text[self.index : end]
+        self.index = end
+        return value, text
+
+    def separator(self) -> None:
+        """
+        Skip over the comma, if any, that follows a value.
+        """
+        if self.peek() == ',':
+            self.index += 1
+
+
+def records(
+    chunks: str | Iterable[str],
+    resource_name: str,
+    decoder: json.JSONDecoder = DECODER,
+    metadata: dict[str, Any] | None = None,
+) -> Iterator[tuple[Any, str]]:
+    """
+    Yield each of the records in a response's array of resources, both decoded and as
+    the exact text Xero sent for it. The response may be given as text or as chunks of text,
+    in which case records are yielded as soon as they have arrived. If ``metadata`` is given,
+    the other values in the response, such as ``pagination``, are added to it as they are found.
+    """
+    scanner = Scanner([chunks] if isinstance(chunks, str) else chunks, decoder)
+    scanner.expect('{')
+    while scanner.peek() != '}':
+        key, _ = scanner.value()
+        scanner.expect(':')
+        if key == resource_name:
+            scanner.expect('[')
+            while scanner.peek() != ']':
+                yield scanner.value()
+                scanner.separator()
+            scanner.expect(']')
+        else:
+            value, _ = scanner.value()
+            if key == 'Status':
+                assert value == 'OK', f'Expected the API to say OK but received {value}'
+            if metadata is not None:
+                metadata[key] = value
+        scanner.separator()
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, str):
+        parsed = parse_xero_date(value)
+        if parsed:
+            return parsed
+    return value
+
+
+def raw_item(record: dict[str, Any], raw: str, fields: Collection[str]) -> RawItem:
+    """
+    Turn a record into a :class:`RawItem`, decoding only the requested fields in the same
+    way pyxero would.
+    """
+    item = RawItem({name: _decode(record[name]) for name in fields if name in record})
+    item.raw = LAYOUT.sub('', raw)
+    return item
+
+
+def split_records(
+    text: str,
+    resource_name: str,
+    fields: Collection[str],
+    metadata: dict[str, Any] | None = None,
+) -> list[RawItem]:
+    """
+    Split the records in a response into :class:`RawItem` instances, decoding only the
+    requested fields in the same way pyxero would.
+    """
+    return [
+        raw_item(record, raw, fields)
+        for record, raw in records(text, resource_name, metadata=metadata)
+    ]
+
+
+def passthrough(serializer: Serializer) -> Serializer:
+    """
+    Wrap a serializer so that any :class:`RawItem` is written as Xero sent it.
+    """
+
+    def serialize(item: dict[str, Any]) -> str:
+        if isinstance(item, RawItem):
+            return item.raw
+        return serializer(item)
+
+    return serialize
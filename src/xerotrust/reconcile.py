@@ -1,9 +1,11 @@
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
 from typing import Any, Protocol, Hashable, Iterable
 
 from dateutil.parser import parse
+from xero.utils import parse_date
 
 
 @dataclass
@@ -51,7 +53,11 @@ class Reconciler(Protocol):
 
     @classmethod
     def date(cls, item: dict[str, Any]) -> date:
-        return parse(item[cls.date_key]).date()
+        value = item[cls.date_key]
+        # Exports made with --raw have dates in the format Xero sends them:
+        if value.startswith('/Date('):
+            return parse_date(value).date()  # type: ignore[no-any-return]
+        return parse(value).date()
 
     @staticmethod
     def parse(item: dict[str, Any]) -> Iterable[AccountChange]:
@@ -112,6 +118,35 @@ class TransactionReconciler(Reconciler):
                     )
 
 
+def date_totals(
+    reconciler: Reconciler, items: Iterable[dict[str, Any]]
+) -> dict[date, AccountTotals]:
+    totals = defaultdict[date, AccountTotals](AccountTotals)
+    for item in items:
+        for change in reconciler.parse(item):
+            totals[reconciler.date(item)].add(change)
+    return totals
+
+
+def dump_totals(totals: dict[date, AccountTotals]) -> dict[str, list[list[str | None]]]:
+    """
+    Turn totals by date into something that can be stored as JSON.
+    """
+    return {
+        day.isoformat(): [[t.name, t.type, t.code, str(t.total)] for t in accounts.values()]
+        for day, accounts in totals.items()
+    }
+
+
+def load_totals(data: dict[str, list[list[str | None]]]) -> dict[date, AccountTotals]:
+    totals = defaultdict[date, AccountTotals](AccountTotals)
+    for day, accounts in data.items():
+        for name, type_, code, total in accounts:
+            assert name is not None and type_ is not None and total is not None
+            totals[date.fromisoformat(day)].add(AccountChange(name, type_, code, Decimal(total)))
+    return totals
+
+
 RECONCILERS: dict[str, Reconciler] = {
     "journals": JournalReconciler,
     "transactions": TransactionReconciler,
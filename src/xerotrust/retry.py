@@ -0,0 +1,162 @@
+"""
+Retrying calls to Xero that fail for reasons that are likely to pass, such as server errors,
+timeouts and dropped connections, while giving up on a tenant whose calls keep failing so
+that it doesn't hold up the others.
+"""
+
+import json
+import logging
+import random
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable
+
+from requests.exceptions import ChunkedEncodingError, ConnectionError, Timeout
+from xero.exceptions import XeroExceptionUnknown, XeroInternalError, XeroNotAvailable
+
+from .exceptions import TenantUnavailable
+
+
+def transient(error: BaseException) -> bool:
+    """
+    Whether an error is likely to pass if the call that raised it is made again.
+    """
+    if isinstance(error, (XeroInternalError, XeroNotAvailable)):
+        return True
+    # Other errors from requests, such as an invalid URL, won't go away by trying again:
+    if isinstance(error, (ConnectionError, Timeout, ChunkedEncodingError)):
+        return True
+    if isinstance(error, XeroExceptionUnknown):
+        return bool(error.response.status_code >= 500)
+    # httpx is only needed for --async, so it will have been imported if it's in use:
+    httpx = sys.modules.get('httpx')
+    return httpx is not None and isinstance(error, httpx.TransportError)
+
+
+@dataclass
+class Backoff:
+    """
+    Exponential backoff with full jitter, so that calls that failed together don't all try
+    again together.
+    """
+
+    base: float = 1
+    cap: float = 60
+    attempts: int = 5
+
+    def delay(self, attempt: int) -> float | None:
+        """
+        The number of seconds to wait before making the given retry, counting from zero,
+        or ``None`` if there have been enough attempts.
+        """
+        if attempt >= self.attempts:
+            return None
+        return random.uniform(0, min(self.cap, self.base * 2**attempt))
+
+
+@dataclass
+class CallStats:
+    # Attempts at calls, including retries:
+    calls: int = 0
+    retries: int = 0
+    # Calls given up on after every attempt failed:
+    failed: int = 0
+    # Calls not made because the circuit breaker was open:
+    rejected: int = 0
+    # Seconds taken by the attempts that succeeded, including any wait for the rate limit:
+    latency_total: float = 0
+    latency_max: float = 0
+
+
+@dataclass
+class TenantRetries:
+    """
+    The retries for one tenant, along with a circuit breaker that opens once ``threshold``
+    attempts in a row have failed. While open, calls fail straight away until ``cooldown``
+    seconds have passed, when calls are allowed through again to see if Xero has recovered.
+    Safe to use from multiple threads.
+    """
+
+    tenant_id: str
+    backoff: Backoff = field(default_factory=Backoff)
+    threshold: int = 10
+    cooldown: float = 300
+    clock: Callable[[], float] = monotonic
+    stats: CallStats = field(default_factory=CallStats)
+    # The number of attempts in a row that have failed and when the breaker opened:
+    failures: int = 0
+    opened: float | None = None
+
+    def __post_init__(self) -> None:
+        self._lock = Lock()
+
+    def check(self) -> None:
+        """
+        Raise :class:`~xerotrust.exceptions.TenantUnavailable` if no calls should be made.
+        """
+        with self._lock:
+            if self.opened is not None and self.clock() - self.opened < self.cooldown:
+                self.stats.rejected += 1
+                raise TenantUnavailable(f'Calls for tenant {self.tenant_id} keep failing')
+            self.stats.calls += 1
+
+    def succeeded(self, seconds: float) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened = None
+            self.stats.latency_total += seconds
+            self.stats.latency_max = max(self.stats.latency_max, seconds)
+
+    def failed(self, error: Exception, attempt: int) -> float | None:
+        """
+        Record a failed attempt at a call, returning the number of seconds to wait before
+        trying again or ``None`` if the call should be given up on.
+        """
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened is None:
+                    logging.error(f'Calls for tenant {self.tenant_id} keep failing, pausing them')
+                self.opened = self.clock()
+                self.stats.failed += 1
+                raise TenantUnavailable(
+                    f'Calls for tenant {self.tenant_id} keep failing'
+                ) from error
+            delay = self.backoff.delay(attempt)
+            if delay is None:
+                self.stats.failed += 1
+                return None
+            self.stats.retries += 1
+        logging.warning(f'{error!r} for tenant {self.tenant_id}, retrying in {delay:.1f} seconds')
+        return delay
+
+
+class Retries:
+    """
+    The :class:`TenantRetries` for each tenant, whose counters can be saved for monitoring.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.kwargs = kwargs
+        self._tenants: dict[str, TenantRetries] = {}
+        self._lock = Lock()
+
+    def tenant(self, tenant_id: str) -> TenantRetries:
+        with self._lock:
+            retries = self._tenants.get(tenant_id)
+            if retries is None:
+                retries = self._tenants[tenant_id] = TenantRetries(tenant_id, **self.kwargs)
+            return retries
+
+    def save(self, path: Path) -> None:
+        with self._lock:
+            data = {
+                tenant_id: asdict(retries.stats)
+                for tenant_id, retries in sorted(self._tenants.items())
+                if retries.stats.calls or retries.stats.rejected
+            }
+        if data:
+            path.write_text(json.dumps(data, indent=2))
@@ -0,0 +1,191 @@
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from queue import Full, Queue
+from threading import Event, Thread
+from typing import Any, Callable, Generator, Iterable
+
+from .exceptions import DailyLimitExhausted, TenantUnavailable
+from .ratelimit import MAX_IN_FLIGHT
+
+
+@dataclass
+class Task:
+    tenant_id: str
+    run: Callable[[], None]
+    # What the task does, such as the endpoint it exports:
+    name: str = ''
+
+
+class InlineExecutor(Executor):
+    """
+    Runs each call as soon as it is submitted, in the thread submitting it, so that Ctrl-C
+    interrupts it straight away rather than once a worker thread has finished it.
+    """
+
+    def submit[R, **P](self, fn: Callable[P, R], /, *args: P.args, **kwargs: P.kwargs) -> Future[R]:
+        future: Future[R] = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def run_tasks(
+    tasks: Iterable[Task],
+    jobs: int = 1,
+    per_tenant: int = MAX_IN_FLIGHT,
+    on_tenant_done: Callable[[str], None] | None = None,
+    on_tenant_deferred: Callable[[str, list[str]], None] | None = None,
+) -> None:
+    """
+    Run tasks using a pool of ``jobs`` workers, sharing the workers fairly between tenants
+    and never running more than ``per_tenant`` tasks for a single tenant at once. With a
+    single job, tasks are run in the calling thread.
+
+    ``on_tenant_done`` is called, from the calling thread, once all of a tenant's tasks have
+    completed successfully. If a task fails, no further tasks are started and the first
+    exception is raised once the running tasks have finished. The exception is a task failing
+    with :class:`~xerotrust.exceptions.TenantUnavailable`, where only the rest of that tenant's
+    tasks are dropped so that other tenants can carry on, and the first such exception is
+    raised once everything else has finished.
+
+    A task failing with :class:`~xerotrust.exceptions.DailyLimitExhausted` is handled in the
+    same way, except that ``on_tenant_deferred`` is first called, from the calling thread, with
+    the names of that tenant's tasks that didn't finish so they can be run on a later day.
+    """
+    pending: dict[str, deque[Task]] = {}
+    for task in tasks:
+        pending.setdefault(task.tenant_id, deque()).append(task)
+    remaining = {tenant_id: len(queue) for tenant_id, queue in pending.items()}
+    rotation = deque(pending)
+    running: dict[Future[None], Task] = {}
+    running_per_tenant = Counter[str]()
+    error: Exception | None = None
+    unavailable: TenantUnavailable | None = None
+    exhausted: DailyLimitExhausted | None = None
+    deferred: dict[str, list[Task]] = {}
+
+    executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else InlineExecutor()
+    with executor:
+        while True:
+            while error is None and len(running) < jobs:
+                candidates = [
+                    tenant_id
+                    for tenant_id in rotation
+                    if pending[tenant_id] and running_per_tenant[tenant_id] < per_tenant
+                ]
+                if not candidates:
+                    break
+                tenant_id = min(candidates, key=running_per_tenant.__getitem__)
+                rotation.remove(tenant_id)
+                rotation.append(tenant_id)
+                task = pending[tenant_id].popleft()
+                running[executor.submit(task.run)] = task
+                running_per_tenant[tenant_id] += 1
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                running_per_tenant[task.tenant_id] -= 1
+                try:
+                    future.result()
+                except TenantUnavailable as e:
+                    pending[task.tenant_id].clear()
+                    if unavailable is None:
+                        unavailable = e
+                except DailyLimitExhausted as e:
+                    deferred.setdefault(task.tenant_id, []).extend([task, *pending[task.tenant_id]])
+                    pending[task.tenant_id].clear()
+                    if exhausted is None:
+                        exhausted = e
+                except Exception as e:
+                    if error is None:
+                        error = e
+                else:
+                    remaining[task.tenant_id] -= 1
+                    if not remaining[task.tenant_id] and on_tenant_done is not None:
+                        on_tenant_done(task.tenant_id)
+
+    if on_tenant_deferred is not None:
+        for tenant_id, tasks_deferred in deferred.items():
+            on_tenant_deferred(tenant_id, [task.name for task in tasks_deferred])
+    if error is not None:
+        raise error
+    if unavailable is not None:
+        raise unavailable
+    if exhausted is not None:
+        raise exhausted
+
+
+def map_ordered[T, R](function: Callable[[T], R], items: Iterable[T], workers: int) -> Generator[R]:
+    """
+    Yield ``function(item)`` for each of the items, in order, making up to ``workers`` calls
+    at once but never getting more than that far ahead of the consumer.
+    """
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures: deque[Future[R]] = deque(
+        executor.submit(function, item) for item in islice(items, workers)
+    )
+    try:
+        while futures:
+            result = futures.popleft().result()
+            for item in islice(items, 1):
+                futures.append(executor.submit(function, item))
+            yield result
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+_DONE = object()
+
+
+def prefetch[T](items: Iterable[T], depth: int) -> Generator[T]:
+    """
+    Yield the items, fetching up to ``depth`` of them ahead in a background thread so that
+    producing the next item overlaps with whatever the consumer does with the current one.
+    Any exception raised while producing the items is raised by this generator, in order.
+    """
+    if depth < 1:
+        yield from items
+        return
+
+    queue: Queue[tuple[Any, BaseException | None]] = Queue(maxsize=depth)
+    stopped = Event()
+
+    def put(item: Any, error: BaseException | None = None) -> bool:
+        while not stopped.is_set():
+            try:
+                queue.put((item, error), timeout=0.1)
+            except Full:
+                continue
+            return True
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(None, e)
+        else:
+            put(_DONE)
+
+    Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item, error = queue.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stopped.set()
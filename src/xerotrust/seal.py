@@ -0,0 +1,107 @@
+import json
+import logging
+import re
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from .decode import parse_xero_date
+
+ORGANISATIONS_NAME = 'organisations.jsonl'
+SEALED_NAME = 'sealed.json'
+
+# The date at the end of the name of a file split by years, months or days:
+SPLIT_DATE = re.compile(r'-(\d{4})(?:-(\d{2})(?:-(\d{2}))?)?\.jsonl$')
+
+
+def period_end(name: str) -> date | None:
+    """
+    The last day of the period covered by a split file, or ``None`` if it isn't split by date.
+    """
+    match = SPLIT_DATE.search(name)
+    if match is None:
+        return None
+    year, month, day = match.groups()
+    if day is not None:
+        return date(int(year), int(month), int(day))
+    if month is not None:
+        first = date(int(year), int(month), 1)
+        return (first + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    return date(int(year), 12, 31)
+
+
+def lock_date(directory: Path) -> date | None:
+    """
+    The date on or before which nothing can be changed by anyone, taken from the organisation
+    exported into the given directory. The period lock date is not used since advisers can
+    still make changes before it.
+    """
+    path = directory / ORGANISATIONS_NAME
+    if not path.exists():
+        return None
+    with path.open(encoding='utf-8') as source:
+        values = [json.loads(line).get('EndOfYearLockDate') for line in source]
+    dates = [_date(value) for value in values if value]
+    return min(dates) if dates else None
+
+
+def _date(value: str) -> date:
+    # Exports made with --raw have dates in the format Xero sends them:
+    parsed: datetime
+    if value.startswith('/Date('):
+        parsed = parse_xero_date(value)
+    else:
+        parsed = datetime.fromisoformat(value)
+    return parsed.date()
+
+
+class Seals:
+    """
+    Split files covering periods that ended on or before the lock date of the tenant they were
+    exported from can no longer change, so results worked out from them can be kept in each
+    tenant directory and used again rather than reading those files each time.
+    """
+
+    def __init__(self) -> None:
+        self._locks: dict[Path, date | None] = {}
+        self._results: dict[Path, dict[str, dict[str, Any]]] = {}
+        self._changed: set[Path] = set()
+
+    def sealed(self, path: Path) -> bool:
+        end = period_end(path.name)
+        if end is None:
+            return False
+        directory = path.parent
+        if directory not in self._locks:
+            self._locks[directory] = lock_date(directory)
+        lock = self._locks[directory]
+        return lock is not None and end <= lock
+
+    def cached(self, path: Path, kind: str, compute: Callable[[Path], Any]) -> Any:
+        """
+        The result of ``compute(path)`` for a sealed file, which must be something that can
+        be stored as JSON, using the one kept from an earlier run if the file hasn't changed.
+        """
+        assert self.sealed(path), f'{path} is not sealed'
+        results = self._load(path.parent)
+        size = path.stat().st_size
+        entry = results.get(path.name)
+        if entry is None or entry['size'] != size:
+            entry = results[path.name] = {'size': size}
+        if kind not in entry:
+            logging.info(f'caching {kind} for {path}')
+            entry[kind] = compute(path)
+            self._changed.add(path.parent)
+        return entry[kind]
+
+    def save(self) -> None:
+        for directory in sorted(self._changed):
+            results = self._results[directory]
+            (directory / SEALED_NAME).write_text(json.dumps(results, sort_keys=True, indent=2))
+        self._changed.clear()
+
+    def _load(self, directory: Path) -> dict[str, dict[str, Any]]:
+        if directory not in self._results:
+            path = directory / SEALED_NAME
+            self._results[directory] = json.loads(path.read_text()) if path.exists() else {}
+        return self._results[directory]
@@ -67,5 +67,16 @@ def add_tenants_response(pook: Any, tenants: list[dict[str, str]] | None = None)
     )
 
 
+def add_empty_page(pook: Any, endpoint: str, page: int = 2, tenant_id: str = 't1') -> None:
+    # Paging only stops once Xero returns a page with nothing on it:
+    pook.get(
+        f"{XERO_API_URL}/{endpoint}",
+        headers={'Xero-Tenant-Id': tenant_id},
+        params={'page': str(page)},
+        reply=200,
+        response_json={'Status': 'OK', endpoint: []},
+    )
+
+
 def write_jsonl_file(path: Path, lines: list[dict[str, Any]]) -> None:
     path.write_text('\n'.join(json.dumps(j) for j in lines) + '\n')
@@ -0,0 +1,139 @@
+from copy import copy
+from typing import Any, AsyncIterator
+
+import httpx
+import pytest
+import pytest_asyncio
+from testfixtures import Replacer, ShouldRaise, compare
+from xero.auth import OAuth2Credentials
+from xero.exceptions import XeroNotFound, XeroRateLimitExceeded
+
+from xerotrust.aio import AsyncManager, AsyncXero
+from xerotrust.export import Export
+from xerotrust.ratelimit import RateLimiter
+
+from .helpers import SAMPLE_CREDENTIALS, XERO_API_URL
+
+
+@pytest.fixture()
+def credentials() -> OAuth2Credentials:
+    credentials = copy(SAMPLE_CREDENTIALS)
+    credentials.tenant_id = 't1'
+    return credentials
+
+
+@pytest_asyncio.fixture()
+async def client() -> AsyncIterator[httpx.AsyncClient]:
+    async with httpx.AsyncClient() as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_all(pook: Any, credentials: OAuth2Credentials, client: httpx.AsyncClient) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Accounts",
+        headers={'Xero-Tenant-Id': 't1', 'Authorization': 'Bearer test_token'},
+        reply=200,
+        response_json={
+            'Status': 'OK',
+            'Accounts': [{'AccountID': 'a1', 'UpdatedDateUTC': '/Date(1672531200000+0000)/'}],
+        },
+    )
+    manager = AsyncXero(credentials, client).manager('Accounts')
+    accounts = await manager.all()
+    compare(accounts[0]['UpdatedDateUTC'].year, expected=2023)
+
+
+@pytest.mark.asyncio
+async def test_filter(pook: Any, credentials: OAuth2Credentials, client: httpx.AsyncClient) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        params={'page': '2', 'pageSize': '10'},
+        reply=200,
+        response_json={'Status': 'OK', 'Contacts': [{'ContactID': 'c1'}]},
+    )
+    manager = AsyncManager('Contacts', credentials, client)
+    compare(await manager.filter(page=2, pageSize=10), expected=[{'ContactID': 'c1'}])
+
+
+@pytest.mark.asyncio
+async def test_not_found(
+    pook: Any, credentials: OAuth2Credentials, client: httpx.AsyncClient
+) -> None:
+    pook.get(f"{XERO_API_URL}/Contacts", reply=404, response_body='Not Found')
+    manager = AsyncManager('Contacts', credentials, client)
+    with ShouldRaise(XeroNotFound):
+        await manager.all()
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_then_retried(
+    pook: Any, credentials: OAuth2Credentials, client: httpx.AsyncClient
+) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Accounts",
+        reply=429,
+        response_headers={'retry-after': '5', 'X-Rate-Limit-Problem': 'minute'},
+        times=2,
+    )
+    pook.get(
+        f"{XERO_API_URL}/Accounts",
+        reply=200,
+        response_json={'Status': 'OK', 'Accounts': [{'AccountID': 'a1'}]},
+    )
+    slept: list[float] = []
+
+    async def sleep(seconds: float) -> None:
+        slept.append(seconds)
+
+    manager = AsyncManager('Accounts', credentials, client)
+    with ShouldRaise(XeroRateLimitExceeded):
+        await manager.all()
+    with Replacer() as replace:
+        replace('xerotrust.export.async_sleep', sleep)
+        compare(
+            [item async for item in Export('accounts.jsonl').aitems(manager, latest=None)],
+            expected=[{'AccountID': 'a1'}],
+        )
+    compare(slept, expected=[5])
+
+
+@pytest.mark.asyncio
+async def test_limited(
+    pook: Any, credentials: OAuth2Credentials, client: httpx.AsyncClient
+) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Accounts",
+        reply=200,
+        response_headers={'X-DayLimit-Remaining': '100'},
+        response_json={'Status': 'OK', 'Accounts': []},
+    )
+    limiter = RateLimiter()
+    manager = AsyncXero(credentials, client, limiter).manager('Accounts')
+    compare(await manager.all(), expected=[])
+    budget = limiter.budget('t1')
+    compare(int(budget.minute.tokens), expected=59)
+    compare(int(budget.day.tokens), expected=100)
+
+
+@pytest.mark.asyncio
+async def test_paged_items(
+    pook: Any, credentials: OAuth2Credentials, client: httpx.AsyncClient
+) -> None:
+    for page, contacts in (('1', ['c1', 'c2']), ('2', ['c3'])):
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            params={'page': page, 'pageSize': '2'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'pagination': {'page': int(page), 'pageSize': 2, 'pageCount': 2, 'itemCount': 3},
+                'Contacts': [{'ContactID': contact_id} for contact_id in contacts],
+            },
+        )
+    manager = AsyncManager('Contacts', credentials, client)
+    exporter = Export('contacts.jsonl', paged=True, page_size=2)
+    compare(
+        [item['ContactID'] async for item in exporter.aitems(manager, latest=None)],
+        expected=['c1', 'c2', 'c3'],
+    )
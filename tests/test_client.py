@@ -0,0 +1,294 @@
+from copy import copy
+from datetime import datetime, UTC
+from threading import Thread
+from typing import Any
+
+import pytest
+from requests.adapters import HTTPAdapter
+from testfixtures import ShouldRaise, compare
+from xero.auth import OAuth2Credentials
+from xero.exceptions import XeroNotAvailable, XeroNotFound, XeroRateLimitExceeded
+
+from xerotrust.client import Transport
+from xerotrust.ratelimit import RateLimiter
+from xerotrust.raw import RawItem
+
+from .helpers import SAMPLE_CREDENTIALS, XERO_API_URL
+
+
+@pytest.fixture()
+def credentials() -> OAuth2Credentials:
+    credentials = copy(SAMPLE_CREDENTIALS)
+    credentials.tenant_id = 't1'
+    return credentials
+
+
+def test_all(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Accounts",
+        headers={
+            'Xero-Tenant-Id': 't1',
+            'Authorization': 'Bearer test_token',
+            'Accept-Encoding': 'gzip, deflate',
+        },
+        reply=200,
+        response_json={
+            'Status': 'OK',
+            'Accounts': [{'AccountID': 'a1', 'UpdatedDateUTC': '/Date(1672531200000+0000)/'}],
+        },
+    )
+    with Transport() as transport:
+        accounts = transport.manager('Accounts', credentials).all()
+    compare(accounts[0]['UpdatedDateUTC'].year, expected=2023)
+
+
+def test_filter(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        params={'page': '2', 'pageSize': '10'},
+        reply=200,
+        response_json={'Status': 'OK', 'Contacts': [{'ContactID': 'c1'}]},
+    )
+    manager = Transport().manager('Contacts', credentials)
+    compare(manager.filter(page=2, pageSize=10), expected=[{'ContactID': 'c1'}])
+
+
+def test_get(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Contacts/c1",
+        reply=200,
+        response_json={'Status': 'OK', 'Contacts': [{'ContactID': 'c1'}]},
+    )
+    manager = Transport().manager('Contacts', credentials)
+    compare(manager.get('c1'), expected=[{'ContactID': 'c1'}])
+
+
+def test_not_found(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(f"{XERO_API_URL}/Contacts", reply=404, response_body='Not Found')
+    manager = Transport().manager('Contacts', credentials)
+    with ShouldRaise(XeroNotFound):
+        manager.all()
+
+
+def test_rate_limited(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        reply=429,
+        response_headers={'retry-after': '5', 'X-Rate-Limit-Problem': 'minute'},
+    )
+    manager = Transport().manager('Contacts', credentials)
+    with ShouldRaise(XeroRateLimitExceeded) as s:
+        manager.all()
+    compare(s.raised.response.headers['retry-after'], expected='5')
+
+
+def test_rate_limited_by_service_unavailable(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        reply=503,
+        response_body='oauth_problem=rate%20limit%20exceeded&oauth_problem_advice=please%20wait',
+    )
+    manager = Transport().manager('Contacts', credentials)
+    with ShouldRaise(XeroRateLimitExceeded) as s:
+        manager.all()
+    compare(s.raised.errors, expected=['rate limit exceeded'])
+
+
+def test_service_unavailable(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(f"{XERO_API_URL}/Contacts", reply=503, response_body='')
+    manager = Transport().manager('Contacts', credentials)
+    with ShouldRaise(XeroNotAvailable):
+        manager.all()
+
+
+def test_not_json(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Invoices/i1",
+        reply=200,
+        response_headers={'Content-Type': 'application/pdf'},
+        response_body=b'%PDF-1.4',
+    )
+    manager = Transport().manager('Invoices', credentials)
+    compare(manager.get('i1'), expected=b'%PDF-1.4')
+
+
+def test_endpoint_without_date_fields(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Receipts",
+        reply=200,
+        response_json={
+            'Status': 'OK',
+            'Receipts': [{'ReceiptID': 'r1', 'UpdatedDateUTC': '/Date(1672531200000+0000)/'}],
+        },
+    )
+    manager = Transport().manager('Receipts', credentials)
+    (receipt,) = manager.all()
+    # pyxero decodes the dates instead:
+    compare(receipt['UpdatedDateUTC'].year, expected=2023)
+
+
+def test_managers_share_session(credentials: OAuth2Credentials) -> None:
+    transport = Transport(pool_size=20)
+    first = transport.manager('Accounts', credentials)
+    second = transport.manager('Contacts', copy(credentials))
+    assert first.session is second.session is transport.session
+    adapter = transport.session.get_adapter(XERO_API_URL)
+    assert isinstance(adapter, HTTPAdapter)
+    compare(adapter.poolmanager.connection_pool_kw['maxsize'], expected=20)
+
+
+def test_responses_observed(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Accounts",
+        reply=200,
+        response_headers={'X-DayLimit-Remaining': '100'},
+        response_json={'Status': 'OK', 'Accounts': []},
+    )
+    limiter = RateLimiter()
+    manager = Transport().manager('Accounts', limiter.observed(credentials))
+    compare(manager.all(), expected=[])
+    compare(int(limiter.budget('t1').day.tokens), expected=100)
+
+
+def test_stream(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        params={'page': '1', 'pageSize': '10'},
+        reply=200,
+        response_json={
+            'Status': 'OK',
+            'Contacts': [
+                {'ContactID': 'c1', 'UpdatedDateUTC': '/Date(1672531200000+0000)/'},
+                {'ContactID': 'c2'},
+            ],
+        },
+    )
+    manager = Transport().manager('Contacts', credentials)
+    compare(
+        list(manager.stream(page=1, pageSize=10)),
+        expected=[
+            {'ContactID': 'c1', 'UpdatedDateUTC': datetime(2023, 1, 1, tzinfo=UTC)},
+            {'ContactID': 'c2'},
+        ],
+    )
+
+
+def test_stream_raw(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Accounts",
+        reply=200,
+        response_json={'Status': 'OK', 'Accounts': [{'AccountID': 'a1', 'Name': 'Bank'}]},
+    )
+    manager = Transport().manager('Accounts', credentials, raw_fields=['AccountID'])
+    (item,) = manager.stream()
+    compare(item, expected=RawItem({'AccountID': 'a1'}))
+    compare(item.raw, expected='{"AccountID": "a1","Name": "Bank"}')
+
+
+def test_filter_raw(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Accounts",
+        params={'where': 'Type=="BANK"'},
+        reply=200,
+        response_json={'Status': 'OK', 'Accounts': [{'AccountID': 'a1', 'Type': 'BANK'}]},
+    )
+    manager = Transport().manager('Accounts', credentials, raw_fields=['AccountID'])
+    (item,) = manager.filter(Type='BANK')
+    compare(item, expected=RawItem({'AccountID': 'a1'}))
+    compare(item.raw, expected='{"AccountID": "a1","Type": "BANK"}')
+
+
+def test_stream_error_raised_before_iteration(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        reply=429,
+        response_headers={'retry-after': '5', 'X-Rate-Limit-Problem': 'minute'},
+    )
+    manager = Transport().manager('Contacts', credentials)
+    with ShouldRaise(XeroRateLimitExceeded):
+        manager.stream()
+
+
+PAGINATION = {'page': 1, 'pageSize': 10, 'pageCount': 3, 'itemCount': 25}
+
+
+def test_filter_keeps_metadata(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        params={'page': '1', 'pageSize': '10'},
+        reply=200,
+        response_json={'Status': 'OK', 'pagination': PAGINATION, 'Contacts': []},
+    )
+    manager = Transport().manager('Contacts', credentials)
+    manager.filter(page=1, pageSize=10)
+    compare(manager.metadata, expected={'Status': 'OK', 'pagination': PAGINATION})
+
+
+def test_stream_keeps_metadata(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        params={'page': '1', 'pageSize': '10'},
+        reply=200,
+        response_json={
+            'Status': 'OK',
+            'pagination': PAGINATION,
+            'Contacts': [{'ContactID': 'c1'}],
+        },
+    )
+    manager = Transport().manager('Contacts', credentials)
+    stream = manager.stream(page=1, pageSize=10)
+    compare(next(stream), expected={'ContactID': 'c1'})
+    # Available as soon as the items that follow it start arriving:
+    compare(manager.metadata['pagination'], expected=PAGINATION)
+
+
+def test_metadata_kept_for_each_thread(pook: Any, credentials: OAuth2Credentials) -> None:
+    other = {'page': 2, 'pageSize': 10, 'pageCount': 2, 'itemCount': 15}
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        params={'page': '1', 'pageSize': '10'},
+        reply=200,
+        response_json={'Status': 'OK', 'pagination': PAGINATION, 'Contacts': []},
+    )
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        params={'page': '2', 'pageSize': '10'},
+        reply=200,
+        response_json={'Status': 'OK', 'pagination': other, 'Contacts': []},
+    )
+    manager = Transport().manager('Contacts', credentials)
+    manager.filter(page=1, pageSize=10)
+    thread = Thread(target=manager.filter, kwargs={'page': 2, 'pageSize': 10})
+    thread.start()
+    thread.join()
+    # A request made from another thread doesn't replace the details seen by this one:
+    compare(manager.metadata['pagination'], expected=PAGINATION)
+
+
+def test_count(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Contacts",
+        params={'page': '1', 'pageSize': '1'},
+        reply=200,
+        response_json={
+            'Status': 'OK',
+            'pagination': PAGINATION,
+            'Contacts': [{'ContactID': 'c1'}],
+        },
+    )
+    compare(Transport().manager('Contacts', credentials).count(), expected=25)
+
+
+def test_count_not_paged(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(
+        f"{XERO_API_URL}/Accounts",
+        reply=200,
+        response_json={'Status': 'OK', 'Accounts': [{'AccountID': 'a1'}]},
+    )
+    compare(Transport().manager('Accounts', credentials).count(), expected=None)
+
+
+def test_count_error(pook: Any, credentials: OAuth2Credentials) -> None:
+    pook.get(f"{XERO_API_URL}/Contacts", reply=404)
+    with ShouldRaise(XeroNotFound):
+        Transport().manager('Contacts', credentials).count()
@@ -0,0 +1,69 @@
+import json
+from typing import Any
+
+import pytest
+from testfixtures import ShouldAssert, compare
+from xero.utils import json_load_object_hook, parse_date
+
+from xerotrust.decode import decode_response, parse_xero_date
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        '/Date(1426849200000+1300)/',
+        '/Date(1426849200000-0530)/',
+        '/Date(1426849200000+0000)/',
+        '/Date(1426849200000)/',
+        '/Date(-1000+0000)/',
+        '/Date(0+0000)/',
+        '2023-03-15T00:00:00',
+        '2023-03-15T10:20:30',
+        'Bank Fees',
+        '',
+    ],
+)
+def test_parse_matches_pyxero(value: str) -> None:
+    compare(parse_xero_date(value), expected=parse_date(value))
+
+
+def test_decode_matches_pyxero() -> None:
+    text = json.dumps(
+        {
+            'Status': 'OK',
+            'Invoices': [
+                {
+                    'InvoiceID': 'i1',
+                    'Date': '/Date(1678838400000+0000)/',
+                    'DateString': '2023-03-15T00:00:00',
+                    'DueDate': '/Date(1679443200000+0000)/',
+                    'Reference': '2023-03-15',
+                    'Payments': [{'PaymentID': 'p1', 'Date': '/Date(1679011200000+0000)/'}],
+                    'UpdatedDateUTC': '/Date(1678880000123+0000)/',
+                }
+            ],
+        }
+    )
+    expected: Any = json.loads(text, object_hook=json_load_object_hook)['Invoices']
+    actual = decode_response(text, 'Invoices')
+    compare(actual, expected=expected)
+    # Only known date fields are converted:
+    compare(actual[0]['Reference'], expected='2023-03-15')
+
+
+def test_decode_not_ok() -> None:
+    with ShouldAssert("Expected the API to say OK but received ERROR"):
+        decode_response('{"Status": "ERROR"}', 'Invoices')
+
+
+def test_decode_metadata() -> None:
+    metadata: dict[str, Any] = {}
+    text = '{"Status": "OK", "pagination": {"itemCount": 0}, "Invoices": []}'
+    compare(decode_response(text, 'Invoices', metadata), expected=[])
+    compare(metadata, expected={'Status': 'OK', 'pagination': {'itemCount': 0}})
+
+
+def test_decode_without_resource() -> None:
+    # pyxero returns the whole response when it doesn't hold the resource:
+    text = '{"Status": "OK", "Id": "x"}'
+    compare(decode_response(text, 'Invoices'), expected={'Status': 'OK', 'Id': 'x'})
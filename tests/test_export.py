@@ -0,0 +1,625 @@
+import json
+from datetime import UTC, date, datetime, time, timedelta
+from pathlib import Path
+from threading import Barrier, Event
+from typing import Any, Iterator
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from requests import Session
+from testfixtures import Replacer, ShouldRaise, compare, replace_in_module
+from xero.exceptions import XeroBadRequest, XeroInternalError, XeroRateLimitExceeded
+
+from xerotrust import export
+from xerotrust.client import Transport
+from xerotrust.exceptions import Interrupted
+from xerotrust.export import (
+    Checkpoints,
+    Export,
+    FileManager,
+    Freshness,
+    Index,
+    JournalsExport,
+    PageSizer,
+    StaticExport,
+    Upsert,
+    WindowedExport,
+    unchanged,
+    updated,
+)
+from xerotrust.ratelimit import pause
+from xerotrust.retry import Backoff, TenantRetries
+
+from .helpers import SAMPLE_CREDENTIALS
+
+
+def test_checkpoint_discarded_by_full_export(tmp_path: Path) -> None:
+    path = tmp_path / 'checkpoints.json'
+    checkpoints = Checkpoints(path)
+    checkpoints.save('Contacts', None, FileManager(), [], append=True)
+    checkpoints.save('Accounts', None, FileManager(), [], append=True)
+    # A full export starts again rather than carrying on from where an earlier one stopped:
+    compare(Checkpoints(path).start('Contacts', [], latest=None, update=False), expected=None)
+    compare(json.loads(path.read_text()), expected={'Accounts': {'latest': None, 'sizes': {}}})
+
+
+def test_checkpoints_cleared_only_when_finished(tmp_path: Path) -> None:
+    path = tmp_path / 'checkpoints.json'
+    checkpoints = Checkpoints(path)
+    checkpoints.save('Contacts', None, FileManager(), [], append=True)
+    checkpoints.save('Journals', None, FileManager(), [], append=True)
+    checkpoints.finished('Contacts')
+    checkpoints.clear()
+    compare(json.loads(path.read_text()), expected={'Journals': {'latest': None, 'sizes': {}}})
+    checkpoints.finished('Journals')
+    checkpoints.clear()
+    compare(path.exists(), expected=False)
+
+
+def test_freshness(tmp_path: Path) -> None:
+    path = tmp_path / 'fetched.json'
+    path.write_text(json.dumps({'Currencies': '2000-01-01T00:00:00+00:00'}))
+    freshness = Freshness(path)
+    paths = [tmp_path / 'currencies.jsonl']
+    compare(freshness.due('Currencies', timedelta(days=1), paths), expected=True)
+    freshness.fetched('Currencies')
+    compare(freshness.due('Currencies', timedelta(days=1), paths), expected=False)
+
+
+def test_unchanged(tmp_path: Path) -> None:
+    path = tmp_path / 'currencies.jsonl'
+    path.write_text('a\nb\n')
+    compare(unchanged({path: ['a', 'b']}, [path]), expected=True)
+    compare(unchanged({path: ['a', 'c']}, [path]), expected=False)
+    compare(unchanged({path: ['a', 'b']}, []), expected=False)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (datetime(2023, 3, 15, tzinfo=UTC), '2023-03-15T00:00:00+00:00'),
+        # Files exported with --raw hold dates as Xero sends them:
+        ('/Date(1678838400000+0000)/', '2023-03-15T00:00:00+00:00'),
+        ('2023-03-15T00:00:00+00:00', '2023-03-15T00:00:00+00:00'),
+        (None, None),
+    ],
+)
+def test_updated(value: Any, expected: str | None) -> None:
+    compare(updated({'UpdatedDateUTC': value}), expected=expected)
+
+
+def test_index_build_keeps_latest_version(tmp_path: Path) -> None:
+    first = tmp_path / 'transactions-2023-02.jsonl'
+    first.write_text('{"ID": "a", "UpdatedDateUTC": "2023-03-16T00:00:00+00:00"}\n')
+    second = tmp_path / 'transactions-2023-03.jsonl'
+    second.write_text(
+        '{"ID": "b"}\n{"ID": "a", "UpdatedDateUTC": "2023-03-01T00:00:00+00:00"}\n{"ID": "b"}\n'
+    )
+    index = Index.build([first, second], 'ID')
+    compare(
+        index.entries,
+        expected={'a': ('transactions-2023-02.jsonl', 0), 'b': ('transactions-2023-03.jsonl', 2)},
+    )
+    compare(index.stale, expected={'transactions-2023-03.jsonl': {0, 1}})
+
+
+def test_upsert_rebuilds_index_out_of_date(tmp_path: Path) -> None:
+    path = tmp_path / 'transactions-2023-03.jsonl'
+    path.write_text('{"ID": "a"}\n{"ID": "b"}\n')
+    Upsert.load(tmp_path, [path], 'ID', 'transactions.index.json').apply()
+    # Changed since the index was saved, so the line numbers in it are now wrong:
+    path.write_text('{"ID": "c"}\n{"ID": "a"}\n{"ID": "b"}\n')
+
+    upsert = Upsert.load(tmp_path, [path], 'ID', 'transactions.index.json')
+    with path.open('a') as target:
+        target.write('{"ID": "b", "new": true}\n')
+    upsert.record({'ID': 'b'}, path)
+    upsert.apply()
+
+    compare(path.read_text(), expected='{"ID": "c"}\n{"ID": "a"}\n{"ID": "b", "new": true}\n')
+    compare(
+        Index.load(tmp_path / 'transactions.index.json', [path], 'ID').entries,
+        expected={
+            'a': ('transactions-2023-03.jsonl', 1),
+            'b': ('transactions-2023-03.jsonl', 2),
+            'c': ('transactions-2023-03.jsonl', 0),
+        },
+    )
+
+
+def test_page_count() -> None:
+    pages: dict[int, list[dict[str, Any]]] = {
+        page: [{}] * (10 if page < 6 else 3) for page in range(1, 7)
+    }
+    manager = Mock(spec=['filter'])
+    manager.filter.side_effect = lambda page, pageSize: pages.get(page, [])
+    # The six pages and then an empty one to show there are no more:
+    compare(Export(page_size=10, paged=True).estimate(manager, latest=None), expected=7)
+    # Pages 1, 2, 4 and 8 and then bisecting with 6 and 5:
+    compare(manager.filter.call_count, expected=6)
+
+
+def test_page_count_ends_with_full_page() -> None:
+    pages: dict[int, list[dict[str, Any]]] = {page: [{}] * 10 for page in range(1, 5)}
+    manager = Mock(spec=['filter'])
+    manager.filter.side_effect = lambda page, pageSize: pages.get(page, [])
+    compare(Export(page_size=10, paged=True).estimate(manager, latest=None), expected=5)
+
+
+@pytest.mark.parametrize("count, expected", [(2500, 3), (1000, 1), (0, 1)])
+def test_page_count_from_item_count(count: int, expected: int) -> None:
+    manager = Mock(spec=['count', 'filter'])
+    manager.count.return_value = count
+    compare(Export(paged=True).estimate(manager, latest=None), expected=expected)
+    manager.filter.assert_not_called()
+
+
+def test_page_count_item_count_not_available() -> None:
+    manager = Mock(spec=['count', 'filter'])
+    manager.count.return_value = None
+    manager.filter.return_value = []
+    compare(Export(paged=True).estimate(manager, latest=None), expected=1)
+
+
+class JournalsManager:
+    """
+    A manager that returns pages of dense journal numbers from an offset, as Xero does.
+    """
+
+    def __init__(self, count: int, page_size: int) -> None:
+        self.count = count
+        self.page_size = page_size
+        self.offsets: list[int] = []
+
+    def filter(self, offset: int) -> list[dict[str, Any]]:
+        self.offsets.append(offset)
+        numbers = range(offset + 1, min(offset + self.page_size, self.count) + 1)
+        return [{'JournalNumber': number} for number in numbers]
+
+
+def test_max_journal_number_bisects() -> None:
+    manager = JournalsManager(102, page_size=10)
+    exporter = JournalsExport(page_size=10)
+    compare(exporter._max_journal_number(manager, 0), expected=102)
+    # Doubling until past the end and then bisecting, both down and up:
+    compare(manager.offsets, expected=[10, 30, 70, 150, 110, 90, 100])
+
+
+def test_journals_sharded_none_missing_or_duplicated() -> None:
+    manager = JournalsManager(102, page_size=10)
+    exporter = JournalsExport(page_size=10, workers=3)
+    numbers = [e['JournalNumber'] for page in exporter._pages(manager, None) for e in page]
+    compare(numbers, expected=list(range(1, 103)))
+    compare(exporter.total, expected=102)
+
+
+def test_page_sizer_shrinks_when_slow_or_large() -> None:
+    sizer = PageSizer()
+    sizer.observe(seconds=31, size=1024)
+    compare(sizer.size, expected=500)
+    sizer.observe(seconds=1, size=5 * 1024 * 1024)
+    compare(sizer.size, expected=250)
+    # Neither quick nor slow enough to change:
+    sizer.observe(seconds=10, size=1024)
+    compare(sizer.size, expected=250)
+
+
+def test_page_sizer_grows_when_quick_and_small() -> None:
+    sizer = PageSizer(125)
+    sizer.observe(seconds=1, size=1024)
+    compare(sizer.size, expected=250)
+    # Pages can only get bigger once they start where a bigger page would:
+    compare([sizer.at(offset) for offset in (0, 125, 250, 375)], expected=[250, 125, 250, 125])
+
+
+def test_page_sizer_limits() -> None:
+    sizer = PageSizer()
+    sizer.observe(seconds=1, size=1024)
+    compare(sizer.size, expected=1000)
+    sizer = PageSizer(25)
+    compare(sizer.failed(), expected=False)
+    compare(sizer.size, expected=25)
+
+
+def test_page_sizer_size_not_available() -> None:
+    compare(PageSizer(300).size, expected=250)
+    compare(PageSizer(10).size, expected=25)
+
+
+class StreamingManager:
+    """
+    A manager where the first page of 1000 fails part way through.
+    """
+
+    def __init__(self, items: list[dict[str, Any]]) -> None:
+        self.items = items
+        self.calls: list[tuple[int, int]] = []
+        self.latency = 0.0
+        self.received = 0
+
+    def stream(self, page: int, pageSize: int) -> Iterator[dict[str, Any]]:
+        self.calls.append((page, pageSize))
+        start = (page - 1) * pageSize
+        for count, item in enumerate(self.items[start : start + pageSize]):
+            if pageSize == 1000 and count == 300:
+                raise XeroInternalError(Mock(text='timed out'))
+            yield item
+
+
+def test_stream_smaller_pages_after_error() -> None:
+    items = [{'ID': n} for n in range(600)]
+    manager = StreamingManager(items)
+    exporter = Export(paged=True, adaptive=True)
+    compare(list(exporter._stream(manager)), expected=items)
+    compare(manager.calls, expected=[(1, 1000), (1, 500), (2, 500), (3, 500)])
+    # The pages of 500 were quick, but pages of 1000 failed so aren't used again:
+    assert exporter.sizer is not None
+    compare(exporter.sizer.size, expected=500)
+
+
+def test_stream_smallest_pages_still_fail() -> None:
+    manager = Mock()
+    manager.stream.side_effect = XeroInternalError(Mock(text='timed out'))
+    exporter = Export(paged=True, adaptive=True, page_size=25)
+    with ShouldRaise(XeroInternalError):
+        list(exporter._stream(manager))
+    compare(manager.stream.call_count, expected=1)
+
+
+def test_paginate_smaller_pages_after_error() -> None:
+    items = [{'ID': n} for n in range(3)]
+
+    def filter(page: int, pageSize: int) -> list[dict[str, Any]]:
+        if pageSize == 1000:
+            raise XeroInternalError(Mock(text='timed out'))
+        return items[(page - 1) * pageSize : page * pageSize]
+
+    manager = Mock(spec=['filter'])
+    manager.filter.side_effect = filter
+    exporter = Export(paged=True, adaptive=True)
+    compare(list(exporter._paginate(manager)), expected=[items])
+    compare(
+        [c.kwargs for c in manager.filter.call_args_list],
+        expected=[
+            {'page': 1, 'pageSize': 1000},
+            {'page': 1, 'pageSize': 500},
+            {'page': 2, 'pageSize': 500},
+        ],
+    )
+
+
+class PaginatedManager:
+    """
+    A manager that keeps the pagination details of the last page in the same way as
+    :class:`~xerotrust.client.SessionManager`.
+    """
+
+    def __init__(self, items: list[dict[str, Any]]) -> None:
+        self.items = items
+        self.metadata: dict[str, Any] = {}
+        self.pages: list[int] = []
+
+    def filter(self, page: int, pageSize: int) -> list[dict[str, Any]]:
+        self.pages.append(page)
+        self.metadata = {
+            'pagination': {
+                'pageCount': -(-len(self.items) // pageSize),
+                'itemCount': len(self.items),
+            }
+        }
+        return self.items[(page - 1) * pageSize : page * pageSize]
+
+
+class StreamingPaginatedManager(PaginatedManager):
+    def stream(self, page: int, pageSize: int) -> Iterator[dict[str, Any]]:
+        yield from self.filter(page, pageSize)
+
+
+def test_total_from_pagination_when_streaming() -> None:
+    items = [{'ID': n} for n in range(3)]
+    exporter = StaticExport(paged=True, page_size=2)
+    exported = iter(exporter.items(StreamingPaginatedManager(items), latest=None))
+    compare(exporter.total, expected=None)
+    next(exported)
+    compare(exporter.total, expected=3)
+    compare(list(exported), expected=items[1:])
+
+
+def test_total_from_pagination_of_pages() -> None:
+    items = [{'ID': n} for n in range(3)]
+    exporter = StaticExport(paged=True, page_size=2)
+    exported = iter(exporter.items(PaginatedManager(items), latest=None))
+    next(exported)
+    compare(exporter.total, expected=3)
+    compare(list(exported), expected=items[1:])
+
+
+def test_paginate_stops_at_page_count() -> None:
+    items = [{'ID': n} for n in range(4)]
+    manager = PaginatedManager(items)
+    exporter = Export(paged=True, page_size=2)
+    compare(list(exporter._paginate(manager)), expected=[items[:2], items[2:]])
+    # No empty page was needed to find that there were no more:
+    compare(manager.pages, expected=[1, 2])
+
+
+def test_paginate_continues_after_short_page() -> None:
+    # Xero may return fewer items than asked for, so only an empty page means the end:
+    manager = Mock(spec=['filter'])
+    manager.filter.side_effect = [[{'ID': 0}], [{'ID': 1}], []]
+    exporter = Export(paged=True, page_size=2)
+    compare(list(exporter._paginate(manager)), expected=[[{'ID': 0}], [{'ID': 1}]])
+    compare(manager.filter.call_count, expected=3)
+
+
+def test_windowed_raw_fields() -> None:
+    compare(
+        WindowedExport(id_field='InvoiceID').raw_fields(),
+        expected=frozenset({'CreatedDateUTC', 'UpdatedDateUTC', 'InvoiceID', 'Date'}),
+    )
+
+
+def test_windowed_one_worker_pages() -> None:
+    items = [{'ID': n} for n in range(3)]
+    exporter = WindowedExport(page_size=2)
+    pages = exporter._pages(PaginatedManager(items), latest=None)
+    compare(list(pages), expected=[items[:2], items[2:]])
+
+
+def test_windows_with_different_page_counts_paged_concurrently() -> None:
+    start = datetime.combine(date.today() - timedelta(days=10), time(), UTC)
+    # The first window has three pages and the second only one:
+    windows = [
+        [{'InvoiceID': f'i{n}', 'Date': start} for n in range(5)],
+        [{'InvoiceID': 'i5', 'Date': start + timedelta(days=8)}],
+    ]
+    # Both windows' first pages are in flight before either is returned:
+    barrier = Barrier(2, timeout=5)
+
+    def request(method: str, uri: str, params: dict[str, Any], **kwargs: Any) -> Mock:
+        page, size = int(params['page']), int(params['pageSize'])
+        if 'order' in params:
+            items = windows[0]
+        else:
+            items = windows[0 if '&&Date<' in params['where'] else 1]
+            if page == 1:
+                barrier.wait()
+        content = {
+            'Status': 'OK',
+            'pagination': {'pageCount': -(-len(items) // size), 'itemCount': len(items)},
+            'Invoices': [
+                {
+                    'InvoiceID': item['InvoiceID'],
+                    'Date': f'/Date({item["Date"].timestamp():.0f}000)/',
+                }
+                for item in items[(page - 1) * size : page * size]
+            ],
+        }
+        text = json.dumps(content)
+        return Mock(
+            status_code=200,
+            headers={'content-type': 'application/json'},
+            text=text,
+            content=text.encode(),
+            elapsed=timedelta(),
+        )
+
+    session = Mock(spec=Session(), headers={}, request=Mock(side_effect=request))
+    manager = Transport(session=session).manager('Invoices', SAMPLE_CREDENTIALS)
+    exporter = WindowedExport(workers=2, page_size=2, window=timedelta(days=7))
+
+    pages = list(exporter._pages(manager, latest=None))
+
+    compare(pages, expected=[windows[0][:2], windows[0][2:4], windows[0][4:], windows[1]])
+
+
+def test_call_retried_after_transient_error() -> None:
+    manager = Mock(spec=['all'])
+    manager.all.side_effect = [XeroInternalError(Mock(text='oops')), [{'ID': 1}]]
+    retries = TenantRetries('t1')
+    exporter = StaticExport(retries=retries)
+    mock_pause = Mock()
+    with replace_in_module(pause, mock_pause, module=export):
+        compare(list(exporter.items(manager, latest=None)), expected=[{'ID': 1}])
+    compare(manager.all.call_count, expected=2)
+    compare(mock_pause.call_count, expected=1)
+    compare(retries.stats.calls, expected=2)
+    compare(retries.stats.retries, expected=1)
+    compare(retries.stats.failed, expected=0)
+
+
+def test_call_not_retried_after_other_error() -> None:
+    manager = Mock(spec=['all'])
+    manager.all.side_effect = XeroBadRequest(
+        Mock(text='bad', headers={'content-type': 'text/html'})
+    )
+    retries = TenantRetries('t1')
+    exporter = StaticExport(retries=retries)
+    with ShouldRaise(XeroBadRequest):
+        list(exporter.items(manager, latest=None))
+    compare(manager.all.call_count, expected=1)
+    compare(retries.stats.retries, expected=0)
+
+
+def test_call_given_up_on() -> None:
+    manager = Mock(spec=['all'])
+    manager.all.side_effect = XeroInternalError(Mock(text='oops'))
+    retries = TenantRetries('t1', Backoff(attempts=2))
+    exporter = StaticExport(retries=retries)
+    with replace_in_module(pause, Mock(), module=export):
+        with ShouldRaise(XeroInternalError):
+            list(exporter.items(manager, latest=None))
+    compare(manager.all.call_count, expected=3)
+    compare(retries.stats.failed, expected=1)
+
+
+def test_rate_limit_wait_stopped() -> None:
+    manager = Mock(spec=['all'])
+    manager.all.side_effect = XeroRateLimitExceeded(Mock(headers={'retry-after': '60'}), {})
+    stop = Event()
+    stop.set()
+    exporter = StaticExport(stop=stop)
+    with ShouldRaise(Interrupted):
+        list(exporter.items(manager, latest=None))
+    compare(manager.all.call_count, expected=1)
+
+
+def test_paginate_retries_page() -> None:
+    items = [{'ID': n} for n in range(3)]
+    manager = Mock(spec=['filter'])
+    manager.filter.side_effect = [XeroInternalError(Mock(text='oops')), items, []]
+    exporter = Export(paged=True, retries=TenantRetries('t1'))
+    with replace_in_module(pause, Mock(), module=export):
+        compare(list(exporter._paginate(manager)), expected=[items])
+    compare(
+        [c.kwargs for c in manager.filter.call_args_list],
+        expected=[
+            {'page': 1, 'pageSize': 1000},
+            {'page': 1, 'pageSize': 1000},
+            {'page': 2, 'pageSize': 1000},
+        ],
+    )
+
+
+def test_paginate_smaller_pages_before_retrying() -> None:
+    items = [{'ID': n} for n in range(3)]
+    manager = Mock(spec=['filter'])
+    manager.filter.side_effect = [XeroInternalError(Mock(text='oops')), items, []]
+    retries = TenantRetries('t1')
+    exporter = Export(paged=True, adaptive=True, retries=retries)
+    compare(list(exporter._paginate(manager)), expected=[items])
+    compare(
+        [c.kwargs for c in manager.filter.call_args_list],
+        expected=[
+            {'page': 1, 'pageSize': 1000},
+            {'page': 1, 'pageSize': 500},
+            {'page': 2, 'pageSize': 500},
+        ],
+    )
+    compare(retries.stats.retries, expected=0)
+
+
+def test_stream_restarted_after_error() -> None:
+    items = [{'ID': n} for n in range(3)]
+    attempts = []
+
+    def stream() -> Iterator[dict[str, Any]]:
+        attempts.append(True)
+        for count, item in enumerate(items):
+            if len(attempts) == 1 and count == 2:
+                raise XeroInternalError(Mock(text='dropped'))
+            yield item
+
+    manager = Mock()
+    manager.stream.side_effect = stream
+    exporter = Export(retries=TenantRetries('t1'))
+    with replace_in_module(pause, Mock(), module=export):
+        compare(list(exporter._stream(manager)), expected=items)
+    compare(len(attempts), expected=2)
+
+
+def test_paginate_not_retried_after_other_error() -> None:
+    manager = Mock()
+    manager.filter.side_effect = ValueError('boom')
+    exporter = Export(paged=True, retries=TenantRetries('t1'))
+    with ShouldRaise(ValueError('boom')):
+        list(exporter._paginate(manager))
+    compare(manager.filter.call_count, expected=1)
+
+
+def test_pages_since_not_paged() -> None:
+    since = datetime(2023, 3, 15, tzinfo=UTC)
+    manager = Mock(spec=['filter'])
+    manager.filter.return_value = [{'ID': 1}]
+    exporter = Export(id_field='ID')
+    pages = exporter._pages(manager, latest={'UpdatedDateUTC': since})
+    compare(list(pages), expected=[[{'ID': 1}]])
+    manager.filter.assert_called_once_with(since=since)
+
+
+@pytest.mark.asyncio
+async def test_apages_since_not_paged() -> None:
+    since = datetime(2023, 3, 15, tzinfo=UTC)
+    manager = Mock(spec=['filter'])
+    manager.filter = AsyncMock(return_value=[{'ID': 1}])
+    exporter = Export(id_field='ID')
+    pages = exporter._apages(manager, latest={'UpdatedDateUTC': since})
+    compare([page async for page in pages], expected=[[{'ID': 1}]])
+    manager.filter.assert_awaited_once_with(since=since)
+
+
+@pytest.mark.asyncio
+async def test_acall_retried_after_transient_error() -> None:
+    manager = Mock(spec=['all'])
+    manager.all = AsyncMock(side_effect=[XeroInternalError(Mock(text='oops')), [{'ID': 1}]])
+    retries = TenantRetries('t1')
+    exporter = StaticExport(retries=retries)
+    sleep = AsyncMock()
+    with Replacer() as replace:
+        replace('xerotrust.export.async_sleep', sleep)
+        items = [item async for item in exporter.aitems(manager, latest=None)]
+    compare(items, expected=[{'ID': 1}])
+    compare(manager.all.call_count, expected=2)
+    compare(sleep.await_count, expected=1)
+    compare(retries.stats.calls, expected=2)
+    compare(retries.stats.retries, expected=1)
+
+
+@pytest.mark.asyncio
+async def test_acall_given_up_on() -> None:
+    manager = Mock(spec=['all'])
+    manager.all = AsyncMock(side_effect=XeroInternalError(Mock(text='oops')))
+    retries = TenantRetries('t1', Backoff(attempts=1))
+    exporter = StaticExport(retries=retries)
+    with Replacer() as replace:
+        replace('xerotrust.export.async_sleep', AsyncMock())
+        with ShouldRaise(XeroInternalError):
+            [item async for item in exporter.aitems(manager, latest=None)]
+    compare(manager.all.call_count, expected=2)
+    compare(retries.stats.failed, expected=1)
+
+
+@pytest.mark.asyncio
+async def test_apaginate_retries_page() -> None:
+    items = [{'ID': n} for n in range(3)]
+    manager = Mock(spec=['filter'])
+    manager.filter = AsyncMock(side_effect=[XeroInternalError(Mock(text='oops')), items, []])
+    exporter = Export(paged=True, retries=TenantRetries('t1'))
+    with Replacer() as replace:
+        replace('xerotrust.export.async_sleep', AsyncMock())
+        compare([page async for page in exporter._apaginate(manager)], expected=[items])
+    compare(
+        [c.kwargs for c in manager.filter.call_args_list],
+        expected=[
+            {'page': 1, 'pageSize': 1000},
+            {'page': 1, 'pageSize': 1000},
+            {'page': 2, 'pageSize': 1000},
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_apaginate_smaller_pages_after_error() -> None:
+    items = [{'ID': n} for n in range(3)]
+    manager = Mock(spec=['filter'])
+    manager.filter = AsyncMock(side_effect=[XeroInternalError(Mock(text='oops')), items, []])
+    exporter = Export(paged=True, adaptive=True, retries=TenantRetries('t1'))
+    compare([page async for page in exporter._apaginate(manager)], expected=[items])
+    compare(
+        [c.kwargs for c in manager.filter.call_args_list],
+        expected=[
+            {'page': 1, 'pageSize': 1000},
+            {'page': 1, 'pageSize': 500},
+            {'page': 2, 'pageSize': 500},
+        ],
+    )
+
+
+@pytest.mark.asyncio
+async def test_apaginate_not_retried_after_other_error() -> None:
+    manager = Mock(spec=['filter'])
+    manager.filter = AsyncMock(side_effect=ValueError('boom'))
+    exporter = Export(paged=True, retries=TenantRetries('t1'))
+    with ShouldRaise(ValueError('boom')):
+        [page async for page in exporter._apaginate(manager)]
+    compare(manager.filter.call_count, expected=1)
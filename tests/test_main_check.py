@@ -1,9 +1,26 @@
+import json
 from pathlib import Path
 from textwrap import dedent
+from typing import Any
 
+import pytest
 from testfixtures import ShouldRaise, compare
+from xero.exceptions import XeroNotFound
 
-from .helpers import run_cli, write_jsonl_file
+from .helpers import XERO_JOURNALS_URL, run_cli, write_jsonl_file
+
+
+MARCH = 1678924800000  # 2023-03-16
+MAY = 1682899200000  # 2023-05-01
+
+
+def journal(number: int) -> dict[str, Any]:
+    timestamp = MARCH if number < 100 else MAY
+    return {
+        'JournalID': f'j{number}',
+        'JournalNumber': number,
+        'JournalDate': f'/Date({timestamp}+0000)/',
+    }
 
 
 class TestCheck:
@@ -278,3 +295,103 @@ class TestCheck:
                         Date: None -> None
                 """),
         )
+
+    @pytest.mark.usefixtures("mock_credentials_from_file")
+    def test_check_repair_journals(self, tmp_path: Path, pook: Any) -> None:
+        tenant_path = tmp_path / 'Tenant 1'
+        tenant_path.mkdir()
+        (tenant_path / 'tenant.json').write_text('{"tenantId": "t1", "tenantName": "Tenant 1"}\n')
+        march = tenant_path / 'journals-2023-03.jsonl'
+        write_jsonl_file(march, [{"JournalID": "j1", "JournalNumber": 1}, {"JournalNumber": 4}])
+        june = tenant_path / 'journals-2023-06.jsonl'
+        write_jsonl_file(june, [{"JournalID": "j150", "JournalNumber": 150}])
+        # Journals 2, 3 and 5 to 149 are missing, which takes two pages to fetch:
+        for offset, page in (1, range(2, 102)), (101, range(102, 151)):
+            pook.get(
+                XERO_JOURNALS_URL,
+                headers={'Xero-Tenant-Id': 't1'},
+                params={'offset': str(offset)},
+                reply=200,
+                response_json={'Status': 'OK', 'Journals': [journal(n) for n in page]},
+            )
+
+        result = run_cli(tmp_path, 'check', 'journals', '--repair', str(march), str(june))
+
+        compare(
+            result.output,
+            expected=dedent("""\
+                Recovered 147 of 147 missing journals
+                       entries: 150
+                 JournalNumber: 1 -> 150
+                   JournalDate: 2023-03-16T00:00:00+00:00 -> 2023-05-01T00:00:00+00:00
+                CreatedDateUTC: None -> None
+                """),
+        )
+
+        def numbers(path: Path) -> list[int]:
+            return [json.loads(line)['JournalNumber'] for line in path.read_text().splitlines()]
+
+        compare(numbers(march), expected=list(range(1, 100)))
+        compare(numbers(tenant_path / 'journals-2023-05.jsonl'), expected=list(range(100, 150)))
+        compare(numbers(june), expected=[150])
+
+    @pytest.mark.usefixtures("mock_credentials_from_file")
+    def test_check_repair_journals_limits_saved_on_error(self, tmp_path: Path, pook: Any) -> None:
+        tenant_path = tmp_path / 'Tenant 1'
+        tenant_path.mkdir()
+        (tenant_path / 'tenant.json').write_text('{"tenantId": "t1", "tenantName": "Tenant 1"}\n')
+        march = tenant_path / 'journals-2023-03.jsonl'
+        write_jsonl_file(march, [{"JournalID": "j1", "JournalNumber": 1}, {"JournalNumber": 3}])
+        pook.get(
+            XERO_JOURNALS_URL,
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'offset': '1'},
+            reply=404,
+            response_headers={'X-DayLimit-Remaining': '500'},
+            response_json={'Status': 'ERROR', 'Message': 'Not Found'},
+        )
+
+        with ShouldRaise(XeroNotFound):
+            run_cli(tmp_path / 'auth.json', 'check', 'journals', '--repair', str(march))
+
+        limits = json.loads((tmp_path / 'auth.limits.json').read_text())
+        compare(limits['t1']['remaining'], expected=500)
+
+    def test_check_repair_transactions(self, tmp_path: Path) -> None:
+        transaction_file = tmp_path / "transactions.jsonl"
+        transaction_file.touch()
+
+        result = run_cli(
+            tmp_path,
+            'check',
+            'transactions',
+            '--repair',
+            str(transaction_file),
+            expected_return_code=1,
+        )
+
+        compare(result.output, expected='Error: Only journals can be repaired\n')
+
+    def test_check_sealed_uses_cache(self, tmp_path: Path) -> None:
+        (tmp_path / 'organisations.jsonl').write_text('{"EndOfYearLockDate": "2025-01-31"}\n')
+        sealed = tmp_path / "journals-2025-01.jsonl"
+        write_jsonl_file(sealed, [{"JournalID": "j1", "JournalNumber": 1}])
+        current = tmp_path / "journals-2025-02.jsonl"
+        write_jsonl_file(current, [{"JournalID": "j2", "JournalNumber": 2}])
+
+        first = run_cli(tmp_path, 'check', 'journals', str(sealed), str(current))
+
+        compare(
+            json.loads((tmp_path / 'sealed.json').read_text()),
+            expected={
+                'journals-2025-01.jsonl': {
+                    'size': 40,
+                    'check journals': [{"JournalID": "j1", "JournalNumber": 1}],
+                }
+            },
+        )
+
+        # Files that can't change aren't read again:
+        sealed.write_text('x' * 40)
+        second = run_cli(tmp_path, 'check', 'journals', str(sealed), str(current))
+        compare(second.output, expected=first.output)
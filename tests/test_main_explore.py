@@ -169,6 +169,48 @@ class TestExplore:
             ),
         )
 
+    def test_explore_count(
+        self, mock_credentials_from_file: Mock, tmp_path: Path, pook: Any
+    ) -> None:
+        add_tenants_response(pook)
+        pook.get(
+            XERO_CONTACTS_URL,
+            headers={"If-Modified-Since": "Sun, 20 Apr 2025 00:00:00 GMT"},
+            params={"page": "1", "pageSize": "1"},
+            reply=200,
+            response_json={
+                "Status": "OK",
+                "pagination": {"page": 1, "pageSize": 1, "pageCount": 1234, "itemCount": 1234},
+                "Contacts": [{"ContactID": "c1", "Name": "Contact 1"}],
+            },
+        )
+        result = run_cli(tmp_path, "explore", "contacts", "--count", "--since", "2025-04-20")
+        compare(result.output, expected="1234\n")
+
+    def test_explore_count_not_paged(
+        self, mock_credentials_from_file: Mock, tmp_path: Path, pook: Any
+    ) -> None:
+        add_tenants_response(pook)
+        pook.get(
+            XERO_JOURNALS_URL,
+            reply=200,
+            response_json={"Status": "OK", "Journals": [{"JournalID": "j1", "JournalNumber": 1}]},
+        )
+        result = run_cli(tmp_path, "explore", "journals", "--count", expected_return_code=1)
+        compare(result.output, expected="Error: Journals does not say how many items it has\n")
+
+    @pytest.mark.parametrize("option", [["--id", "c1"], ["--page", "2"], ["--page-size", "5"]])
+    def test_explore_count_invalid(
+        self, mock_credentials_from_file: Mock, tmp_path: Path, option: list[str]
+    ) -> None:
+        result = run_cli(
+            tmp_path, "explore", "contacts", "--count", *option, expected_return_code=1
+        )
+        compare(
+            result.output,
+            expected="Error: --count cannot be used with --id, --page or --page-size\n",
+        )
+
     def test_explore_with_field(
         self, mock_credentials_from_file: Mock, tmp_path: Path, pook: Any
     ) -> None:
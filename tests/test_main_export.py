@@ -1,21 +1,27 @@
 import json
-import time
+import os
+from datetime import datetime, timedelta, UTC
 from pathlib import Path
 from textwrap import dedent
-from typing import Any
+from threading import Event
+from typing import Any, Iterator
 
-from unittest.mock import Mock
+from unittest.mock import ANY, Mock
 
 import pytest
 from pytest_insta import SnapshotFixture
-from testfixtures import replace_in_module, ShouldRaise, compare
-from xero.exceptions import XeroInternalError
+from testfixtures import LogCapture, Replacer, replace_in_module, ShouldRaise, compare
+from xero.exceptions import XeroInternalError, XeroNotFound
 
 from xerotrust import export
+from xerotrust.exceptions import DailyLimitExhausted
+from xerotrust.ratelimit import pause
 
 from .helpers import (
     FileChecker,
     XERO_API_URL,
+    XERO_JOURNALS_URL,
+    add_empty_page,
     add_tenants_response,
     run_cli,
 )
@@ -24,7 +30,20 @@ from .helpers import (
 pytestmark = pytest.mark.usefixtures("mock_credentials_from_file")
 
 
+NOW = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def fetched(*endpoints: str) -> str:
+    return json.dumps({endpoint: NOW.isoformat() for endpoint in endpoints}, indent=2)
+
+
 class TestExport:
+    @pytest.fixture(autouse=True)
+    def now(self) -> Iterator[None]:
+        with Replacer() as replace:
+            replace('xerotrust.export.now', lambda: NOW)
+            yield
+
     def test_all_endpoints_single_tenant(
         self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
     ) -> None:
@@ -429,6 +448,15 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'Contacts')
+        add_empty_page(pook, 'Invoices')
+        add_empty_page(pook, 'CreditNotes')
+        add_empty_page(pook, 'ManualJournals')
+        add_empty_page(pook, 'Overpayments')
+        add_empty_page(pook, 'Payments')
+        add_empty_page(pook, 'Prepayments')
+        add_empty_page(pook, 'PurchaseOrders')
+        add_empty_page(pook, 'Quotes')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path))
 
@@ -457,6 +485,14 @@ class TestExport:
                 'Tenant 1/contactgroups.jsonl': '{"ContactGroupID": "cg1", "Name": "VIP Customers", "Status": "ACTIVE"}\n',
                 'Tenant 1/quotes.jsonl': '{"QuoteID": "q1", "QuoteNumber": "QU-001", "Date": "2023-01-01T00:00:00+00:00", "ExpiryDate": "2023-02-01T00:00:00+00:00", "Status": "DRAFT", "Total": 500.0, "UpdatedDateUTC": "2023-01-01T00:00:00+00:00"}\n',
                 'Tenant 1/batchpayments.jsonl': '{"BatchPaymentID": "bp1", "Reference": "BP-001", "Date": "2023-01-01T00:00:00+00:00", "Amount": 1000.0, "Type": "PAYBATCH", "Status": "AUTHORISED", "UpdatedDateUTC": "2023-01-01T00:00:00+00:00"}\n',
+                'Tenant 1/fetched.json': fetched(
+                    'BrandingThemes',
+                    'ContactGroups',
+                    'Currencies',
+                    'Organisations',
+                    'TaxRates',
+                    'TrackingCategories',
+                ),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/latest.json': snapshot,
             }
@@ -513,6 +549,7 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'Invoices')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', 'invoices')
 
@@ -524,6 +561,77 @@ class TestExport:
             }
         )
 
+    def test_invoices_windowed(self, tmp_path: Path, pook: Any, check_files: FileChecker) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        inv1 = {'InvoiceID': 'inv1', 'Date': '/Date(1672531200000+0000)/'}  # 2023-01-01
+        inv2 = {'InvoiceID': 'inv2', 'Date': '/Date(1709251200000+0000)/'}  # 2024-03-01
+
+        # Find the earliest invoice:
+        pook.get(
+            f"{XERO_API_URL}/Invoices",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'order': 'Date ASC', 'page': '1', 'pageSize': '1'},
+            reply=200,
+            response_json={'Status': 'OK', 'Invoices': [inv1]},
+        )
+        # The first two windows are a year long:
+        for where, invoices in (
+            ('Date>=DateTime(2023,1,1)&&Date<DateTime(2024,1,1)', [inv1]),
+            ('Date>=DateTime(2024,1,1)&&Date<DateTime(2024,12,31)', [inv2]),
+        ):
+            pook.get(
+                f"{XERO_API_URL}/Invoices",
+                headers={'Xero-Tenant-Id': 't1'},
+                params={'where': where},
+                reply=200,
+                response_json={'Status': 'OK', 'Invoices': invoices},
+            )
+        # ...after which they grow, until the last open-ended window, which depends on today:
+        pook.get(
+            f"{XERO_API_URL}/Invoices",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=200,
+            response_json={'Status': 'OK', 'Invoices': []},
+        ).persist()
+
+        run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', '-w', '2', 'invoices'
+        )
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/invoices.jsonl': (
+                    '{"InvoiceID": "inv1", "Date": "2023-01-01T00:00:00+00:00"}\n'
+                    '{"InvoiceID": "inv2", "Date": "2024-03-01T00:00:00+00:00"}\n'
+                ),
+                'Tenant 1/latest.json': '{}\n',
+            }
+        )
+
+    def test_invoices_windowed_none(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        pook.get(
+            f"{XERO_API_URL}/Invoices",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'order': 'Date ASC', 'page': '1', 'pageSize': '1'},
+            reply=200,
+            response_json={'Status': 'OK', 'Invoices': []},
+        )
+
+        run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', '-w', '2', 'invoices'
+        )
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/latest.json': '{}\n',
+            }
+        )
+
     def test_creditnotes(self, tmp_path: Path, pook: Any, check_files: FileChecker) -> None:
         add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
 
@@ -545,6 +653,7 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'CreditNotes')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', 'creditnotes')
 
@@ -578,12 +687,78 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('Currencies'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/currencies.jsonl': '{"Code": "USD", "Description": "United States Dollar"}\n',
                 'Tenant 1/latest.json': '{}\n',
             }
         )
 
+    def test_currencies_fetched_recently(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        tenant_path = tmp_path / 'Tenant 1'
+        recently = json.dumps({'Currencies': (NOW - timedelta(hours=23)).isoformat()}, indent=2)
+        self.write_json(tenant_path / 'latest.json', {})
+        (tenant_path / 'fetched.json').write_text(recently)
+        (tenant_path / 'currencies.jsonl').write_text('{"Code": "USD"}\n')
+
+        # No request is made for currencies:
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), 'currencies')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/currencies.jsonl': '{"Code": "USD"}\n',
+                'Tenant 1/fetched.json': recently,
+                'Tenant 1/latest.json': '{}\n',
+            }
+        )
+
+    @pytest.mark.parametrize(
+        "age, args", [(timedelta(days=1), ()), (timedelta(hours=1), ('--force',))]
+    )
+    def test_currencies_unchanged(
+        self,
+        tmp_path: Path,
+        pook: Any,
+        check_files: FileChecker,
+        age: timedelta,
+        args: tuple[str, ...],
+    ) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        tenant_path = tmp_path / 'Tenant 1'
+        tenant_path.mkdir()
+        (tenant_path / 'fetched.json').write_text(json.dumps({'Currencies': str(NOW - age)}))
+        currencies = tenant_path / 'currencies.jsonl'
+        currencies.write_text('{"Code": "USD", "Description": "United States Dollar"}\n')
+        os.utime(currencies, (0, 0))
+        pook.get(
+            f"{XERO_API_URL}/Currencies",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Currencies': [{'Code': 'USD', 'Description': 'United States Dollar'}],
+            },
+        )
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), *args, 'currencies')
+
+        # Fetched, but the same as before so left as it was:
+        compare(currencies.stat().st_mtime, expected=0)
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/currencies.jsonl': (
+                    '{"Code": "USD", "Description": "United States Dollar"}\n'
+                ),
+                'Tenant 1/fetched.json': fetched('Currencies'),
+                'Tenant 1/latest.json': '{}\n',
+            }
+        )
+
     def test_employees(self, tmp_path: Path, pook: Any, check_files: FileChecker) -> None:
         add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
 
@@ -665,6 +840,7 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'ManualJournals')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', 'manualjournals')
 
@@ -676,6 +852,302 @@ class TestExport:
             }
         )
 
+    def test_contacts_paged(self, tmp_path: Path, pook: Any, check_files: FileChecker) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        for page, contacts in (('1', ['c1', 'c2']), ('2', ['c3', 'c4']), ('3', ['c5'])):
+            pook.get(
+                f"{XERO_API_URL}/Contacts",
+                headers={'Xero-Tenant-Id': 't1'},
+                params={'page': page, 'pageSize': '2'},
+                reply=200,
+                response_json={
+                    'Status': 'OK',
+                    'Contacts': [{'ContactID': contact_id} for contact_id in contacts],
+                },
+            )
+        add_empty_page(pook, 'Contacts', page=4)
+
+        with Replacer() as replace:
+            paged = export.Export("contacts.jsonl", paged=True, page_size=2)
+            replace(export.EXPORTS, paged, name='Contacts')
+            run_cli(tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', 'contacts')
+
+        # an empty page means there are no more to fetch:
+        assert pook.isdone()
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/contacts.jsonl': ''.join(
+                    f'{{"ContactID": "c{i}"}}\n' for i in range(1, 6)
+                ),
+                'Tenant 1/latest.json': '{}\n',
+            }
+        )
+
+    def test_contacts_paged_stops_on_empty_page(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        for page, contacts in (('1', ['c1', 'c2']), ('2', [])):
+            pook.get(
+                f"{XERO_API_URL}/Contacts",
+                headers={'Xero-Tenant-Id': 't1'},
+                params={'page': page, 'pageSize': '2'},
+                reply=200,
+                response_json={
+                    'Status': 'OK',
+                    'Contacts': [{'ContactID': contact_id} for contact_id in contacts],
+                },
+            )
+
+        with Replacer() as replace:
+            paged = export.Export("contacts.jsonl", paged=True, page_size=2)
+            replace(export.EXPORTS, paged, name='Contacts')
+            run_cli(tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', 'contacts')
+
+        assert pook.isdone()
+        compare(
+            (tmp_path / 'Tenant 1' / 'contacts.jsonl').read_text(),
+            expected='{"ContactID": "c1"}\n{"ContactID": "c2"}\n',
+        )
+
+    def test_async(self, tmp_path: Path, pook: Any, check_files: FileChecker) -> None:
+        add_tenants_response(
+            pook,
+            [
+                {'tenantId': 't1', 'tenantName': 'Tenant 1'},
+                {'tenantId': 't2', 'tenantName': 'Tenant 2'},
+            ],
+        )
+        for tenant_id in 't1', 't2':
+            pook.get(
+                f"{XERO_API_URL}/Accounts",
+                headers={'Xero-Tenant-Id': tenant_id, 'Authorization': 'Bearer test_token'},
+                reply=200,
+                response_json={'Status': 'OK', 'Accounts': [{'AccountID': f'{tenant_id}-a1'}]},
+            )
+            for offset, journals in (('0', [1, 2]), ('2', [])):
+                pook.get(
+                    f"{XERO_API_URL}/Journals",
+                    headers={'Xero-Tenant-Id': tenant_id},
+                    params={'offset': offset},
+                    reply=200,
+                    response_json={
+                        'Status': 'OK',
+                        'Journals': [
+                            {
+                                'JournalID': f'{tenant_id}-j{number}',
+                                'JournalNumber': number,
+                                'JournalDate': '/Date(1672531200000+0000)/',  # 2023-01-01
+                            }
+                            for number in journals
+                        ],
+                    },
+                )
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--async', 'accounts', 'journals')
+
+        assert pook.isdone()
+        expected: dict[str, str | SnapshotFixture] = {}
+        for tenant_id, name in ('t1', 'Tenant 1'), ('t2', 'Tenant 2'):
+            expected.update(
+                {
+                    f'{name}/tenant.json': json.dumps({'tenantId': tenant_id, 'tenantName': name}),
+                    f'{name}/accounts.jsonl': f'{{"AccountID": "{tenant_id}-a1"}}\n',
+                    f'{name}/journals-2023-01.jsonl': (
+                        f'{{"JournalID": "{tenant_id}-j1", "JournalNumber": 1, '
+                        '"JournalDate": "2023-01-01T00:00:00+00:00"}\n'
+                        f'{{"JournalID": "{tenant_id}-j2", "JournalNumber": 2, '
+                        '"JournalDate": "2023-01-01T00:00:00+00:00"}\n'
+                    ),
+                    f'{name}/latest.json': (
+                        '{\n  "Journals": {\n'
+                        '    "JournalDate": "2023-01-01T00:00:00+00:00",\n'
+                        '    "JournalNumber": 2\n  }\n}\n'
+                    ),
+                }
+            )
+        check_files(expected)
+
+    @pytest.mark.parametrize("args", [('--jobs', '2'), ('--workers', '2'), ('--prefetch', '0')])
+    def test_async_invalid(self, tmp_path: Path, args: tuple[str, ...]) -> None:
+        result = run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--async', *args, expected_return_code=1
+        )
+        compare(
+            result.output,
+            expected='Error: --jobs, --workers and --prefetch cannot be used with --async\n',
+        )
+
+    def test_async_without_httpx(self, tmp_path: Path) -> None:
+        with Replacer() as replace:
+            replace('xerotrust.main.find_spec', lambda name: None)
+            result = run_cli(
+                tmp_path, 'export', '--path', str(tmp_path), '--async', expected_return_code=1
+            )
+        compare(result.output, expected='Error: --async needs httpx, install xerotrust[async]\n')
+
+    @pytest.mark.parametrize("option", ['--summary', '--prune'])
+    def test_async_summary_or_prune(self, tmp_path: Path, option: str) -> None:
+        result = run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--async', '--update', option,
+            expected_return_code=1,
+        )  # fmt: skip
+        compare(
+            result.output, expected='Error: --summary and --prune cannot be used with --async\n'
+        )
+
+    def test_async_update(self, tmp_path: Path, pook: Any, check_files: FileChecker) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        self.write_json(
+            tenant_path / "latest.json",
+            {"Contacts": {"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}},
+        )
+        self.write_json(
+            tenant_path / "contacts.jsonl",
+            {"ContactID": "c1", "Name": "Old", "UpdatedDateUTC": "2023-03-14T00:00:00+00:00"},
+        )
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            headers={'Xero-Tenant-Id': "t1"},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Contacts': [
+                    {
+                        'ContactID': 'c1',
+                        'Name': 'New',
+                        'UpdatedDateUTC': '/Date(1678924800000+0000)/',
+                    },  # 2023-03-16
+                ],
+            },
+        )
+        add_empty_page(pook, 'Contacts')
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--async', '--update', 'contacts')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}',
+                # The earlier version of the contact is replaced:
+                'Tenant 1/contacts.jsonl': (
+                    '{"ContactID": "c1", "Name": "New", '
+                    '"UpdatedDateUTC": "2023-03-16T00:00:00+00:00"}\n'
+                ),
+                'Tenant 1/latest.json': (
+                    '{\n  "Contacts": {\n    "UpdatedDateUTC": "2023-03-16T00:00:00+00:00"\n  }\n}'
+                ),
+            }
+        )
+        history = json.loads(tmp_path.with_suffix('.history.json').read_text())
+        compare(history['t1']['calls'], expected={'Contacts': {'update': 2}})
+
+    def test_async_interrupted(self, tmp_path: Path, pook: Any, check_files: FileChecker) -> None:
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        pook.get(
+            f"{XERO_API_URL}/Journals",
+            params={'offset': '0'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Journals': [
+                    {
+                        'JournalID': 'j1',
+                        'JournalDate': '/Date(1678838400000+0000)/',
+                        'JournalNumber': 1,
+                    },  # 2023-03-15
+                    {
+                        'JournalID': 'j2',
+                        'JournalDate': '/Date(1678924800000+0000)/',
+                        'JournalNumber': 2,
+                    },  # 2023-03-16
+                ],
+            },
+        )
+        stop = Event()
+        stop.set()
+
+        with Replacer() as replace:
+            replace('xerotrust.main.Event', lambda: stop)
+            result = run_cli(
+                tmp_path,
+                'export',
+                '--path',
+                str(tmp_path),
+                '--async',
+                'journals',
+                expected_return_code=1,
+            )
+
+        compare(
+            result.output,
+            expected='Error: Export interrupted, use --update to carry on from where it stopped\n',
+        )
+        checkpoints = json.loads((tmp_path / 'Tenant 1' / 'checkpoints.json').read_text())
+        compare(
+            checkpoints['Journals']['latest'],
+            expected={'JournalDate': '2023-03-15T00:00:00+00:00', 'JournalNumber': 1},
+        )
+
+    def test_async_rarely_changes(self, tmp_path: Path, pook: Any) -> None:
+        currencies_path = tmp_path / 'Tenant 1' / 'currencies.jsonl'
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        pook.get(
+            f"{XERO_API_URL}/Currencies",
+            headers={'Xero-Tenant-Id': "t1"},
+            reply=200,
+            response_json={'Status': 'OK', 'Currencies': [{'Code': 'GBP'}]},
+        )
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--async', 'currencies')
+        compare(currencies_path.read_text(), expected='{"Code": "GBP"}\n')
+        compare(
+            (tmp_path / 'Tenant 1' / 'fetched.json').read_text(), expected=fetched('Currencies')
+        )
+
+        # Fetched recently enough, so not fetched again:
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--async', 'currencies')
+        assert pook.isdone()
+        compare(currencies_path.read_text(), expected='{"Code": "GBP"}\n')
+
+    def test_async_bank_transactions_page_size(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        pook.get(
+            f"{XERO_API_URL}/BankTransactions",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'page': '1', 'pageSize': '1000'},
+            reply=200,
+            response_json={'Status': 'OK', 'BankTransactions': self.bank_transactions(2)},
+        )
+        add_empty_page(pook, 'BankTransactions')
+
+        run_cli(
+            tmp_path / 'auth.json',
+            'export',
+            '--path',
+            str(tmp_path),
+            '--async',
+            'banktransactions',
+        )
+
+        lines = (tmp_path / 'Tenant 1' / 'transactions-2023-03.jsonl').read_text().splitlines()
+        compare(len(lines), expected=2)
+        history = json.loads((tmp_path / 'auth.history.json').read_text())
+        compare(history['t1']['page_size'], expected={'BankTransactions': 1000})
+        compare(history['t1']['calls'], expected={'BankTransactions': {'full': 2}})
+
+    def test_async_error(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        pook.get(
+            f"{XERO_API_URL}/Accounts",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=404,
+            response_json={'Status': 'ERROR', 'Message': 'Not Found'},
+        )
+
+        with ShouldRaise(XeroNotFound) as s:
+            run_cli(tmp_path, 'export', '--path', str(tmp_path), '--async', 'accounts')
+        compare(s.raised.__notes__, expected=["while exporting 'Accounts'"])
+
     def test_specific_endpoint_multiple_tenants(
         self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
     ) -> None:
@@ -716,6 +1188,8 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'Contacts')
+        add_empty_page(pook, 'Contacts', tenant_id='t2')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path), 'contacts')
 
@@ -730,6 +1204,45 @@ class TestExport:
             },
         )
 
+    def test_multiple_tenants_concurrently(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        add_tenants_response(
+            pook,
+            [
+                {'tenantId': 't1', 'tenantName': 'Tenant 1'},
+                {'tenantId': 't2', 'tenantName': 'Tenant 2'},
+            ],
+        )
+        for tenant_id in 't1', 't2':
+            for endpoint in 'Accounts', 'Contacts':
+                pook.get(
+                    f"{XERO_API_URL}/{endpoint}",
+                    headers={'Xero-Tenant-Id': tenant_id},
+                    reply=200,
+                    response_json={
+                        'Status': 'OK',
+                        endpoint: [{'ID': f'{tenant_id}-{endpoint}'}],
+                    },
+                )
+        add_empty_page(pook, 'Contacts')
+        add_empty_page(pook, 'Contacts', tenant_id='t2')
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--jobs', '4', 'accounts', 'contacts')
+
+        check_files(
+            {
+                'Tenant 1/accounts.jsonl': '{"ID": "t1-Accounts"}\n',
+                'Tenant 1/contacts.jsonl': '{"ID": "t1-Contacts"}\n',
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/latest.json': '{}\n',
+                'Tenant 2/accounts.jsonl': '{"ID": "t2-Accounts"}\n',
+                'Tenant 2/contacts.jsonl': '{"ID": "t2-Contacts"}\n',
+                'Tenant 2/tenant.json': '{"tenantId": "t2", "tenantName": "Tenant 2"}\n',
+                'Tenant 2/latest.json': '{}\n',
+            },
+        )
+
     def test_journals_uses_journals_export(
         self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
     ) -> None:
@@ -816,15 +1329,15 @@ class TestExport:
             },
         )
 
-        # Mock the sleep function to avoid actually waiting
-        mock_sleep = Mock()
+        # Mock pausing to avoid actually waiting
+        mock_pause = Mock()
 
-        with replace_in_module(time.sleep, mock_sleep, module=export):
+        with replace_in_module(pause, mock_pause, module=export):
             # Run the export command for journals only
             run_cli(tmp_path, 'export', 'journals', '--path', str(tmp_path))
 
-        # Verify sleep was called with retry-after value
-        mock_sleep.assert_called_once_with(1)
+        # Verify the pause was for the retry-after value
+        mock_pause.assert_called_once_with(1, ANY)
 
         # Verify the journal was exported after retrying
         check_files(
@@ -835,47 +1348,106 @@ class TestExport:
             }
         )
 
-    def test_accounts_with_rate_limit(
-        self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
+    def test_journals_retried_after_server_error(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
     ) -> None:
         add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
-
-        # First request hits rate limit
         pook.get(
-            f"{XERO_API_URL}/Accounts",
+            f"{XERO_API_URL}/Journals",
             headers={'Xero-Tenant-Id': 't1'},
-            reply=429,  # Rate limit exceeded
-            response_headers={'retry-after': '2'},  # Server responds with retry-after header
+            params={'offset': '0'},
+            reply=503,
+            response_json={'Status': 'ERROR', 'Message': 'Service Unavailable'},
         )
-
-        # Second request (after retry) succeeds
         pook.get(
-            f"{XERO_API_URL}/Accounts",
+            f"{XERO_API_URL}/Journals",
             headers={'Xero-Tenant-Id': 't1'},
+            params={'offset': '0'},
             reply=200,
             response_json={
                 'Status': 'OK',
-                'Accounts': [
+                'Journals': [
                     {
-                        'AccountID': 'a1',
-                        'Name': 'Test Account',
-                        'Code': '200',
-                        'Type': 'BANK',
-                        'UpdatedDateUTC': '/Date(1672531200000+0000)/',  # 2023-01-01
-                    }
-                ],
+                        'JournalID': 'j1',
+                        'JournalDate': '/Date(1681948800000+0000)/',
+                        'JournalNumber': 1,
+                    },
+                ],
+            },
+        )
+        pook.get(
+            f"{XERO_API_URL}/Journals",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'offset': '1'},
+            reply=200,
+            response_json={'Status': 'OK', 'Journals': []},
+        )
+
+        mock_pause = Mock()
+        with replace_in_module(pause, mock_pause, module=export):
+            run_cli(tmp_path, 'export', 'journals', '--path', str(tmp_path))
+
+        compare(mock_pause.call_count, expected=1)
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/journals-2023-04.jsonl': (
+                    '{"JournalID": "j1", "JournalDate": "2023-04-20T00:00:00+00:00", '
+                    '"JournalNumber": 1}\n'
+                ),
+                'Tenant 1/latest.json': (
+                    '{\n  "Journals": {\n    "JournalDate": "2023-04-20T00:00:00+00:00",\n'
+                    '    "JournalNumber": 1\n  }\n}'
+                ),
+            }
+        )
+        stats = json.loads(tmp_path.with_suffix('.retries.json').read_text())['t1']
+        compare(
+            {k: stats[k] for k in ('calls', 'retries', 'failed', 'rejected')},
+            expected={'calls': 3, 'retries': 1, 'failed': 0, 'rejected': 0},
+        )
+
+    def test_accounts_with_rate_limit(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
+    ) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+
+        # First request hits rate limit
+        pook.get(
+            f"{XERO_API_URL}/Accounts",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=429,  # Rate limit exceeded
+            response_headers={'retry-after': '2'},  # Server responds with retry-after header
+        )
+
+        # Second request (after retry) succeeds
+        pook.get(
+            f"{XERO_API_URL}/Accounts",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Accounts': [
+                    {
+                        'AccountID': 'a1',
+                        'Name': 'Test Account',
+                        'Code': '200',
+                        'Type': 'BANK',
+                        'UpdatedDateUTC': '/Date(1672531200000+0000)/',  # 2023-01-01
+                    }
+                ],
             },
         )
 
-        # Mock the sleep function to avoid actually waiting
-        mock_sleep = Mock()
+        # Mock pausing to avoid actually waiting
+        mock_pause = Mock()
 
-        with replace_in_module(time.sleep, mock_sleep, module=export):
+        with replace_in_module(pause, mock_pause, module=export):
             # Run the export command for accounts only
             run_cli(tmp_path, 'export', 'accounts', '--path', str(tmp_path))
 
-        # Verify sleep was called with retry-after value
-        mock_sleep.assert_called_once_with(2)
+        # Verify the pause was for the retry-after value
+        mock_pause.assert_called_once_with(2, ANY)
 
         # Verify the account was exported after retrying
         check_files(
@@ -886,6 +1458,277 @@ class TestExport:
             }
         )
 
+    def test_daily_limit_saved(self, tmp_path: Path, pook: Any, check_files: FileChecker) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        pook.get(
+            f"{XERO_API_URL}/Accounts",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=200,
+            response_headers={'X-DayLimit-Remaining': '1234'},
+            response_json={'Status': 'OK', 'Accounts': []},
+        )
+
+        run_cli(tmp_path / 'auth.json', 'export', 'accounts', '--path', str(tmp_path))
+
+        limits = json.loads((tmp_path / 'auth.limits.json').read_text())
+        compare(limits['t1']['remaining'], expected=1234)
+
+    def write_limits(self, tmp_path: Path, remaining: int) -> None:
+        observed = datetime.now(UTC).isoformat()
+        self.write_json(
+            tmp_path / 'auth.limits.json', {'t1': {'remaining': remaining, 'observed': observed}}
+        )
+
+    def test_plan_dry_run(self, tmp_path: Path, pook: Any, snapshot: SnapshotFixture) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.write_limits(tmp_path, 6)
+        # Probes to find how many pages there are:
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'page': '1', 'pageSize': '1'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'pagination': {'page': 1, 'pageSize': 1, 'pageCount': 1500, 'itemCount': 1500},
+                'Contacts': [{'ContactID': 'c1'}],
+            },
+        )
+        pook.get(
+            XERO_JOURNALS_URL,
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'offset': '100'},
+            reply=200,
+            response_json={'Status': 'OK', 'Journals': []},
+        )
+        pook.get(
+            XERO_JOURNALS_URL,
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'offset': '0'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Journals': [{'JournalID': f'j{n}', 'JournalNumber': n} for n in (1, 2, 3)],
+            },
+        )
+
+        result = run_cli(
+            tmp_path / 'auth.json', 'export', '--path', str(tmp_path), '--plan', '--dry-run',
+            'accounts', 'contacts', 'journals',
+        )  # fmt: skip
+
+        compare(result.output, expected=snapshot())
+        compare((tmp_path / 'auth.history.json').exists(), expected=False)
+        compare((tmp_path / 'Tenant 1' / 'accounts.jsonl').exists(), expected=False)
+
+    def test_plan_defers_everything(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.write_limits(tmp_path, 0)
+
+        run_cli(tmp_path / 'auth.json', 'export', '--path', str(tmp_path), '--plan', 'accounts')
+
+        # Nothing is left to export, but what was deferred is still kept for the next run:
+        compare(
+            json.loads((tmp_path / 'auth.history.json').read_text()),
+            expected={'t1': {'deferred': ['Accounts']}},
+        )
+        compare((tmp_path / 'Tenant 1' / 'accounts.jsonl').exists(), expected=False)
+
+    def test_plan_fresh(self, tmp_path: Path, pook: Any, snapshot: SnapshotFixture) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.write_limits(tmp_path, 6)
+        tenant_path = tmp_path / 'Tenant 1'
+        tenant_path.mkdir()
+        (tenant_path / 'fetched.json').write_text(fetched('Currencies'))
+        (tenant_path / 'currencies.jsonl').write_text('{"Code": "USD"}\n')
+
+        result = run_cli(
+            tmp_path / 'auth.json', 'export', '--path', str(tmp_path), '--plan', '--dry-run',
+            'accounts', 'currencies',
+        )  # fmt: skip
+
+        compare(result.output, expected=snapshot())
+
+    def test_plan_defers_what_does_not_fit(
+        self, tmp_path: Path, pook: Any, snapshot: SnapshotFixture
+    ) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.write_limits(tmp_path, 3)
+        self.write_json(
+            tmp_path / 'auth.history.json',
+            {
+                't1': {
+                    'calls': {'Accounts': {'full': 1}, 'Contacts': {'full': 3}},
+                    'deferred': ['Items'],
+                }
+            },
+        )
+        pook.get(
+            f"{XERO_API_URL}/Items",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=200,
+            response_json={'Status': 'OK', 'Items': []},
+        )
+        pook.get(
+            f"{XERO_API_URL}/Accounts",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=200,
+            response_json={'Status': 'OK', 'Accounts': []},
+        )
+
+        result = run_cli(
+            tmp_path / 'auth.json', 'export', '--path', str(tmp_path), '--plan',
+            'accounts', 'contacts', 'items',
+        )  # fmt: skip
+
+        compare(result.output, expected=snapshot())
+        compare(
+            json.loads((tmp_path / 'auth.history.json').read_text()),
+            expected={
+                't1': {
+                    'calls': {
+                        'Accounts': {'full': 1},
+                        'Contacts': {'full': 3},
+                        'Items': {'full': 1},
+                    },
+                    'deferred': ['Contacts'],
+                }
+            },
+        )
+
+    @pytest.mark.parametrize(
+        "args, message",
+        [
+            (('--plan', '--async'), '--plan cannot be used with --async or --window'),
+            (('--plan', '--window', '2023-03'), '--plan cannot be used with --async or --window'),
+            (('--dry-run',), '--dry-run can only be used with --plan'),
+        ],
+    )
+    def test_plan_invalid(self, tmp_path: Path, args: tuple[str, ...], message: str) -> None:
+        result = run_cli(tmp_path, 'export', '--path', str(tmp_path), *args, expected_return_code=1)
+        compare(result.output, expected=f'Error: {message}\n')
+
+    def test_summary_without_update(self, tmp_path: Path) -> None:
+        result = run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--summary', expected_return_code=1
+        )
+        compare(result.output, expected='Error: --summary can only be used with --update\n')
+
+    def test_raw_with_update(self, tmp_path: Path) -> None:
+        result = run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--raw', '--update', expected_return_code=1
+        )
+        compare(result.output, expected='Error: --raw cannot be used with --update\n')
+
+    def test_prune_without_update(self, tmp_path: Path) -> None:
+        result = run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--prune', expected_return_code=1
+        )
+        compare(result.output, expected='Error: --prune can only be used with --update\n')
+
+    def test_shared_limits(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        pook.get(
+            f"{XERO_API_URL}/Accounts",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=200,
+            response_headers={'X-MinLimit-Remaining': '42'},
+            response_json={'Status': 'OK', 'Accounts': []},
+        )
+        shared_path = tmp_path / 'shared.json'
+
+        run_cli(
+            tmp_path / 'auth.json',
+            'export',
+            'accounts',
+            '--path',
+            str(tmp_path / 'export'),
+            '--shared-limits',
+            str(shared_path),
+        )
+
+        shared = json.loads(shared_path.read_text())
+        compare(sorted(shared), expected=['app:minute', 't1:day', 't1:minute'])
+        compare(int(shared['t1:minute'][0]), expected=42)
+
+    def test_daily_limit_exhausted(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        (tmp_path / 'auth.limits.json').write_text(
+            json.dumps({'t1': {'remaining': 0, 'observed': datetime.now(UTC).isoformat()}})
+        )
+
+        with ShouldRaise(DailyLimitExhausted) as s:
+            run_cli(tmp_path / 'auth.json', 'export', 'accounts', '--path', str(tmp_path))
+        compare(s.raised.__notes__, expected=["while exporting 'Accounts'"])
+
+    @pytest.mark.parametrize("args", [('--jobs', '2'), ('--async',)])
+    def test_daily_limit_exhausted_for_one_tenant(
+        self, tmp_path: Path, pook: Any, args: tuple[str, ...]
+    ) -> None:
+        add_tenants_response(
+            pook,
+            [
+                {'tenantId': 't1', 'tenantName': 'Tenant 1'},
+                {'tenantId': 't2', 'tenantName': 'Tenant 2'},
+            ],
+        )
+        (tmp_path / 'auth.limits.json').write_text(
+            json.dumps({'t1': {'remaining': 0, 'observed': datetime.now(UTC).isoformat()}})
+        )
+        self.write_json(tmp_path / 'auth.history.json', {'t1': {'deferred': ['Contacts']}})
+        pook.get(
+            f"{XERO_API_URL}/Accounts",
+            headers={'Xero-Tenant-Id': 't2'},
+            reply=200,
+            response_json={'Status': 'OK', 'Accounts': [{'AccountID': 'a1'}]},
+        )
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            headers={'Xero-Tenant-Id': 't2'},
+            params={'page': '1'},
+            reply=200,
+            response_json={'Status': 'OK', 'Contacts': []},
+        )
+
+        with ShouldRaise(DailyLimitExhausted):
+            run_cli(
+                tmp_path / 'auth.json', 'export', '--path', str(tmp_path), *args,
+                'accounts', 'contacts',
+            )  # fmt: skip
+
+        # The other tenant carries on:
+        compare(
+            (tmp_path / 'Tenant 2' / 'accounts.jsonl').read_text(),
+            expected='{"AccountID": "a1"}\n',
+        )
+        history = json.loads((tmp_path / 'auth.history.json').read_text())
+        compare(history['t1']['deferred'], expected=['Contacts', 'Accounts'])
+
+    def test_limits_saved_when_export_fails(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        pook.get(
+            f"{XERO_API_URL}/Accounts",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=200,
+            response_headers={'X-DayLimit-Remaining': '500'},
+            response_json={'Status': 'OK', 'Accounts': []},
+        )
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=404,
+            response_json={'Status': 'ERROR', 'Message': 'Not Found'},
+        )
+
+        with ShouldRaise(XeroNotFound):
+            run_cli(
+                tmp_path / 'auth.json', 'export', 'accounts', 'contacts', '--path', str(tmp_path)
+            )
+
+        limits = json.loads((tmp_path / 'auth.limits.json').read_text())
+        # The call to Contacts was taken from what Xero said was left:
+        compare(limits['t1']['remaining'], expected=499)
+
     def setup_journal_mocks(self, pook: Any, tenant_id: str = 't1') -> None:
         """Helper to set up common pook mocks for journal exports."""
         pook.get(
@@ -1003,6 +1846,74 @@ class TestExport:
             }
         )
 
+    def add_journal_pages(self, pook: Any, total: int, offsets: dict[int, int]) -> None:
+        """
+        Mock pages of dense journals numbered from 1 to ``total``, where ``offsets`` maps each
+        offset that will be requested to how many times it will be requested.
+        """
+        for offset, times in offsets.items():
+            pook.get(
+                f"{XERO_API_URL}/Journals",
+                headers={'Xero-Tenant-Id': 't1'},
+                params={'offset': str(offset)},
+                reply=200,
+                times=times,
+                response_json={
+                    'Status': 'OK',
+                    'Journals': [
+                        {
+                            'JournalID': f'j{number}',
+                            'JournalDate': '/Date(1678838400000+0000)/',  # 2023-03-15
+                            'JournalNumber': number,
+                        }
+                        for number in range(offset + 1, min(offset + 100, total) + 1)
+                    ],
+                },
+            )
+
+    def check_journal_numbers(self, path: Path, expected: range) -> None:
+        lines = path.read_text().splitlines()
+        compare([json.loads(line)['JournalNumber'] for line in lines], expected=list(expected))
+
+    def test_journals_sharded(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        # Probes are made at offsets 100, 300 and 200, then pages are fetched from
+        # 0, 100 and 200, and finally a check is made for any new journals from 250:
+        self.add_journal_pages(pook, total=250, offsets={0: 1, 100: 2, 200: 2, 250: 1, 300: 1})
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--workers', '3', 'journals')
+
+        self.check_journal_numbers(tmp_path / 'Tenant 1' / 'journals-2023-03.jsonl', range(1, 251))
+        latest = json.loads((tmp_path / 'Tenant 1' / 'latest.json').read_text())
+        compare(latest['Journals']['JournalNumber'], expected=250)
+        compare(pook.isdone(), expected=True)
+
+    def test_journals_sharded_update(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.write_json(
+            tmp_path / 'Tenant 1' / 'latest.json',
+            {"Journals": {"JournalDate": "2023-03-15T00:00:00+00:00", "JournalNumber": 100}},
+        )
+        # The probe from 200 finds fewer than a full page, so that's the highest number:
+        self.add_journal_pages(pook, total=230, offsets={100: 1, 200: 2, 230: 1})
+
+        run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--update', '--workers', '2', 'journals'
+        )
+
+        self.check_journal_numbers(
+            tmp_path / 'Tenant 1' / 'journals-2023-03.jsonl', range(101, 231)
+        )
+        compare(pook.isdone(), expected=True)
+
+    def test_journals_sharded_none(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.add_journal_pages(pook, total=0, offsets={0: 2, 100: 1})
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--workers', '2', 'journals')
+
+        compare(pook.isdone(), expected=True)
+
     def write_json(self, path: Path, content: dict[str, Any]) -> None:
         path.parent.mkdir(parents=True, exist_ok=True)
         path.write_text(json.dumps(content) + '\n')
@@ -1074,47 +1985,291 @@ class TestExport:
             }
         )
 
-    def test_export_update_journals_no_new_data(
-        self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
+    def test_export_journals_interrupted(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
     ) -> None:
-        tenant_path = tmp_path / "Tenant 1"
         add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
-
-        self.write_json(
-            tenant_path / "latest.json",
-            {"Journals": {"JournalDate": "2023-03-15T00:00:00+00:00", "JournalNumber": 1}},
-        )
-        self.write_json(
-            tenant_path / "journals-2023-03.jsonl",
-            {"LEAVE": "THIS"},
-        )
-
         pook.get(
             f"{XERO_API_URL}/Journals",
-            headers={'Xero-Tenant-Id': "t1"},
-            params={'offset': '1'},
+            params={'offset': '0'},
             reply=200,
-            response_json={'Status': 'OK', 'Journals': []},
+            response_json={
+                'Status': 'OK',
+                'Journals': [
+                    {
+                        'JournalID': 'j1',
+                        'JournalDate': '/Date(1678838400000+0000)/',
+                        'JournalNumber': 1,
+                    },  # 2023-03-15
+                    {
+                        'JournalID': 'j2',
+                        'JournalDate': '/Date(1678924800000+0000)/',
+                        'JournalNumber': 2,
+                    },  # 2023-03-16
+                ],
+            },
         )
+        stop = Event()
+        stop.set()
 
-        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'journals')
+        with Replacer() as replace:
+            replace('xerotrust.main.Event', lambda: stop)
+            result = run_cli(
+                tmp_path, 'export', '--path', str(tmp_path), 'journals', expected_return_code=1
+            )
 
+        compare(
+            result.output,
+            expected='Error: Export interrupted, use --update to carry on from where it stopped\n',
+        )
         check_files(
             {
-                f'Tenant 1/tenant.json': f'{{"tenantId": "t1", "tenantName": "Tenant 1"}}\n',
-                # Journal file should be untouched as no new data for its period was fetched:
-                f'Tenant 1/journals-2023-03.jsonl': '{"LEAVE": "THIS"}\n',
-                # latest.json should be as it was before:
-                'Tenant 1/latest.json': snapshot,
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/journals-2023-03.jsonl': (
+                    '{"JournalID": "j1", "JournalDate": "2023-03-15T00:00:00+00:00", '
+                    '"JournalNumber": 1}\n'
+                ),
+                'Tenant 1/checkpoints.json': dedent('''\
+                    {
+                      "Journals": {
+                        "latest": {
+                          "JournalDate": "2023-03-15T00:00:00+00:00",
+                          "JournalNumber": 1
+                        },
+                        "sizes": {
+                          "journals-2023-03.jsonl": 84
+                        }
+                      }
+                    }'''),
             }
         )
 
-    def test_export_update_contacts_new_data(
-        self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
-    ) -> None:
-        tenant_path = tmp_path / "Tenant 1"
+    def test_ctrl_c(self, tmp_path: Path, pook: Any) -> None:
         add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
-
+        stop = Event()
+        signal_ = Mock()
+
+        with Replacer() as replace:
+            replace('xerotrust.main.Event', lambda: stop)
+            replace('xerotrust.main.signal', signal_)
+            run_cli(tmp_path, 'export', '--path', str(tmp_path), '--plan', '--dry-run', 'accounts')
+
+        # The handler installed for the export is put back afterwards:
+        compare(signal_.signal.call_count, expected=2)
+        interrupt = signal_.signal.call_args_list[0].args[1]
+        with LogCapture() as log:
+            interrupt(2, None)
+        log.check(
+            (
+                'root',
+                'WARNING',
+                'Stopping once a checkpoint is saved, press Ctrl-C again to abort',
+            )
+        )
+        compare(stop.is_set(), expected=True)
+        # A second Ctrl-C aborts straight away:
+        with ShouldRaise(KeyboardInterrupt):
+            interrupt(2, None)
+
+    def test_export_update_journals_resume_from_checkpoint(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        j1 = '{"JournalID": "j1", "JournalDate": "2023-03-15T00:00:00+00:00", "JournalNumber": 1}\n'
+        self.write_json(
+            tenant_path / 'latest.json',
+            {"Journals": {"JournalDate": "2023-03-01T00:00:00+00:00", "JournalNumber": 0}},
+        )
+        self.write_json(
+            tenant_path / 'checkpoints.json',
+            {
+                "Journals": {
+                    "latest": {"JournalDate": "2023-03-15T00:00:00+00:00", "JournalNumber": 1},
+                    "sizes": {"journals-2023-03.jsonl": len(j1)},
+                }
+            },
+        )
+        # Written after the checkpoint, before the export was killed:
+        (tenant_path / "journals-2023-03.jsonl").write_text(j1 + '{"JournalID": "j2", "Jou')
+        (tenant_path / "journals-2023-04.jsonl").write_text('{"JournalID": "j3"}\n')
+
+        pook.get(
+            f"{XERO_API_URL}/Journals",
+            params={'offset': '1'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Journals': [
+                    {
+                        'JournalID': 'j2',
+                        'JournalDate': '/Date(1678924800000+0000)/',
+                        'JournalNumber': 2,
+                    },  # 2023-03-16
+                ],
+            },
+        )
+        pook.get(
+            f"{XERO_API_URL}/Journals",
+            params={'offset': '2'},
+            reply=200,
+            response_json={'Status': 'OK', 'Journals': []},
+        )
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'journals')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/journals-2023-03.jsonl': (
+                    j1 + '{"JournalID": "j2", "JournalDate": "2023-03-16T00:00:00+00:00", '
+                    '"JournalNumber": 2}\n'
+                ),
+                'Tenant 1/latest.json': dedent('''\
+                    {
+                      "Journals": {
+                        "JournalDate": "2023-03-16T00:00:00+00:00",
+                        "JournalNumber": 2
+                      }
+                    }'''),
+            }
+        )
+
+    def test_export_update_keeps_checkpoints_of_other_endpoints(
+        self, tmp_path: Path, pook: Any
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        # Left by an update of journals that was interrupted:
+        journals = {
+            "latest": {"JournalDate": "2023-03-15T00:00:00+00:00", "JournalNumber": 1},
+            "sizes": {"journals-2023-03.jsonl": 84},
+        }
+        self.write_json(tenant_path / 'checkpoints.json', {"Journals": journals})
+        self.write_json(tenant_path / 'latest.json', {})
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'page': '1'},
+            reply=200,
+            response_json={'Status': 'OK', 'Contacts': []},
+        )
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'contacts')
+
+        # So the next update of journals still carries on from where that one stopped:
+        compare(
+            json.loads((tenant_path / 'checkpoints.json').read_text()),
+            expected={"Journals": journals},
+        )
+
+    def test_export_full_interrupted_over_existing_export_then_resumed(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        tenant_path.mkdir()
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        j1 = '{"JournalID": "j1", "JournalDate": "2023-03-15T00:00:00+00:00", "JournalNumber": 1}\n'
+        j2 = '{"JournalID": "j2", "JournalDate": "2023-03-16T00:00:00+00:00", "JournalNumber": 2}\n'
+        j3 = '{"JournalID": "j3", "JournalDate": "2023-04-01T00:00:00+00:00", "JournalNumber": 3}\n'
+        # From an earlier export:
+        (tenant_path / "journals-2023-03.jsonl").write_text(j1 + j2)
+        (tenant_path / "journals-2023-04.jsonl").write_text(j3)
+
+        journals = [
+            {'JournalID': 'j1', 'JournalDate': '/Date(1678838400000+0000)/', 'JournalNumber': 1},
+            {'JournalID': 'j2', 'JournalDate': '/Date(1678924800000+0000)/', 'JournalNumber': 2},
+            {'JournalID': 'j3', 'JournalDate': '/Date(1680307200000+0000)/', 'JournalNumber': 3},
+        ]
+        pook.get(
+            f"{XERO_API_URL}/Journals",
+            params={'offset': '0'},
+            reply=200,
+            response_json={'Status': 'OK', 'Journals': journals[:2]},
+        )
+        stop = Event()
+        stop.set()
+        with Replacer() as replace:
+            replace('xerotrust.main.Event', lambda: stop)
+            run_cli(tmp_path, 'export', '--path', str(tmp_path), 'journals', expected_return_code=1)
+
+        # Only the file this export has written to is recorded in the checkpoint:
+        compare(
+            json.loads((tenant_path / 'checkpoints.json').read_text())['Journals']['sizes'],
+            expected={'journals-2023-03.jsonl': len(j1)},
+        )
+
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        pook.get(
+            f"{XERO_API_URL}/Journals",
+            params={'offset': '1'},
+            reply=200,
+            response_json={'Status': 'OK', 'Journals': journals[1:]},
+        )
+        pook.get(
+            f"{XERO_API_URL}/Journals",
+            params={'offset': '3'},
+            reply=200,
+            response_json={'Status': 'OK', 'Journals': []},
+        )
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'journals')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/journals-2023-03.jsonl': j1 + j2,
+                'Tenant 1/journals-2023-04.jsonl': j3,
+                'Tenant 1/latest.json': dedent('''\
+                    {
+                      "Journals": {
+                        "JournalDate": "2023-04-01T00:00:00+00:00",
+                        "JournalNumber": 3
+                      }
+                    }'''),
+            }
+        )
+
+    def test_export_update_journals_no_new_data(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+
+        self.write_json(
+            tenant_path / "latest.json",
+            {"Journals": {"JournalDate": "2023-03-15T00:00:00+00:00", "JournalNumber": 1}},
+        )
+        self.write_json(
+            tenant_path / "journals-2023-03.jsonl",
+            {"LEAVE": "THIS"},
+        )
+
+        pook.get(
+            f"{XERO_API_URL}/Journals",
+            headers={'Xero-Tenant-Id': "t1"},
+            params={'offset': '1'},
+            reply=200,
+            response_json={'Status': 'OK', 'Journals': []},
+        )
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'journals')
+
+        check_files(
+            {
+                f'Tenant 1/tenant.json': f'{{"tenantId": "t1", "tenantName": "Tenant 1"}}\n',
+                # Journal file should be untouched as no new data for its period was fetched:
+                f'Tenant 1/journals-2023-03.jsonl': '{"LEAVE": "THIS"}\n',
+                # latest.json should be as it was before:
+                'Tenant 1/latest.json': snapshot,
+            }
+        )
+
+    def test_export_update_contacts_new_data(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+
         self.write_json(
             tenant_path / "latest.json",
             {"Contacts": {"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}},
@@ -1144,6 +2299,7 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'Contacts')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'contacts')
 
@@ -1186,6 +2342,7 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'Contacts')
         run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'contacts')
 
         check_files(
@@ -1240,31 +2397,409 @@ class TestExport:
                 ],
             },
         )
-        # Contacts: no new data
+        # Contacts: no new data
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            headers={'Xero-Tenant-Id': "t1"},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Contacts': [
+                    {
+                        'ContactID': 'c1',
+                        'Name': 'Cont 1',
+                        'UpdatedDateUTC': '/Date(1678838400000+0000)/',
+                    }  # 2023-03-15
+                ],
+            },
+        )
+        add_empty_page(pook, 'Contacts')
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'accounts', 'contacts')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/accounts.jsonl': snapshot,  # Overwritten with new a1 (updated) and a2
+                'Tenant 1/contacts.jsonl': snapshot,  # Overwritten with c1 (no change)
+                'Tenant 1/latest.json': snapshot,
+            }
+        )
+
+    def test_export_update_contacts_replaces_changed(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        self.write_json(
+            tenant_path / "latest.json",
+            {"Contacts": {"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}},
+        )
+        (tenant_path / "contacts.jsonl").write_text(
+            '{"ContactID": "c1", "Name": "Old", "UpdatedDateUTC": "2023-03-14T00:00:00+00:00"}\n'
+            '{"ContactID": "c2", "Name": "Same", "UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}\n'
+        )
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            headers={'Xero-Tenant-Id': "t1", 'If-Modified-Since': 'Wed, 15 Mar 2023 00:00:00 GMT'},
+            params={'page': '1', 'pageSize': '1000'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Contacts': [
+                    {
+                        'ContactID': 'c1',
+                        'Name': 'New',
+                        'UpdatedDateUTC': '/Date(1678924800000+0000)/',
+                    },  # 2023-03-16
+                ],
+            },
+        )
+        add_empty_page(pook, 'Contacts')
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'contacts')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/contacts.jsonl': (
+                    '{"ContactID": "c2", "Name": "Same", '
+                    '"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}\n'
+                    '{"ContactID": "c1", "Name": "New", '
+                    '"UpdatedDateUTC": "2023-03-16T00:00:00+00:00"}\n'
+                ),
+                'Tenant 1/latest.json': (
+                    '{\n  "Contacts": {\n    "UpdatedDateUTC": "2023-03-16T00:00:00+00:00"\n  }\n}'
+                ),
+            }
+        )
+
+    def test_export_update_batch_payments_replaces_changed(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        self.write_json(
+            tenant_path / "latest.json",
+            {"BatchPayments": {"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}},
+        )
+        (tenant_path / "batchpayments.jsonl").write_text(
+            '{"BatchPaymentID": "bp1", "Status": "AUTHORISED", '
+            '"UpdatedDateUTC": "2023-03-14T00:00:00+00:00"}\n'
+            '{"BatchPaymentID": "bp2", "Status": "AUTHORISED", '
+            '"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}\n'
+        )
+        # Only the batch payments changed since the last export are fetched:
+        pook.get(
+            f"{XERO_API_URL}/BatchPayments",
+            headers={'Xero-Tenant-Id': "t1", 'If-Modified-Since': 'Wed, 15 Mar 2023 00:00:00 GMT'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'BatchPayments': [
+                    {
+                        'BatchPaymentID': 'bp1',
+                        'Status': 'DELETED',
+                        'UpdatedDateUTC': '/Date(1678924800000+0000)/',
+                    },  # 2023-03-16
+                ],
+            },
+        )
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'batchpayments')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/batchpayments.jsonl': (
+                    '{"BatchPaymentID": "bp2", "Status": "AUTHORISED", '
+                    '"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}\n'
+                    '{"BatchPaymentID": "bp1", "Status": "DELETED", '
+                    '"UpdatedDateUTC": "2023-03-16T00:00:00+00:00"}\n'
+                ),
+                'Tenant 1/latest.json': (
+                    '{\n  "BatchPayments": {\n'
+                    '    "UpdatedDateUTC": "2023-03-16T00:00:00+00:00"\n  }\n}'
+                ),
+            }
+        )
+
+    def test_export_update_bank_transaction_moved_month(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.write_json(
+            tenant_path / 'latest.json',
+            {"BankTransactions": {"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}},
+        )
+        self.write_json(
+            tenant_path / 'transactions-2023-03.jsonl',
+            {
+                'BankTransactionID': 'bt1',
+                'Date': '2023-03-15T00:00:00+00:00',
+                'UpdatedDateUTC': '2023-03-15T00:00:00+00:00',
+            },
+        )
+        pook.get(
+            f"{XERO_API_URL}/BankTransactions",
+            headers={'Xero-Tenant-Id': 't1', 'If-Modified-Since': 'Wed, 15 Mar 2023 00:00:00 GMT'},
+            params={'page': '1', 'pageSize': '1000'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'BankTransactions': [
+                    {
+                        'BankTransactionID': 'bt1',
+                        'Date': '/Date(1680307200000+0000)/',  # 2023-04-01
+                        'UpdatedDateUTC': '/Date(1680307200000+0000)/',
+                    },
+                ],
+            },
+        )
+        add_empty_page(pook, 'BankTransactions')
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'banktransactions')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/transactions-2023-03.jsonl': '',
+                'Tenant 1/transactions-2023-04.jsonl': (
+                    '{"BankTransactionID": "bt1", "Date": "2023-04-01T00:00:00+00:00", '
+                    '"UpdatedDateUTC": "2023-04-01T00:00:00+00:00"}\n'
+                ),
+                'Tenant 1/latest.json': (
+                    '{\n  "BankTransactions": {\n'
+                    '    "UpdatedDateUTC": "2023-04-01T00:00:00+00:00"\n  }\n}'
+                ),
+                'Tenant 1/transactions.index.json': (
+                    '{"files": {"transactions-2023-03.jsonl": {"lines": 0, "size": 0}, '
+                    '"transactions-2023-04.jsonl": {"lines": 1, "size": 113}}, '
+                    '"entries": {"bt1": ["transactions-2023-04.jsonl", 0]}}'
+                ),
+            }
+        )
+
+    def test_export_update_bank_transactions_uses_index(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.write_json(
+            tenant_path / 'latest.json',
+            {"BankTransactions": {"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}},
+        )
+        march = '{"BankTransactionID": "bt1"}\n{"BankTransactionID": "bt2"}\n'
+        (tenant_path / 'transactions-2023-03.jsonl').write_text(march)
+        # Files covered by an up-to-date index are never read unless they need rewriting:
+        (tenant_path / 'transactions-2023-02.jsonl').write_text('not json\n')
+        self.write_json(
+            tenant_path / 'transactions.index.json',
+            {
+                'files': {
+                    'transactions-2023-02.jsonl': {'lines': 1, 'size': 9},
+                    'transactions-2023-03.jsonl': {'lines': 2, 'size': len(march)},
+                },
+                'entries': {
+                    'bt0': ['transactions-2023-02.jsonl', 0],
+                    'bt1': ['transactions-2023-03.jsonl', 0],
+                    'bt2': ['transactions-2023-03.jsonl', 1],
+                },
+            },
+        )
+        pook.get(
+            f"{XERO_API_URL}/BankTransactions",
+            headers={'Xero-Tenant-Id': 't1', 'If-Modified-Since': 'Wed, 15 Mar 2023 00:00:00 GMT'},
+            params={'page': '1', 'pageSize': '1000'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'BankTransactions': [
+                    {
+                        'BankTransactionID': 'bt1',
+                        'Date': '/Date(1678838400000+0000)/',  # 2023-03-15
+                        'UpdatedDateUTC': '/Date(1678924800000+0000)/',  # 2023-03-16
+                    },
+                ],
+            },
+        )
+        add_empty_page(pook, 'BankTransactions')
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'banktransactions')
+
+        new = (
+            '{"BankTransactionID": "bt1", "Date": "2023-03-15T00:00:00+00:00", '
+            '"UpdatedDateUTC": "2023-03-16T00:00:00+00:00"}\n'
+        )
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/transactions-2023-02.jsonl': 'not json',
+                'Tenant 1/transactions-2023-03.jsonl': '{"BankTransactionID": "bt2"}\n' + new,
+                'Tenant 1/transactions.index.json': (
+                    '{"files": {"transactions-2023-02.jsonl": {"lines": 1, "size": 9}, '
+                    '"transactions-2023-03.jsonl": {"lines": 2, "size": 142}}, '
+                    '"entries": {"bt0": ["transactions-2023-02.jsonl", 0], '
+                    '"bt1": ["transactions-2023-03.jsonl", 1], '
+                    '"bt2": ["transactions-2023-03.jsonl", 0]}}'
+                ),
+                'Tenant 1/latest.json': (
+                    '{\n  "BankTransactions": {\n'
+                    '    "UpdatedDateUTC": "2023-03-16T00:00:00+00:00"\n  }\n}'
+                ),
+            }
+        )
+
+    def test_export_update_contacts_summary(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        c1, c2, c3 = (f'00000000-0000-0000-0000-00000000000{i}' for i in (1, 2, 3))
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        self.write_json(
+            tenant_path / "latest.json",
+            {"Contacts": {"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}},
+        )
+        existing = (
+            f'{{"ContactID": "{c1}", "UpdatedDateUTC": "2023-03-14T00:00:00+00:00"}}\n'
+            f'{{"ContactID": "{c2}", "UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}}\n'
+        )
+        (tenant_path / "contacts.jsonl").write_text(existing)
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            params={'summaryOnly': 'true', 'page': '1', 'pageSize': '1000'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Contacts': [
+                    {'ContactID': c1, 'UpdatedDateUTC': '/Date(1678752000000+0000)/'},  # same
+                    {'ContactID': c2, 'UpdatedDateUTC': '/Date(1678924800000+0000)/'},  # changed
+                    {'ContactID': c3, 'UpdatedDateUTC': '/Date(1677628800000+0000)/'},  # missing
+                ],
+            },
+        )
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            params={'IDs': f'{c2.replace("-", "")},{c3.replace("-", "")}', 'page': '1'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Contacts': [
+                    {
+                        'ContactID': c2,
+                        'Name': 'Full',
+                        'UpdatedDateUTC': '/Date(1678924800000+0000)/',
+                    },
+                    {
+                        'ContactID': c3,
+                        'Name': 'Full',
+                        'UpdatedDateUTC': '/Date(1677628800000+0000)/',
+                    },
+                ],
+            },
+        )
+        add_empty_page(pook, 'Contacts')
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', '--summary', 'contacts')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/contacts.jsonl': (
+                    f'{{"ContactID": "{c1}", "UpdatedDateUTC": "2023-03-14T00:00:00+00:00"}}\n'
+                    f'{{"ContactID": "{c2}", "Name": "Full", '
+                    f'"UpdatedDateUTC": "2023-03-16T00:00:00+00:00"}}\n'
+                    f'{{"ContactID": "{c3}", "Name": "Full", '
+                    f'"UpdatedDateUTC": "2023-03-01T00:00:00+00:00"}}\n'
+                ),
+                'Tenant 1/latest.json': (
+                    '{\n  "Contacts": {\n    "UpdatedDateUTC": "2023-03-16T00:00:00+00:00"\n  }\n}'
+                ),
+            }
+        )
+
+    def test_export_update_contacts_prune(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        self.write_json(
+            tenant_path / "latest.json",
+            {"Contacts": {"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}},
+        )
+        (tenant_path / "contacts.jsonl").write_text(
+            '{"ContactID": "c3", "Name": "Three"}\n'
+            '{"ContactID": "c1", "Name": "One"}\n'
+            '{"ContactID": "c2", "Name": "Two"}\n'
+        )
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            headers={'If-Modified-Since': 'Wed, 15 Mar 2023 00:00:00 GMT'},
+            params={'page': '1', 'pageSize': '1000'},
+            reply=200,
+            response_json={'Status': 'OK', 'Contacts': []},
+        )
+        pook.get(
+            f"{XERO_API_URL}/Contacts",
+            params={'summaryOnly': 'true', 'page': '1', 'pageSize': '1000'},
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'Contacts': [{'ContactID': 'c3'}, {'ContactID': 'c1'}],
+            },
+        )
+        add_empty_page(pook, 'Contacts')
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', '--prune', 'contacts')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/contacts.jsonl': (
+                    '{"ContactID": "c3", "Name": "Three"}\n{"ContactID": "c1", "Name": "One"}\n'
+                ),
+                'Tenant 1/latest.json': (
+                    '{\n  "Contacts": {\n    "UpdatedDateUTC": "2023-03-15T00:00:00+00:00"\n  }\n}'
+                ),
+            }
+        )
+
+    def test_export_update_prune_without_summaries(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': "t1", 'tenantName': "Tenant 1"}])
+        self.write_json(
+            tenant_path / "latest.json",
+            {"Accounts": {"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}},
+        )
+        (tenant_path / "accounts.jsonl").write_text(
+            '{"AccountID": "a1", "Name": "One"}\n{"AccountID": "a2", "Name": "Two"}\n'
+        )
         pook.get(
-            f"{XERO_API_URL}/Contacts",
-            headers={'Xero-Tenant-Id': "t1"},
+            f"{XERO_API_URL}/Accounts",
+            headers={'If-Modified-Since': 'Wed, 15 Mar 2023 00:00:00 GMT'},
             reply=200,
-            response_json={
-                'Status': 'OK',
-                'Contacts': [
-                    {
-                        'ContactID': 'c1',
-                        'Name': 'Cont 1',
-                        'UpdatedDateUTC': '/Date(1678838400000+0000)/',
-                    }  # 2023-03-15
-                ],
-            },
+            response_json={'Status': 'OK', 'Accounts': []},
+        )
+        # Accounts have no summaries, so all of them are fetched to find their IDs:
+        pook.get(
+            f"{XERO_API_URL}/Accounts",
+            reply=200,
+            response_json={'Status': 'OK', 'Accounts': [{'AccountID': 'a2', 'Name': 'Two'}]},
         )
 
-        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'accounts', 'contacts')
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', '--prune', 'accounts')
 
+        assert pook.isdone()
         check_files(
             {
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
-                'Tenant 1/accounts.jsonl': snapshot,  # Overwritten with new a1 (updated) and a2
-                'Tenant 1/contacts.jsonl': snapshot,  # Overwritten with c1 (no change)
-                'Tenant 1/latest.json': snapshot,
+                'Tenant 1/accounts.jsonl': '{"AccountID": "a2", "Name": "Two"}\n',
+                'Tenant 1/latest.json': (
+                    '{\n  "Accounts": {\n    "UpdatedDateUTC": "2023-03-15T00:00:00+00:00"\n  }\n}'
+                ),
             }
         )
 
@@ -1315,6 +2850,304 @@ class TestExport:
             response_json={'Status': 'OK', 'BankTransactions': []},
         )
 
+    def test_export_window_bank_transactions(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        latest = '{"BankTransactions": {"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}}\n'
+        (tenant_path / 'latest.json').parent.mkdir(parents=True)
+        (tenant_path / 'latest.json').write_text(latest)
+        (tenant_path / 'transactions-2023-02.jsonl').write_text(
+            '{"BankTransactionID": "bt0", "UpdatedDateUTC": "2023-02-01T00:00:00+00:00"}\n'
+            '{"BankTransactionID": "bt1", "UpdatedDateUTC": "2023-02-01T00:00:00+00:00"}\n'
+        )
+        (tenant_path / 'transactions-2023-03.jsonl').write_text('{"BankTransactionID": "bt2"}\n')
+        (tenant_path / 'transactions-2023-04.jsonl').write_text('{"BankTransactionID": "bt3"}\n')
+        (tenant_path / 'transactions-2023-05.jsonl').write_text('{"BankTransactionID": "bt4"}\n')
+        pook.get(
+            f"{XERO_API_URL}/BankTransactions",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={
+                'page': '1',
+                'pageSize': '1000',
+                'where': 'Date>=DateTime(2023,3,1)&&Date<DateTime(2023,5,1)',
+            },
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'BankTransactions': [
+                    {
+                        'BankTransactionID': 'bt1',
+                        'Date': '/Date(1678406400000+0000)/',  # 2023-03-10
+                        'UpdatedDateUTC': '/Date(1678924800000+0000)/',  # 2023-03-16
+                    },
+                    {
+                        'BankTransactionID': 'bt2',
+                        'Date': '/Date(1678838400000+0000)/',  # 2023-03-15
+                        'UpdatedDateUTC': '/Date(1678838400000+0000)/',  # 2023-03-15
+                    },
+                ],
+            },
+        )
+        add_empty_page(pook, 'BankTransactions')
+
+        run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--window', '2023-03..2023-04',
+            'banktransactions',
+        )  # fmt: skip
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/latest.json': latest,
+                # bt1 moved into the window, so its earlier version is removed:
+                'Tenant 1/transactions-2023-02.jsonl': (
+                    '{"BankTransactionID": "bt0", "UpdatedDateUTC": "2023-02-01T00:00:00+00:00"}'
+                ),
+                'Tenant 1/transactions-2023-03.jsonl': (
+                    '{"BankTransactionID": "bt1", "Date": "2023-03-10T00:00:00+00:00", '
+                    '"UpdatedDateUTC": "2023-03-16T00:00:00+00:00"}\n'
+                    '{"BankTransactionID": "bt2", "Date": "2023-03-15T00:00:00+00:00", '
+                    '"UpdatedDateUTC": "2023-03-15T00:00:00+00:00"}\n'
+                ),
+                # Nothing is dated in April any more, and May is outside the window:
+                'Tenant 1/transactions-2023-05.jsonl': '{"BankTransactionID": "bt4"}',
+                'Tenant 1/transactions.index.json': (
+                    '{"files": {"transactions-2023-02.jsonl": {"lines": 1, "size": 76}, '
+                    '"transactions-2023-03.jsonl": {"lines": 2, "size": 226}, '
+                    '"transactions-2023-05.jsonl": {"lines": 1, "size": 29}}, '
+                    '"entries": {"bt0": ["transactions-2023-02.jsonl", 0], '
+                    '"bt1": ["transactions-2023-03.jsonl", 0], '
+                    '"bt2": ["transactions-2023-03.jsonl", 1], '
+                    '"bt4": ["transactions-2023-05.jsonl", 0]}}'
+                ),
+            }
+        )
+
+    def test_export_window_journals(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.setup_journal_mocks(pook)
+        tenant_path.mkdir()
+        (tenant_path / 'journals-2023-03.jsonl').write_text('{"JournalID": "old"}\n')
+        (tenant_path / 'journals-2024-03.jsonl').write_text('{"JournalID": "untouched"}\n')
+        # Left behind by an earlier refresh that was interrupted:
+        (tenant_path / '.journals.staging').mkdir()
+        (tenant_path / '.journals.staging' / 'journals-2023-03.jsonl').write_text('partial')
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--window', '2023-03', 'journals')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/journals-2023-03.jsonl': (
+                    '{"JournalID": "j1", "JournalDate": "2023-03-15T00:00:00+00:00", '
+                    '"JournalNumber": 1}\n'
+                    '{"JournalID": "j2", "JournalDate": "2023-03-16T00:00:00+00:00", '
+                    '"JournalNumber": 2}\n'
+                ),
+                'Tenant 1/journals-2024-03.jsonl': '{"JournalID": "untouched"}',
+            }
+        )
+
+    def test_export_window_all_endpoints(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.setup_journal_mocks(pook)
+        pook.get(
+            f"{XERO_API_URL}/BankTransactions",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={
+                'page': '1',
+                'pageSize': '1000',
+                'where': 'Date>=DateTime(2023,3,1)&&Date<DateTime(2023,4,1)',
+            },
+            reply=200,
+            response_json={'Status': 'OK', 'BankTransactions': []},
+        )
+
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--window', '2023-03')
+
+        assert pook.isdone()
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/journals-2023-03.jsonl': (
+                    '{"JournalID": "j1", "JournalDate": "2023-03-15T00:00:00+00:00", '
+                    '"JournalNumber": 1}\n'
+                    '{"JournalID": "j2", "JournalDate": "2023-03-16T00:00:00+00:00", '
+                    '"JournalNumber": 2}\n'
+                ),
+                'Tenant 1/transactions.index.json': '{"files": {}, "entries": {}}',
+            }
+        )
+
+    def test_export_window_interrupted(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.setup_journal_mocks(pook)
+        tenant_path.mkdir()
+        (tenant_path / 'journals-2023-03.jsonl').write_text('{"JournalID": "old"}\n')
+        stop = Event()
+        stop.set()
+
+        with Replacer() as replace:
+            replace('xerotrust.main.Event', lambda: stop)
+            result = run_cli(
+                tmp_path, 'export', '--path', str(tmp_path), '--window', '2023-03', 'journals',
+                expected_return_code=1,
+            )  # fmt: skip
+
+        compare(
+            result.output,
+            expected='Error: Export interrupted, files not yet refreshed are unchanged\n',
+        )
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/journals-2023-03.jsonl': '{"JournalID": "old"}',
+                # Cleared away by the next refresh:
+                'Tenant 1/.journals.staging/journals-2023-03.jsonl': (
+                    '{"JournalID": "j1", "JournalDate": "2023-03-15T00:00:00+00:00", '
+                    '"JournalNumber": 1}\n'
+                ),
+            }
+        )
+
+    def test_export_window_error(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        pook.get(
+            f"{XERO_API_URL}/Journals",
+            headers={'Xero-Tenant-Id': 't1'},
+            reply=404,
+            response_json={'Status': 'ERROR', 'Message': 'Not Found'},
+        )
+
+        with ShouldRaise(XeroNotFound) as s:
+            run_cli(tmp_path, 'export', '--path', str(tmp_path), '--window', '2023-03', 'journals')
+        compare(s.raised.__notes__, expected=["while exporting 'Journals'"])
+
+    def test_export_window_skips_sealed(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        tenant_path.mkdir()
+        organisation = '{"EndOfYearLockDate": "2023-03-31T00:00:00"}\n'
+        (tenant_path / 'organisations.jsonl').write_text(organisation)
+        (tenant_path / 'transactions-2023-03.jsonl').write_text('{"BankTransactionID": "bt1"}\n')
+        pook.get(
+            f"{XERO_API_URL}/BankTransactions",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={
+                'page': '1',
+                'pageSize': '1000',
+                'where': 'Date>=DateTime(2023,4,1)&&Date<DateTime(2023,5,1)',
+            },
+            reply=200,
+            response_json={
+                'Status': 'OK',
+                'BankTransactions': [
+                    {
+                        'BankTransactionID': 'bt2',
+                        'Date': '/Date(1680307200000+0000)/',  # 2023-04-01
+                        'UpdatedDateUTC': '/Date(1680307200000+0000)/',
+                    },
+                ],
+            },
+        )
+        add_empty_page(pook, 'BankTransactions')
+
+        run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--window', '2023-03..2023-04',
+            'banktransactions',
+        )  # fmt: skip
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/organisations.jsonl': organisation,
+                'Tenant 1/transactions-2023-03.jsonl': '{"BankTransactionID": "bt1"}',
+                'Tenant 1/transactions-2023-04.jsonl': (
+                    '{"BankTransactionID": "bt2", "Date": "2023-04-01T00:00:00+00:00", '
+                    '"UpdatedDateUTC": "2023-04-01T00:00:00+00:00"}\n'
+                ),
+                'Tenant 1/transactions.index.json': (
+                    '{"files": {"transactions-2023-03.jsonl": {"lines": 1, "size": 29}, '
+                    '"transactions-2023-04.jsonl": {"lines": 1, "size": 113}}, '
+                    '"entries": {"bt1": ["transactions-2023-03.jsonl", 0], '
+                    '"bt2": ["transactions-2023-04.jsonl", 0]}}'
+                ),
+            }
+        )
+
+    def test_export_window_all_sealed(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        tenant_path = tmp_path / "Tenant 1"
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        tenant_path.mkdir()
+        organisation = '{"EndOfYearLockDate": "2023-03-31T00:00:00"}\n'
+        (tenant_path / 'organisations.jsonl').write_text(organisation)
+        (tenant_path / 'transactions-2023-03.jsonl').write_text('{"BankTransactionID": "bt1"}\n')
+
+        # Nothing is fetched from Xero:
+        run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), '--window', '2023-03', 'banktransactions'
+        )
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/organisations.jsonl': organisation,
+                'Tenant 1/transactions-2023-03.jsonl': '{"BankTransactionID": "bt1"}',
+            }
+        )
+
+    @pytest.mark.parametrize(
+        "args, message, code",
+        [
+            (
+                ('--window', '2023-13', 'journals'),
+                "Invalid value for '--window': Expected YYYY-MM or YYYY-MM..YYYY-MM, got: 2023-13",
+                2,
+            ),
+            (
+                ('--window', '2023-03..2023-02', 'journals'),
+                "Invalid value for '--window': 2023-03..2023-02 ends before it starts",
+                2,
+            ),
+            (
+                ('--window', '2023-03', 'contacts'),
+                'Contacts cannot be refreshed using --window',
+                1,
+            ),
+            (
+                ('--window', '2023-03', '--split', 'years', 'journals'),
+                'Files split by years cannot be refreshed for only part of their period',
+                1,
+            ),
+            (
+                ('--window', '2023-03', '--update', 'journals'),
+                '--window cannot be used with --update or --async',
+                1,
+            ),
+        ],
+    )
+    def test_export_window_invalid(
+        self, tmp_path: Path, pook: Any, args: tuple[str, ...], message: str, code: int
+    ) -> None:
+        result = run_cli(
+            tmp_path, 'export', '--path', str(tmp_path), *args, expected_return_code=code
+        )
+        compare(result.output.strip().splitlines()[-1], expected=f'Error: {message}')
+
     def test_bank_transactions_uses_bank_transactions_export(
         self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
     ) -> None:
@@ -1332,6 +3165,66 @@ class TestExport:
             }
         )
 
+    def test_bank_transactions_full_export_discards_index(self, tmp_path: Path, pook: Any) -> None:
+        tenant_path = tmp_path / 'Tenant 1'
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.add_bank_transaction_response(pook)
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), 'banktransactions')
+        march = tenant_path / 'transactions-2023-03.jsonl'
+        # An index from an earlier update that happens to match the size of the files:
+        self.write_json(
+            tenant_path / 'transactions.index.json',
+            {
+                'files': {march.name: {'lines': 1, 'size': march.stat().st_size}},
+                'entries': {'bt0': [march.name, 0]},
+            },
+        )
+
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.add_bank_transaction_response(pook)
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), 'banktransactions')
+
+        # The files have been rewritten, so the next update builds the index again from them:
+        compare((tenant_path / 'transactions.index.json').exists(), expected=False)
+
+    def test_bank_transactions_raw(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
+    ) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.add_bank_transaction_response(pook)
+
+        run_cli(
+            tmp_path,
+            'export',
+            '--path',
+            str(tmp_path),
+            '--tenant',
+            't1',
+            '--raw',
+            'banktransactions',
+        )
+
+        # Records are routed and tracked in the same way, but written as Xero sent them:
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/transactions-2023-03.jsonl': (
+                    '{"BankTransactionID": "bt1","Date": "/Date(1678838400000+0000)/",'
+                    '"DateString": "2023-03-15T00:00:00","UpdatedDateUTC": "/Date(1678838400000+0000)/",'
+                    '"Total": 100.0,"Type": "SPEND","BankAccount": {"Name": "Test Account"}}\n'
+                    '{"BankTransactionID": "bt2","Date": "/Date(1678924800000+0000)/",'
+                    '"DateString": "2023-03-16T00:00:00","UpdatedDateUTC": "/Date(1678924800000+0000)/",'
+                    '"Total": 200.0,"Type": "RECEIVE","BankAccount": {"Name": "Test Account"}}\n'
+                ),
+                'Tenant 1/transactions-2024-03.jsonl': (
+                    '{"BankTransactionID": "bt3","Date": "/Date(1710460800000+0000)/",'
+                    '"DateString": "2024-03-15T00:00:00","UpdatedDateUTC": "/Date(1710460800000+0000)/",'
+                    '"Total": 300.0,"Type": "SPEND","BankAccount": {"Name": "Test Account"}}\n'
+                ),
+                'Tenant 1/latest.json': snapshot,
+            }
+        )
+
     def test_bank_transactions_split_days(
         self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
     ) -> None:
@@ -1413,6 +3306,70 @@ class TestExport:
             }
         )
 
+    def bank_transactions(self, count: int, start: int = 0) -> list[dict[str, Any]]:
+        return [
+            {
+                'BankTransactionID': f'bt{n}',
+                'Date': '/Date(1678838400000+0000)/',  # 2023-03-15
+                'UpdatedDateUTC': '/Date(1678838400000+0000)/',
+            }
+            for n in range(start, start + count)
+        ]
+
+    def test_bank_transactions_page_size_from_history(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        self.write_json(
+            tmp_path / 'auth.history.json', {'t1': {'page_size': {'BankTransactions': 250}}}
+        )
+        pook.get(
+            f"{XERO_API_URL}/BankTransactions",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'page': '1', 'pageSize': '250'},
+            reply=200,
+            response_json={'Status': 'OK', 'BankTransactions': self.bank_transactions(250)},
+        )
+        # The first page was quick and small, so pages get bigger once they can:
+        pook.get(
+            f"{XERO_API_URL}/BankTransactions",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'page': '2', 'pageSize': '250'},
+            reply=200,
+            response_json={'Status': 'OK', 'BankTransactions': self.bank_transactions(1, 250)},
+        )
+        add_empty_page(pook, 'BankTransactions')
+
+        run_cli(tmp_path / 'auth.json', 'export', '--path', str(tmp_path), 'banktransactions')
+
+        lines = (tmp_path / 'Tenant 1' / 'transactions-2023-03.jsonl').read_text().splitlines()
+        compare(len(lines), expected=251)
+        history = json.loads((tmp_path / 'auth.history.json').read_text())
+        compare(history['t1']['page_size'], expected={'BankTransactions': 500})
+
+    def test_bank_transactions_smaller_pages_after_error(self, tmp_path: Path, pook: Any) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        pook.get(
+            f"{XERO_API_URL}/BankTransactions",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'page': '1', 'pageSize': '1000'},
+            reply=500,
+            response_json={'Message': 'timed out'},
+        )
+        pook.get(
+            f"{XERO_API_URL}/BankTransactions",
+            headers={'Xero-Tenant-Id': 't1'},
+            params={'page': '1', 'pageSize': '500'},
+            reply=200,
+            response_json={'Status': 'OK', 'BankTransactions': self.bank_transactions(2)},
+        )
+        add_empty_page(pook, 'BankTransactions')
+
+        run_cli(tmp_path / 'auth.json', 'export', '--path', str(tmp_path), 'banktransactions')
+
+        lines = (tmp_path / 'Tenant 1' / 'transactions-2023-03.jsonl').read_text().splitlines()
+        compare(len(lines), expected=2)
+        history = json.loads((tmp_path / 'auth.history.json').read_text())
+        compare(history['t1']['page_size'], expected={'BankTransactions': 500})
+
     def test_export_update_bank_transactions_new_data(
         self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
     ) -> None:
@@ -1469,7 +3426,7 @@ class TestExport:
             f"{XERO_API_URL}/BankTransactions",
             headers={
                 'Xero-Tenant-Id': 't1',
-                'If-Modified-Since': 'Fri, 15 Mar 2024 00:00:00 GMT',
+                'If-Modified-Since': 'Wed, 15 Mar 2023 00:00:00 GMT',
             },
             params={'page': '2', 'pageSize': '1000'},
             reply=200,
@@ -1484,6 +3441,7 @@ class TestExport:
                 'Tenant 1/transactions-2023-03.jsonl': snapshot,
                 'Tenant 1/transactions-2024-03.jsonl': snapshot,
                 'Tenant 1/latest.json': snapshot,
+                'Tenant 1/transactions.index.json': snapshot,
             }
         )
 
@@ -1516,6 +3474,7 @@ class TestExport:
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/transactions-2023-03.jsonl': snapshot,
                 'Tenant 1/latest.json': snapshot,
+                'Tenant 1/transactions.index.json': snapshot,
             }
         )
 
@@ -1579,6 +3538,7 @@ class TestExport:
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/transactions-2023-03.jsonl': snapshot,
                 'Tenant 1/latest.json': snapshot,
+                'Tenant 1/transactions.index.json': snapshot,
             }
         )
 
@@ -1635,21 +3595,21 @@ class TestExport:
             f"{XERO_API_URL}/BankTransactions",
             headers={
                 'Xero-Tenant-Id': 't1',
-                'If-Modified-Since': 'Thu, 16 Mar 2023 00:00:00 GMT',
+                'If-Modified-Since': 'Wed, 15 Mar 2023 00:00:00 GMT',
             },
             params={'page': '2', 'pageSize': '1000'},
             reply=200,
             response_json={'Status': 'OK', 'BankTransactions': []},
         )
 
-        # Mock the sleep function to avoid actually waiting
-        mock_sleep = Mock()
+        # Mock pausing to avoid actually waiting
+        mock_pause = Mock()
 
-        with replace_in_module(time.sleep, mock_sleep, module=export):
+        with replace_in_module(pause, mock_pause, module=export):
             run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'banktransactions')
 
-        # Verify sleep was called with retry-after value
-        mock_sleep.assert_called_once_with(1)
+        # Verify the pause was for the retry-after value
+        mock_pause.assert_called_once_with(1, ANY)
 
         # Verify the bank transaction was exported after retrying
         check_files(
@@ -1657,6 +3617,7 @@ class TestExport:
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/transactions-2023-03.jsonl': snapshot,
                 'Tenant 1/latest.json': snapshot,
+                'Tenant 1/transactions.index.json': snapshot,
             }
         )
 
@@ -1716,7 +3677,7 @@ class TestExport:
             f"{XERO_API_URL}/BankTransactions",
             headers={
                 'Xero-Tenant-Id': 't1',
-                'If-Modified-Since': 'Sun, 19 Mar 2023 00:00:00 GMT',
+                'If-Modified-Since': 'Wed, 15 Mar 2023 00:00:00 GMT',
             },
             params={'page': '2', 'pageSize': '1000'},
             reply=200,
@@ -1730,6 +3691,7 @@ class TestExport:
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/transactions-2023-03.jsonl': snapshot,
                 'Tenant 1/latest.json': snapshot,
+                'Tenant 1/transactions.index.json': snapshot,
             }
         )
 
@@ -1761,12 +3723,37 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('Organisations'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/organisations.jsonl': '{"OrganisationID": "org1", "Name": "Test Organisation", "LegalName": "Test Organisation Ltd", "BaseCurrency": "USD", "CountryCode": "US", "CreatedDateUTC": "2023-01-01T00:00:00+00:00"}\n',
                 'Tenant 1/latest.json': snapshot,
             }
         )
 
+    def test_organisations_fetched_recently(
+        self, tmp_path: Path, pook: Any, check_files: FileChecker
+    ) -> None:
+        add_tenants_response(pook, [{'tenantId': 't1', 'tenantName': 'Tenant 1'}])
+        tenant_path = tmp_path / 'Tenant 1'
+        recently = json.dumps({'Organisations': (NOW - timedelta(hours=1)).isoformat()}, indent=2)
+        latest = {'Organisations': {'CreatedDateUTC': '2023-01-01T00:00:00+00:00'}}
+        self.write_json(tenant_path / 'latest.json', latest)
+        (tenant_path / 'fetched.json').write_text(recently)
+        (tenant_path / 'organisations.jsonl').write_text('{"OrganisationID": "org1"}\n')
+
+        # No request is made for organisations:
+        run_cli(tmp_path, 'export', '--path', str(tmp_path), '--update', 'organisations')
+
+        check_files(
+            {
+                'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
+                'Tenant 1/organisations.jsonl': '{"OrganisationID": "org1"}\n',
+                'Tenant 1/fetched.json': recently,
+                # What was latest is kept for when organisations are next fetched:
+                'Tenant 1/latest.json': json.dumps(latest, indent=2) + '\n',
+            }
+        )
+
     def test_overpayments(
         self, tmp_path: Path, pook: Any, check_files: FileChecker, snapshot: SnapshotFixture
     ) -> None:
@@ -1789,6 +3776,7 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'Overpayments')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', 'overpayments')
 
@@ -1822,6 +3810,7 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'Payments')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', 'payments')
 
@@ -1855,6 +3844,7 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'Prepayments')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', 'prepayments')
 
@@ -1888,6 +3878,7 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'PurchaseOrders')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', 'purchaseorders')
 
@@ -1954,6 +3945,7 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('TaxRates'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/taxrates.jsonl': '{"Name": "GST", "TaxType": "OUTPUT", "DisplayTaxRate": 10.0}\n',
                 'Tenant 1/latest.json': '{}\n',
@@ -1985,6 +3977,7 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('TrackingCategories'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/trackingcategories.jsonl': '{"TrackingCategoryID": "tc1", "Name": "Region", "Status": "ACTIVE"}\n',
                 'Tenant 1/latest.json': snapshot,
@@ -2052,6 +4045,7 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('BrandingThemes'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/brandingthemes.jsonl': '{"BrandingThemeID": "bt1", "Name": "Default Theme", "SortOrder": 1, "CreatedDateUTC": "2023-01-01T00:00:00+00:00"}\n',
                 'Tenant 1/latest.json': snapshot,
@@ -2083,6 +4077,7 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('ContactGroups'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/contactgroups.jsonl': '{"ContactGroupID": "cg1", "Name": "VIP Customers", "Status": "ACTIVE"}\n',
                 'Tenant 1/latest.json': snapshot,
@@ -2113,6 +4108,7 @@ class TestExport:
                 ],
             },
         )
+        add_empty_page(pook, 'Quotes')
 
         run_cli(tmp_path, 'export', '--path', str(tmp_path), '--tenant', 't1', 'quotes')
 
@@ -2179,6 +4175,7 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('Currencies'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/currencies.jsonl': '{"Code": "USD", "Description": "United States Dollar"}\n',
                 'Tenant 1/latest.json': '{}\n',
@@ -2211,6 +4208,7 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('TaxRates'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/taxrates.jsonl': '{"Name": "GST", "TaxType": "OUTPUT", "DisplayTaxRate": 10.0}\n',
                 'Tenant 1/latest.json': '{}\n',
@@ -2243,6 +4241,7 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('TrackingCategories'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/trackingcategories.jsonl': '{"Name": "Region", "Status": "ACTIVE", "TrackingCategoryID": "tc1"}\n',
                 'Tenant 1/latest.json': '{}\n',
@@ -2275,6 +4274,7 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('ContactGroups'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/contactgroups.jsonl': '{"Name": "Suppliers", "Status": "ACTIVE", "ContactGroupID": "cg1"}\n',
                 'Tenant 1/latest.json': '{}\n',
@@ -2343,6 +4343,7 @@ class TestExport:
 
         check_files(
             {
+                'Tenant 1/fetched.json': fetched('Currencies', 'TaxRates'),
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/latest.json': '{}\n',
             }
@@ -2395,12 +4396,13 @@ class TestExport:
             },
         )
 
-        # Second endpoint fails with 500 error
+        # Second endpoint keeps failing with 500 errors, however many times it is retried:
         pook.get(
             f"{XERO_API_URL}/Contacts",
             headers={'Xero-Tenant-Id': 't1'},
             reply=500,
             response_json={'Status': 'ERROR', 'Message': 'Internal Server Error'},
+            times=6,
         )
 
         # Third endpoint would succeed but won't be reached due to error
@@ -2419,7 +4421,11 @@ class TestExport:
             },
         )
 
-        with ShouldRaise(XeroInternalError) as s:
+        mock_pause = Mock()
+        with (
+            ShouldRaise(XeroInternalError) as s,
+            replace_in_module(pause, mock_pause, module=export),
+        ):
             run_cli(
                 tmp_path,
                 'export',
@@ -2431,6 +4437,7 @@ class TestExport:
                 'contacts',
                 'currencies',
             )
+        compare(mock_pause.call_count, expected=5)
         # Verify the error includes context about which endpoint failed
         # The error context should be in the exception notes
         compare(s.raised.__notes__, expected=["while exporting 'Contacts'"])
@@ -2441,5 +4448,18 @@ class TestExport:
                 'Tenant 1/tenant.json': '{"tenantId": "t1", "tenantName": "Tenant 1"}\n',
                 'Tenant 1/accounts.jsonl': '{"AccountID": "a1", "Name": "Test Account", "UpdatedDateUTC": "2023-01-01T00:00:00+00:00"}\n',
                 # Note: latest.json should NOT exist because the export failed before completion
+                # but the checkpoint lets an update carry on from the endpoint that finished:
+                'Tenant 1/checkpoints.json': (
+                    '{\n'
+                    '  "Accounts": {\n'
+                    '    "latest": {\n'
+                    '      "UpdatedDateUTC": "2023-01-01T00:00:00+00:00"\n'
+                    '    },\n'
+                    '    "sizes": {\n'
+                    '      "accounts.jsonl": 91\n'
+                    '    }\n'
+                    '  }\n'
+                    '}'
+                ),
             }
         )
@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 from typing import Any
 
@@ -61,6 +62,59 @@ class TestReconcile:
 
         compare(result.output, expected=snapshot())
 
+    def test_sealed_totals_cached(self, tmp_path: Path) -> None:
+        (tmp_path / "organisations.jsonl").write_text('{"EndOfYearLockDate": "2023-03-31"}\n')
+        journal_file = tmp_path / "journals-2023-03.jsonl"
+        transaction_file = tmp_path / "transactions-2023-03.jsonl"
+        write_jsonl_file(journal_file, [SAMPLE_JOURNAL])
+        write_jsonl_file(transaction_file, [SAMPLE_TRANSACTION])
+        args = (
+            "reconcile",
+            f"journals={tmp_path / 'journals-*.jsonl'}",
+            f"transactions={tmp_path / 'transactions-*.jsonl'}",
+        )
+
+        first = run_cli(tmp_path, *args)
+
+        cached = json.loads((tmp_path / "sealed.json").read_text())
+        compare(
+            cached["journals-2023-03.jsonl"]["reconcile journals"],
+            expected={
+                "2023-03-15": [
+                    ["Bank", "BANK", None, "-50.0"],
+                    ["Expected", "DIRECTCOSTS", "exp", "50.0"],
+                ]
+            },
+        )
+
+        # The totals for files that can't change are used without reading them again:
+        for path in journal_file, transaction_file:
+            path.write_text("x" * path.stat().st_size)
+        compare(run_cli(tmp_path, *args).output, expected=first.output)
+
+    def test_raw_dates(self, tmp_path: Path) -> None:
+        """Exports made with --raw have dates in the format Xero sends them."""
+        iso_path = tmp_path / "iso"
+        raw_path = tmp_path / "raw"
+        for path, date in (
+            (iso_path, "2023-03-15T00:00:00+00:00"),
+            (raw_path, "/Date(1678838400000+0000)/"),
+        ):
+            path.mkdir()
+            write_jsonl_file(path / "journals.jsonl", [dict(SAMPLE_JOURNAL, JournalDate=date)])
+            write_jsonl_file(path / "transactions.jsonl", [dict(SAMPLE_TRANSACTION, Date=date)])
+
+        iso, raw = (
+            run_cli(
+                tmp_path,
+                "reconcile",
+                f"journals={path / 'journals.jsonl'}",
+                f"transactions={path / 'transactions.jsonl'}",
+            ).output
+            for path in (iso_path, raw_path)
+        )
+        compare(raw, expected=iso)
+
     def write_source_with_diff(self, tmp_path: Path) -> tuple[Path, Path]:
         journal_file = tmp_path / "journals.jsonl"
         transaction_file = tmp_path / "transactions.jsonl"
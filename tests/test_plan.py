@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from testfixtures import compare
+
+from xerotrust.plan import Estimate, History, fit
+
+
+def test_fit_cheapest_first() -> None:
+    run, deferred = fit(
+        [Estimate('Journals', 50, 'probe'), Estimate('Accounts', 1, 'history')], remaining=10
+    )
+    compare(run, expected=[Estimate('Accounts', 1, 'history')])
+    compare(deferred, expected=[Estimate('Journals', 50, 'probe')])
+
+
+def test_fit_deferred_first() -> None:
+    run, deferred = fit(
+        [Estimate('Accounts', 1, 'history'), Estimate('Journals', 5, 'history')],
+        remaining=5,
+        deferred=['Journals'],
+    )
+    compare(run, expected=[Estimate('Journals', 5, 'history')])
+    compare(deferred, expected=[Estimate('Accounts', 1, 'history')])
+
+
+def test_history_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / 'history.json'
+    history = History(path)
+    history.record('t1', 'Accounts', 'full', 2)
+    history.defer('t1', ['Journals'])
+    history.record_page_size('t1', 'BankTransactions', 250)
+    history.save()
+
+    loaded = History(path)
+    compare(loaded.calls('t1', 'Accounts', 'full'), expected=2)
+    compare(loaded.calls('t1', 'Accounts', 'update'), expected=None)
+    compare(loaded.calls('t2', 'Accounts', 'full'), expected=None)
+    compare(loaded.deferred('t1'), expected=['Journals'])
+    compare(loaded.deferred('t2'), expected=[])
+    compare(loaded.page_size('t1', 'BankTransactions'), expected=250)
+    compare(loaded.page_size('t2', 'BankTransactions'), expected=None)
+
+
+def test_history_nothing_to_save(tmp_path: Path) -> None:
+    path = tmp_path / 'history.json'
+    History(path).save()
+    compare(path.exists(), expected=False)
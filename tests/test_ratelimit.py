@@ -0,0 +1,305 @@
+import json
+import time
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from threading import Event
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+import requests
+from testfixtures import Replacer, ShouldRaise, compare, replace_in_module
+from xero import Xero
+
+from xerotrust import ratelimit
+from xerotrust.exceptions import DailyLimitExhausted, Interrupted
+from xerotrust.ratelimit import RateLimiter, SharedBudget, TokenBucket, pause
+
+from .helpers import SAMPLE_CREDENTIALS, XERO_API_URL
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_pause() -> None:
+    clock = FakeClock()
+    with replace_in_module(time.sleep, clock.sleep, module=ratelimit):
+        pause(2)
+    compare(clock.now, expected=1002)
+
+
+def test_pause_not_stopped() -> None:
+    pause(0.01, Event())
+
+
+def test_pause_stopped() -> None:
+    stop = Event()
+    stop.set()
+    with ShouldRaise(Interrupted):
+        pause(60, stop)
+
+
+class TestTokenBucket:
+    def test_full_to_start_with(self) -> None:
+        bucket = TokenBucket(60, 60)
+        compare(bucket.wait(0), expected=0)
+
+    def test_empty_then_refill(self) -> None:
+        bucket = TokenBucket(60, 60, tokens=0, updated=0)
+        compare(bucket.wait(0), expected=1)
+        compare(bucket.wait(0.5), expected=0.5)
+        compare(bucket.wait(1), expected=0)
+
+    def test_refill_limited_to_capacity(self) -> None:
+        bucket = TokenBucket(2, 60, tokens=0, updated=0)
+        bucket.take(1000)
+        compare(bucket.tokens, expected=1)
+
+    def test_cap(self) -> None:
+        bucket = TokenBucket(60, 60)
+        bucket.cap(5, now=0)
+        compare(bucket.tokens, expected=5)
+        bucket.cap(10, now=0)
+        compare(bucket.tokens, expected=5)
+
+
+class TestRateLimiter:
+    def test_call(self) -> None:
+        limiter = RateLimiter()
+        compare(limiter.call('t1', lambda x: x * 2, 21), expected=42)
+        compare(limiter.budget('t1').minute.tokens, expected=59)
+        compare(limiter.budget('t1').day.tokens, expected=4999)
+        compare(limiter.app_minute.tokens, expected=9999)
+
+    def test_waits_for_minute_budget(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(minute_limit=2, clock=clock)
+        with replace_in_module(time.sleep, clock.sleep, module=ratelimit):
+            for _ in range(3):
+                limiter.call('t1', lambda: None)
+        compare(clock.now, expected=1030)
+
+    def test_wait_for_minute_budget_stopped(self) -> None:
+        stop = Event()
+        stop.set()
+        limiter = RateLimiter(minute_limit=1, stop=stop)
+        limiter.call('t1', lambda: None)
+        with ShouldRaise(Interrupted):
+            limiter.call('t1', lambda: None)
+        # The call in flight was given back:
+        compare(limiter.budget('t1').in_flight._value, expected=limiter.max_in_flight)
+
+    def test_tenants_have_separate_budgets(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(minute_limit=1, clock=clock)
+        limiter.call('t1', lambda: None)
+        limiter.call('t2', lambda: None)
+        compare(clock.now, expected=1000)
+
+    def test_in_flight_released_on_error(self) -> None:
+        limiter = RateLimiter(max_in_flight=1)
+        exception = RuntimeError('boom')
+
+        def fail() -> None:
+            raise exception
+
+        with ShouldRaise(exception):
+            limiter.call('t1', fail)
+        compare(limiter.call('t1', lambda: 'ok'), expected='ok')
+
+    def test_daily_limit_exhausted(self) -> None:
+        limiter = RateLimiter(max_in_flight=1, day_limit=1)
+        limiter.call('t1', lambda: None)
+        with ShouldRaise(DailyLimitExhausted('Daily API limit for tenant t1 has been used up')):
+            limiter.call('t1', lambda: None)
+        # make sure the in-flight slot was released:
+        compare(limiter.budget('t1').in_flight.acquire(blocking=False), expected=True)
+
+    def test_observe_from_headers(self, pook: Any) -> None:
+        pook.get(
+            f"{XERO_API_URL}/Accounts",
+            reply=200,
+            response_headers={
+                'X-MinLimit-Remaining': '10',
+                'X-DayLimit-Remaining': '100',
+                'X-AppMinLimit-Remaining': '1000',
+            },
+            response_json={'Status': 'OK', 'Accounts': []},
+        )
+        limiter = RateLimiter()
+        credentials = limiter.observed(SAMPLE_CREDENTIALS)
+        credentials.tenant_id = 't1'
+        manager = limiter.wrap(Xero(credentials).accounts, 't1')
+        compare(manager.all(), expected=[])
+        budget = limiter.budget('t1')
+        compare(int(budget.minute.tokens), expected=10)
+        compare(int(budget.day.tokens), expected=100)
+        compare(int(limiter.app_minute.tokens), expected=1000)
+        # the original credentials are left alone:
+        assert not isinstance(SAMPLE_CREDENTIALS.oauth, ratelimit.ObservedAuth)
+
+    def test_observe_without_tenant(self) -> None:
+        limiter = RateLimiter()
+        response = requests.Response()
+        response.request = requests.Request('GET', 'https://example.com').prepare()
+        response.headers['X-DayLimit-Remaining'] = '10'
+        limiter.observe(response)
+        compare(limiter._tenants, expected={})
+
+    def test_observe_tenant_as_bytes(self) -> None:
+        limiter = RateLimiter()
+        response = requests.Response()
+        response.request = requests.Request(
+            'GET', 'https://example.com', headers={'Xero-tenant-id': b't1'}
+        ).prepare()
+        response.headers['X-DayLimit-Remaining'] = '10'
+        limiter.observe(response)
+        compare(int(limiter.budget('t1').day.tokens), expected=10)
+
+    def test_stream_in_flight_until_read(self) -> None:
+        limiter = RateLimiter(max_in_flight=1)
+        manager = limiter.wrap(Mock(**{'stream.return_value': iter([1, 2])}), 't1')
+        items = manager.stream(page=1)
+        in_flight = limiter.budget('t1').in_flight
+        compare(next(items), expected=1)
+        compare(in_flight.acquire(blocking=False), expected=False)
+        compare(list(items), expected=[2])
+        compare(in_flight.acquire(blocking=False), expected=True)
+        compare(manager.calls, expected=1)
+
+    def test_stream_in_flight_released_when_closed(self) -> None:
+        limiter = RateLimiter(max_in_flight=1)
+        manager = limiter.wrap(Mock(**{'stream.return_value': iter([1, 2])}), 't1')
+        items = manager.stream()
+        compare(next(items), expected=1)
+        items.close()
+        compare(limiter.budget('t1').in_flight.acquire(blocking=False), expected=True)
+
+    def test_stream_in_flight_released_on_error(self) -> None:
+        limiter = RateLimiter(max_in_flight=1)
+        manager = limiter.wrap(Mock(**{'stream.side_effect': RuntimeError('boom')}), 't1')
+        with ShouldRaise(RuntimeError('boom')):
+            manager.stream()
+        compare(limiter.budget('t1').in_flight.acquire(blocking=False), expected=True)
+        compare(manager.calls, expected=0)
+
+    @pytest.mark.asyncio
+    async def test_acall(self) -> None:
+        limiter = RateLimiter()
+
+        async def double(x: int) -> int:
+            return x * 2
+
+        compare(await limiter.acall('t1', double, 21), expected=42)
+        compare(limiter.budget('t1').minute.tokens, expected=59)
+
+    @pytest.mark.asyncio
+    async def test_acall_waits_for_minute_budget(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(minute_limit=2, clock=clock)
+
+        async def sleep(seconds: float) -> None:
+            clock.sleep(seconds)
+
+        async def nothing() -> None:
+            pass
+
+        with Replacer() as replace:
+            replace('xerotrust.ratelimit.asyncio.sleep', sleep)
+            for _ in range(3):
+                await limiter.acall('t1', nothing)
+        compare(clock.now, expected=1030)
+
+    def test_wrap_non_callable(self) -> None:
+        manager = Mock()
+        manager.name = 'Accounts'
+        compare(RateLimiter().wrap(manager, 't1').name, expected='Accounts')
+
+    def test_save_and_load(self, tmp_path: Path) -> None:
+        path = tmp_path / 'limits.json'
+        limiter = RateLimiter()
+        limiter.budget('t1').day.cap(100, limiter.clock())
+        limiter.budget('t1').day_observed = datetime.now(UTC)
+        # never observed, so not saved:
+        limiter.budget('t2')
+        limiter.save(path)
+        data = json.loads(path.read_text())
+        compare(list(data), expected=['t1'])
+        compare(data['t1']['remaining'], expected=100)
+
+        loaded = RateLimiter.load(path)
+        compare(int(loaded.budget('t1').day.tokens), expected=100)
+
+    def test_load_allows_for_elapsed_time(self, tmp_path: Path) -> None:
+        path = tmp_path / 'limits.json'
+        observed = datetime.now(UTC) - timedelta(hours=12)
+        path.write_text(json.dumps({'t1': {'remaining': 0, 'observed': observed.isoformat()}}))
+        limiter = RateLimiter.load(path)
+        compare(limiter.budget('t1').day.wait(limiter.clock()), expected=0)
+        compare(2499 < limiter.budget('t1').day.tokens < 2501, expected=True)
+
+    def test_save_nothing_observed(self, tmp_path: Path) -> None:
+        path = tmp_path / 'limits.json'
+        RateLimiter().save(path)
+        assert not path.exists()
+
+
+class TestSharedBudget:
+    def test_processes_share_app_budget(self, tmp_path: Path) -> None:
+        clock = FakeClock()
+        path = tmp_path / 'shared.json'
+        first = RateLimiter(app_minute_limit=2, clock=clock, shared=SharedBudget(path))
+        second = RateLimiter(app_minute_limit=2, clock=clock, shared=SharedBudget(path))
+        with replace_in_module(time.sleep, clock.sleep, module=ratelimit):
+            first.call('t1', lambda: None)
+            second.call('t2', lambda: None)
+            compare(clock.now, expected=1000)
+            # both limiters have now used the app budget between them:
+            second.call('t3', lambda: None)
+        compare(clock.now, expected=1030)
+        compare(
+            json.loads(path.read_text()),
+            expected={
+                'app:minute': [0.0, 1030.0],
+                't1:minute': [59.0, 1000.0],
+                't1:day': [4999.0, 1000.0],
+                't2:minute': [59.0, 1000.0],
+                't2:day': [4999.0, 1000.0],
+                't3:minute': [59.0, 1030.0],
+                't3:day': [4999.0, 1030.0],
+            },
+        )
+
+    def test_processes_share_tenant_budget(self, tmp_path: Path) -> None:
+        path = tmp_path / 'shared.json'
+        first = RateLimiter(shared=SharedBudget(path))
+        second = RateLimiter(shared=SharedBudget(path))
+        first.call('t1', lambda: None)
+        second.call('t1', lambda: None)
+        compare(int(first.budget('t1').day.tokens), expected=4999)
+        compare(int(second.budget('t1').day.tokens), expected=4998)
+
+    def test_observed_headers_are_shared(self, tmp_path: Path) -> None:
+        path = tmp_path / 'shared.json'
+        first = RateLimiter(shared=SharedBudget(path))
+        second = RateLimiter(shared=SharedBudget(path))
+        response = requests.Response()
+        response.request = requests.Request(
+            'GET', 'https://example.com', headers={'Xero-tenant-id': 't1'}
+        ).prepare()
+        response.headers['X-AppMinLimit-Remaining'] = '0'
+        first.observe(response)
+        with second._buckets('t1', second.budget('t1')) as now:
+            compare(second.app_minute.wait(now) > 0, expected=True)
+
+    def test_uses_wall_clock(self, tmp_path: Path) -> None:
+        limiter = RateLimiter(shared=SharedBudget(tmp_path / 'shared.json'))
+        compare(limiter.clock, expected=time.time)
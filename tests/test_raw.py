@@ -0,0 +1,100 @@
+from datetime import datetime, UTC
+from json import JSONDecodeError
+from typing import Any, Iterator
+
+from testfixtures import ShouldRaise, compare
+
+from xerotrust.raw import RawItem, passthrough, records, split_records
+from xerotrust.transform import TRANSFORMERS
+
+RESPONSE = '''{\r
+  "Id": "1",\r
+  "Status": "OK",\r
+  "Journals": [\r
+    {\r
+      "JournalID": "j1",\r
+      "JournalDate": "/Date(1672531200000+0000)/",\r
+      "JournalNumber": 1,\r
+      "JournalLines": [{"JournalNumber": 99, "Description": "a \\"quoted\\" [value]"}]\r
+    },\r
+    {"JournalID": "j2", "JournalNumber": 2}\r
+  ]\r
+}'''
+
+
+def test_split_records() -> None:
+    items = split_records(RESPONSE, 'Journals', ['JournalDate', 'JournalNumber'])
+    compare(
+        [dict(item) for item in items],
+        expected=[
+            {'JournalDate': datetime(2023, 1, 1, tzinfo=UTC), 'JournalNumber': 1},
+            {'JournalNumber': 2},
+        ],
+    )
+    compare(
+        [item.raw for item in items],
+        expected=[
+            '{"JournalID": "j1","JournalDate": "/Date(1672531200000+0000)/","JournalNumber": 1,'
+            '"JournalLines": [{"JournalNumber": 99, "Description": "a \\"quoted\\" [value]"}]}',
+            '{"JournalID": "j2", "JournalNumber": 2}',
+        ],
+    )
+
+
+def test_split_records_empty() -> None:
+    items = split_records('{"Status": "OK", "Journals": []}', 'Journals', ['JournalNumber'])
+    compare(items, expected=[])
+
+
+def test_split_records_not_ok() -> None:
+    with ShouldRaise(AssertionError('Expected the API to say OK but received ERROR')):
+        split_records('{"Status": "ERROR", "Journals": []}', 'Journals', [])
+
+
+def test_split_records_malformed() -> None:
+    with ShouldRaise(ValueError("Expected '{' at 0: '[]'")):
+        split_records('[]', 'Journals', [])
+
+
+def test_passthrough() -> None:
+    serializer = passthrough(TRANSFORMERS['json'])
+    item = RawItem({'JournalNumber': 1})
+    item.raw = '{"JournalNumber":1,"Extra":true}'
+    compare(serializer(item), expected='{"JournalNumber":1,"Extra":true}')
+    compare(serializer({'JournalNumber': 1}), expected='{"JournalNumber": 1}')
+
+
+def test_records_in_chunks() -> None:
+    chunks = [RESPONSE[i : i + 7] for i in range(0, len(RESPONSE), 7)]
+    compare(
+        [record['JournalNumber'] for record, _ in records(chunks, 'Journals')],
+        expected=[1, 2],
+    )
+
+
+def test_records_number_split_across_chunks() -> None:
+    chunks = ['{"Status": "OK", "Journals": [12', '34, 5', '6]}']
+    compare([record for record, _ in records(chunks, 'Journals')], expected=[1234, 56])
+
+
+def test_records_yielded_as_they_arrive() -> None:
+    def chunks() -> Iterator[str]:
+        yield '{"Status": "OK", "Journals": [{"JournalNumber": 1},'
+        raise ConnectionError('dropped')
+
+    stream = records(chunks(), 'Journals')
+    compare(next(stream), expected=({'JournalNumber': 1}, '{"JournalNumber": 1}'))
+    with ShouldRaise(ConnectionError('dropped')):
+        next(stream)
+
+
+def test_records_truncated() -> None:
+    with ShouldRaise(JSONDecodeError):
+        list(records(['{"Status": "OK", "Journals": []', ''], 'Journals'))
+
+
+def test_records_metadata() -> None:
+    metadata: dict[str, Any] = {}
+    text = '{"Status": "OK", "pagination": {"itemCount": 2}, "Journals": [1, 2]}'
+    compare([record for record, _ in records(text, 'Journals', metadata=metadata)], expected=[1, 2])
+    compare(metadata, expected={'Status': 'OK', 'pagination': {'itemCount': 2}})
@@ -0,0 +1,124 @@
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import httpx
+from requests.exceptions import ChunkedEncodingError, ConnectionError, InvalidURL, ReadTimeout
+from testfixtures import Replacer, ShouldRaise, compare
+from xero.exceptions import XeroExceptionUnknown, XeroInternalError, XeroRateLimitExceeded
+
+from xerotrust.exceptions import TenantUnavailable
+from xerotrust.retry import Backoff, Retries, TenantRetries, transient
+
+
+def test_transient() -> None:
+    assert transient(XeroInternalError(Mock(text='oops')))
+    assert transient(ConnectionError())
+    assert transient(ReadTimeout())
+    assert transient(ChunkedEncodingError())
+    assert not transient(InvalidURL())
+    assert transient(httpx.ConnectTimeout('slow'))
+    assert transient(XeroExceptionUnknown(Mock(status_code=502, text='bad gateway')))
+    assert not transient(XeroExceptionUnknown(Mock(status_code=409, text='conflict')))
+    assert not transient(XeroRateLimitExceeded(Mock(headers={}), {}))
+    assert not transient(ValueError())
+
+
+def test_backoff() -> None:
+    with Replacer() as replace:
+        replace('xerotrust.retry.random.uniform', lambda low, high: high)
+        backoff = Backoff(base=2, cap=10, attempts=3)
+        compare([backoff.delay(attempt) for attempt in range(4)], expected=[2, 4, 8, None])
+        compare(Backoff(base=2, cap=5).delay(2), expected=5)
+
+
+def test_backoff_jitter() -> None:
+    backoff = Backoff(base=1, cap=60)
+    delays = {backoff.delay(4) for _ in range(10)}
+    assert len(delays) > 1
+    assert all(delay is not None and 0 <= delay <= 16 for delay in delays)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_and_recovers() -> None:
+    error = XeroInternalError(Mock(text='oops'))
+    clock = Clock()
+    retries = TenantRetries('t1', Backoff(attempts=10), threshold=3, cooldown=60, clock=clock)
+    retries.check()
+    assert retries.failed(error, 0) is not None
+    retries.check()
+    assert retries.failed(error, 1) is not None
+    retries.check()
+    with ShouldRaise(TenantUnavailable('Calls for tenant t1 keep failing')):
+        retries.failed(error, 2)
+    # Calls fail straight away while the breaker is open:
+    clock.now = 59
+    with ShouldRaise(TenantUnavailable):
+        retries.check()
+    # Once the cooldown has passed, calls are tried again:
+    clock.now = 60
+    retries.check()
+    retries.succeeded(0.5)
+    retries.check()
+    compare(retries.stats.calls, expected=5)
+    compare(retries.stats.retries, expected=2)
+    compare(retries.stats.failed, expected=1)
+    compare(retries.stats.rejected, expected=1)
+    compare(retries.failures, expected=0)
+
+
+def test_success_resets_failures() -> None:
+    error = XeroInternalError(Mock(text='oops'))
+    retries = TenantRetries('t1', threshold=2)
+    retries.failed(error, 0)
+    retries.succeeded(1)
+    retries.failed(error, 0)
+    retries.check()
+
+
+def test_latency() -> None:
+    retries = TenantRetries('t1')
+    retries.succeeded(0.5)
+    retries.succeeded(2)
+    compare(retries.stats.latency_total, expected=2.5)
+    compare(retries.stats.latency_max, expected=2)
+
+
+def test_save(tmp_path: Path) -> None:
+    path = tmp_path / 'retries.json'
+    retries = Retries(threshold=5)
+    t1 = retries.tenant('t1')
+    t1.check()
+    t1.succeeded(1.5)
+    retries.tenant('t2')
+    compare(retries.tenant('t1'), expected=t1)
+    compare(t1.threshold, expected=5)
+    retries.save(path)
+    compare(
+        json.loads(path.read_text()),
+        expected={
+            't1': {
+                'calls': 1,
+                'retries': 0,
+                'failed': 0,
+                'rejected': 0,
+                'latency_total': 1.5,
+                'latency_max': 1.5,
+            }
+        },
+    )
+
+
+def test_save_nothing(tmp_path: Path) -> None:
+    path = tmp_path / 'retries.json'
+    retries = Retries()
+    retries.tenant('t1')
+    retries.save(path)
+    assert not path.exists()
@@ -0,0 +1,283 @@
+from threading import Event, Lock, current_thread
+from time import sleep
+from typing import Callable, Iterator
+
+from testfixtures import ShouldRaise, compare
+
+from xerotrust.exceptions import DailyLimitExhausted, TenantUnavailable
+from xerotrust.scheduler import Task, map_ordered, prefetch, run_tasks
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.lock = Lock()
+
+    def task(self, tenant_id: str, name: str, action: Callable[[], None] | None = None) -> Task:
+        def run() -> None:
+            if action is not None:
+                action()
+            with self.lock:
+                self.calls.append(name)
+
+        return Task(tenant_id, run, name)
+
+
+def test_single_job_runs_in_order() -> None:
+    recorder = Recorder()
+    run_tasks([recorder.task('t1', 'a'), recorder.task('t1', 'b'), recorder.task('t1', 'c')])
+    compare(recorder.calls, expected=['a', 'b', 'c'])
+
+
+def test_tenants_share_fairly() -> None:
+    recorder = Recorder()
+    run_tasks(
+        [
+            recorder.task('t1', 't1-a'),
+            recorder.task('t1', 't1-b'),
+            recorder.task('t1', 't1-c'),
+            recorder.task('t2', 't2-a'),
+            recorder.task('t2', 't2-b'),
+        ]
+    )
+    compare(recorder.calls, expected=['t1-a', 't2-a', 't1-b', 't2-b', 't1-c'])
+
+
+def test_concurrent() -> None:
+    # Each task waits for the other, so this can only complete if both run at once:
+    first, second = Event(), Event()
+    recorder = Recorder()
+
+    def wait_for_second() -> None:
+        first.set()
+        assert second.wait(timeout=5)
+
+    def wait_for_first() -> None:
+        second.set()
+        assert first.wait(timeout=5)
+
+    run_tasks(
+        [recorder.task('t1', 'a', wait_for_second), recorder.task('t2', 'b', wait_for_first)],
+        jobs=2,
+    )
+    compare(sorted(recorder.calls), expected=['a', 'b'])
+
+
+def test_per_tenant_limit() -> None:
+    running = 0
+    peak = 0
+    lock = Lock()
+
+    def track() -> None:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        Event().wait(0.01)
+        with lock:
+            running -= 1
+
+    recorder = Recorder()
+    run_tasks([recorder.task('t1', str(i), track) for i in range(6)], jobs=4, per_tenant=2)
+    compare(peak, expected=2)
+    compare(len(recorder.calls), expected=6)
+
+
+def test_tenant_done() -> None:
+    done: list[str] = []
+    recorder = Recorder()
+    run_tasks(
+        [recorder.task('t1', 'a'), recorder.task('t2', 'b'), recorder.task('t1', 'c')],
+        on_tenant_done=done.append,
+    )
+    compare(recorder.calls, expected=['a', 'b', 'c'])
+    compare(done, expected=['t2', 't1'])
+
+
+def test_error_stops_further_tasks() -> None:
+    exception = RuntimeError('boom')
+
+    def fail() -> None:
+        raise exception
+
+    done: list[str] = []
+    recorder = Recorder()
+    with ShouldRaise(exception):
+        run_tasks(
+            [
+                recorder.task('t1', 'a'),
+                recorder.task('t2', 'b', fail),
+                recorder.task('t1', 'c'),
+            ],
+            on_tenant_done=done.append,
+        )
+    compare(recorder.calls, expected=['a'])
+    compare(done, expected=[])
+
+
+def test_single_job_runs_in_calling_thread() -> None:
+    threads = []
+    run_tasks([Task('t1', lambda: threads.append(current_thread()))])
+    compare(threads, expected=[current_thread()])
+
+
+def test_single_job_interrupted() -> None:
+    def interrupt() -> None:
+        raise KeyboardInterrupt
+
+    recorder = Recorder()
+    with ShouldRaise(KeyboardInterrupt):
+        run_tasks([recorder.task('t1', 'a', interrupt), recorder.task('t1', 'b')])
+    compare(recorder.calls, expected=[])
+
+
+def test_unavailable_tenant_does_not_stop_others() -> None:
+    exception = TenantUnavailable('Calls for tenant t1 keep failing')
+
+    def fail() -> None:
+        raise exception
+
+    done: list[str] = []
+    recorder = Recorder()
+    with ShouldRaise(exception):
+        run_tasks(
+            [
+                recorder.task('t1', 'a', fail),
+                recorder.task('t2', 'b'),
+                recorder.task('t1', 'c'),
+                recorder.task('t2', 'd'),
+            ],
+            on_tenant_done=done.append,
+        )
+    compare(recorder.calls, expected=['b', 'd'])
+    compare(done, expected=['t2'])
+
+
+def test_exhausted_tenant_deferred_and_does_not_stop_others() -> None:
+    exception = DailyLimitExhausted('Daily API limit for tenant t1 has been used up')
+
+    def fail() -> None:
+        raise exception
+
+    done: list[str] = []
+    deferred: list[tuple[str, list[str]]] = []
+    recorder = Recorder()
+    with ShouldRaise(exception):
+        run_tasks(
+            [
+                recorder.task('t1', 'a'),
+                recorder.task('t1', 'b', fail),
+                recorder.task('t2', 'c'),
+                recorder.task('t1', 'd'),
+            ],
+            on_tenant_done=done.append,
+            on_tenant_deferred=lambda tenant_id, names: deferred.append((tenant_id, names)),
+        )
+    compare(recorder.calls, expected=['a', 'c'])
+    compare(done, expected=['t2'])
+    compare(deferred, expected=[('t1', ['b', 'd'])])
+
+
+def test_map_ordered() -> None:
+    def slow_for_small(n: int) -> int:
+        Event().wait(0.01 * (5 - n))
+        return n * 10
+
+    compare(list(map_ordered(slow_for_small, range(5), workers=3)), expected=[0, 10, 20, 30, 40])
+
+
+def test_map_ordered_does_not_get_too_far_ahead() -> None:
+    started: list[int] = []
+    results = map_ordered(started.append, range(10), workers=2)
+    next(results)
+    results.close()
+    # The first item and, at most, the two after it:
+    assert 0 in started
+    assert set(started) <= {0, 1, 2}, started
+
+
+def test_map_ordered_error() -> None:
+    def fail_on_two(n: int) -> int:
+        if n == 2:
+            raise ValueError(n)
+        return n
+
+    results = map_ordered(fail_on_two, range(5), workers=2)
+    compare(next(results), expected=0)
+    compare(next(results), expected=1)
+    with ShouldRaise(ValueError(2)):
+        next(results)
+
+
+def test_prefetch() -> None:
+    compare(list(prefetch(range(5), depth=2)), expected=[0, 1, 2, 3, 4])
+
+
+def test_prefetch_none() -> None:
+    compare(list(prefetch(range(3), depth=0)), expected=[0, 1, 2])
+
+
+def test_prefetch_fetches_ahead() -> None:
+    produced: list[int] = []
+    third = Event()
+
+    def items() -> Iterator[int]:
+        for i in range(5):
+            produced.append(i)
+            if i == 2:
+                third.set()
+            yield i
+
+    results = prefetch(items(), depth=2)
+    compare(next(results), expected=0)
+    # While the consumer has the first item, the next two are fetched:
+    assert third.wait(timeout=5)
+    compare(produced[:3], expected=[0, 1, 2])
+    results.close()
+
+
+def test_prefetch_error() -> None:
+    def items() -> Iterator[int]:
+        yield 0
+        yield 1
+        raise ValueError('boom')
+
+    results = prefetch(items(), depth=5)
+    compare(next(results), expected=0)
+    compare(next(results), expected=1)
+    with ShouldRaise(ValueError('boom')):
+        next(results)
+
+
+def test_prefetch_error_while_consumer_behind() -> None:
+    raising = Event()
+
+    def items() -> Iterator[int]:
+        yield 0
+        yield 1
+        raising.set()
+        raise ValueError('boom')
+
+    results = prefetch(items(), depth=1)
+    compare(next(results), expected=0)
+    assert raising.wait(timeout=5)
+    # Long enough for the producer to find the queue still full at least once:
+    sleep(0.3)
+    compare(next(results), expected=1)
+    with ShouldRaise(ValueError('boom')):
+        next(results)
+
+
+def test_prefetch_stops_when_closed() -> None:
+    finished = Event()
+
+    def items() -> Iterator[int]:
+        try:
+            yield from range(1000)
+        finally:
+            finished.set()
+
+    results = prefetch(items(), depth=1)
+    compare(next(results), expected=0)
+    results.close()
+    assert finished.wait(timeout=5)
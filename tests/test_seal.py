@@ -0,0 +1,78 @@
+import json
+from datetime import date
+from pathlib import Path
+
+import pytest
+from testfixtures import compare
+
+from xerotrust.seal import Seals, lock_date, period_end
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ('journals.jsonl', None),
+        ('journals-2023.jsonl', date(2023, 12, 31)),
+        ('journals-2024-02.jsonl', date(2024, 2, 29)),
+        ('transactions-2023-12.jsonl', date(2023, 12, 31)),
+        ('transactions-2023-03-15.jsonl', date(2023, 3, 15)),
+    ],
+)
+def test_period_end(name: str, expected: date | None) -> None:
+    compare(period_end(name), expected=expected)
+
+
+@pytest.mark.parametrize(
+    "value",
+    ['2023-03-31T00:00:00', '/Date(1680220800000+0000)/'],
+)
+def test_lock_date(tmp_path: Path, value: str) -> None:
+    organisation = {'PeriodLockDate': '2023-06-30T00:00:00', 'EndOfYearLockDate': value}
+    (tmp_path / 'organisations.jsonl').write_text(json.dumps(organisation) + '\n')
+    compare(lock_date(tmp_path), expected=date(2023, 3, 31))
+
+
+def test_lock_date_none(tmp_path: Path) -> None:
+    compare(lock_date(tmp_path), expected=None)
+    (tmp_path / 'organisations.jsonl').write_text('{"PeriodLockDate": "2023-06-30T00:00:00"}\n')
+    compare(lock_date(tmp_path), expected=None)
+
+
+class TestSeals:
+    @pytest.fixture(autouse=True)
+    def organisation(self, tmp_path: Path) -> None:
+        (tmp_path / 'organisations.jsonl').write_text('{"EndOfYearLockDate": "2023-03-31"}\n')
+
+    def test_sealed(self, tmp_path: Path) -> None:
+        seals = Seals()
+        compare(seals.sealed(tmp_path / 'journals-2023-03.jsonl'), expected=True)
+        compare(seals.sealed(tmp_path / 'journals-2023-04.jsonl'), expected=False)
+        compare(seals.sealed(tmp_path / 'journals-2023.jsonl'), expected=False)
+        compare(seals.sealed(tmp_path / 'journals.jsonl'), expected=False)
+
+    def test_cached(self, tmp_path: Path) -> None:
+        path = tmp_path / 'journals-2023-03.jsonl'
+        path.write_text('one\n')
+        calls = []
+
+        def compute(p: Path) -> list[str]:
+            calls.append(p)
+            return p.read_text().split()
+
+        seals = Seals()
+        compare(seals.cached(path, 'words', compute), expected=['one'])
+        seals.save()
+        compare(
+            json.loads((tmp_path / 'sealed.json').read_text()),
+            expected={'journals-2023-03.jsonl': {'size': 4, 'words': ['one']}},
+        )
+
+        # Kept between runs while the file is the same size:
+        path.write_text('two\n')
+        compare(Seals().cached(path, 'words', compute), expected=['one'])
+        compare(calls, expected=[path])
+
+        # Worked out again if it changes:
+        path.write_text('three\n')
+        compare(Seals().cached(path, 'words', compute), expected=['three'])
+        compare(calls, expected=[path, path])
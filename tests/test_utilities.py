@@ -1,12 +1,14 @@
 """Tests for utility functions and classes."""
 
 import json
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from testfixtures import ShouldRaise, compare
 
 from xerotrust.check import minimal_repr
-from xerotrust.export import FileManager
+from xerotrust.export import FileManager, Windows
 from xerotrust.transform import TRANSFORMERS
 
 from .helpers import FileChecker
@@ -128,3 +130,46 @@ class TestFileManager:
                 'file1.jsonl': 'THIS SHOULD REMAIN\n{"data": 1}\n',
             },
         )
+
+    def test_concurrent_writes(self, tmp_path: Path) -> None:
+        with FileManager(max_open_files=2, serializer=json.dumps) as fm:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for i in range(200):
+                    executor.submit(fm.write, {'data': i}, tmp_path / f"file{i % 3}.jsonl")
+        lines: list[int] = []
+        for path in sorted(tmp_path.iterdir()):
+            lines.extend(json.loads(line)['data'] for line in path.read_text().splitlines())
+        compare(sorted(lines), expected=list(range(200)))
+
+
+class TestWindows:
+    def test_fixed(self) -> None:
+        windows = Windows(date(2024, 1, 1), timedelta(days=10), 100, end=date(2024, 1, 25))
+        compare(
+            list(windows),
+            expected=[
+                (date(2024, 1, 1), date(2024, 1, 11)),
+                (date(2024, 1, 11), date(2024, 1, 21)),
+                (date(2024, 1, 21), None),
+            ],
+        )
+
+    def test_start_after_end(self) -> None:
+        windows = Windows(date(2024, 2, 1), timedelta(days=10), 100, end=date(2024, 1, 25))
+        compare(list(windows), expected=[(date(2024, 2, 1), None)])
+
+    def test_adapts(self) -> None:
+        windows = Windows(date(2024, 1, 1), timedelta(days=8), 100, end=date(2024, 3, 1))
+        iterator = iter(windows)
+        compare(next(iterator), expected=(date(2024, 1, 1), date(2024, 1, 9)))
+        windows.observe(101)
+        compare(next(iterator), expected=(date(2024, 1, 9), date(2024, 1, 13)))
+        windows.observe(50)
+        compare(next(iterator), expected=(date(2024, 1, 13), date(2024, 1, 17)))
+        windows.observe(24)
+        compare(next(iterator), expected=(date(2024, 1, 17), date(2024, 1, 25)))
+
+    def test_never_smaller_than_a_day(self) -> None:
+        windows = Windows(date(2024, 1, 1), timedelta(days=1), 100)
+        windows.observe(1000)
+        compare(windows.size, expected=timedelta(days=1))